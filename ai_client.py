@@ -0,0 +1,125 @@
+"""
+AI client module for sharing one Azure OpenAI client across the application.
+
+Building an AzureOpenAI client for every call throws its HTTP connection
+pool away, so every request paid a new TCP and TLS handshake. get_client
+hands out one process-wide client instead: its keep-alive pool is reused by
+every call and every thread (the client is thread-safe), and it is only
+rebuilt when the Azure configuration (endpoint, key or API version) changes.
+
+A client replaced after a configuration change is not closed while callers
+may still be sending requests through it: its connections are closed once
+the last caller drops its reference.
+
+A response hook on the HTTP client records, per request, whether it went
+over a new connection or reused a pooled one (see connection_stats).
+"""
+
+import weakref
+import threading
+
+
+class ClientManager:
+    """Process-wide AzureOpenAI client, rebuilt when the configuration changes."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self._http_client = None
+        self._config_key = None
+        # Network streams of the open connections seen; a closed connection
+        # drops out, so its id cannot be mistaken for a later one
+        self._connections = weakref.WeakSet()
+        self.stats = {
+            "clients_built": 0,
+            "requests": 0,
+            "new_connections": 0,
+            "reused_connections": 0
+        }
+    
+    def get_client(self, config):
+        """The shared client for an Azure configuration (from Settings.get_azure_config)."""
+        config_key = (config['endpoint'], config['api_key'], config['api_version'])
+        with self._lock:
+            if self._client is None or config_key != self._config_key:
+                self._release_client()
+                self._client, self._http_client = self._build_client(config)
+                self._config_key = config_key
+                self.stats["clients_built"] += 1
+            return self._client
+    
+    def connection_stats(self):
+        """Request and connection counts, with the share of requests that reused a connection."""
+        with self._lock:
+            stats = dict(self.stats)
+        tracked = stats["new_connections"] + stats["reused_connections"]
+        stats["reuse_percent"] = round(100.0 * stats["reused_connections"] / tracked, 1) if tracked else 0.0
+        return stats
+    
+    def reset(self):
+        """Drop the client; the next get_client builds a new one."""
+        with self._lock:
+            self._release_client()
+    
+    def _build_client(self, config):
+        """Returns (AzureOpenAI client, its HTTP client or None if openai made its own)."""
+        from openai import AzureOpenAI
+        
+        client_args = {
+            "api_key": config['api_key'],
+            "api_version": config['api_version'],
+            "azure_endpoint": config['endpoint']
+        }
+        try:
+            # openai's default HTTP client settings (pool limits, timeouts), plus the reuse hook
+            from openai import DefaultHttpxClient
+            client_args["http_client"] = DefaultHttpxClient(event_hooks={"response": [self._on_response]})
+        except ImportError:
+            # Older openai releases: still one shared pool, just no connection statistics
+            pass
+        return AzureOpenAI(**client_args), client_args.get("http_client")
+    
+    def _release_client(self):
+        """Stop handing out the client; its connections close once no caller holds it.
+        
+        The finalizer keeps only the HTTP client, so it runs as soon as the
+        last reference to the AzureOpenAI client is gone (openai closes the
+        HTTP clients it creates itself when they are collected).
+        """
+        if self._client is not None and self._http_client is not None:
+            weakref.finalize(self._client, _close_http_client, self._http_client)
+        self._client = None
+        self._http_client = None
+        self._config_key = None
+    
+    def _on_response(self, response):
+        """Count the request and whether its connection was already in the pool."""
+        stream = response.extensions.get("network_stream")
+        with self._lock:
+            self.stats["requests"] += 1
+            if stream is None:
+                return
+            if stream in self._connections:
+                self.stats["reused_connections"] += 1
+            else:
+                self._connections.add(stream)
+                self.stats["new_connections"] += 1
+
+
+def _close_http_client(http_client):
+    try:
+        http_client.close()
+    except Exception as e:
+        print(f"Error closing AI client: {e}")
+
+
+_manager = ClientManager()
+
+
+def get_client(config):
+    """The process-wide AzureOpenAI client for an Azure configuration."""
+    return _manager.get_client(config)
+
+
+def connection_stats():
+    return _manager.connection_stats()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the local readability metrics engine.
+Measures lang_readability.ReadabilityMetrics over large synthetic sets of
+clean lang entries (the target is well under a second for 100k entries) and
+over any extracted games, printing the aggregate grade alongside.
+
+Usage:
+    python benchmarks/bench_lang_readability.py
+    python benchmarks/bench_lang_readability.py 10000 500000
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lang_tokenizer
+import lang_readability
+
+
+SENTENCES = [
+    "Collect wood",
+    "Next",
+    "Craft a pickaxe",
+    "Collect wood before night falls.",
+    "Talk to the villager to learn about the Agent.",
+    "The shelter was built by the Agent while you were exploring.",
+    "Artificial intelligence systems are trained on information that people provide.",
+    "Press ':_input_key.use:' to open the door!",
+    "Great job!",
+    "Can you find the hidden chest?",
+    "Investigate the suspicious circumstances surrounding the disappearance of the villagers' crops.",
+]
+
+SIZES = [10000, 100000, 500000]
+
+
+def make_entries(entry_count, seed=0):
+    """Build synthetic clean lang entries of one to three lines each, mostly one."""
+    rnd = random.Random(seed)
+    return {f"npc.line.{i}": "%1".join(rnd.choice(SENTENCES) for _ in range(rnd.choice((1, 1, 1, 2, 3))))
+            for i in range(entry_count)}
+
+
+def report(label, entries):
+    """Measure one set of entries and print its timing row."""
+    started = time.perf_counter()
+    metrics = lang_readability.ReadabilityMetrics(entries)
+    summary = metrics.summary()
+    metrics.worst_entries(25)
+    elapsed = time.perf_counter() - started
+    
+    rate = len(entries) / elapsed if elapsed else float('inf')
+    print(f"{label:>24} {len(entries):>9} {elapsed:>9.3f} {rate:>12,.0f} "
+          f"{summary['flesch_kincaid_grade']:>7} {summary['rare_word_ratio']:>7.1%} {summary['passive_constructions']:>8}")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    
+    print("=" * 82)
+    print("Lang readability benchmark")
+    print("=" * 82)
+    print(f"{'source':>24} {'entries':>9} {'secs':>9} {'entries/s':>12} {'grade':>7} {'rare':>7} {'passive':>8}")
+    print("-" * 82)
+    
+    for size in sizes:
+        report("synthetic", make_entries(size, seed=size))
+    
+    # Real extracted files, if any games are present
+    games_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "games")
+    for json_file in sorted(glob.glob(os.path.join(games_dir, "*", "lang", "en_*.json"))):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            lang_data = json.load(f)
+        entries = lang_tokenizer.clean_lang_entries(lang_tokenizer.tokenize_lang_entries(lang_data))
+        report(os.path.basename(os.path.dirname(os.path.dirname(json_file)))[:24], entries)
+    
+    print("-" * 82)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
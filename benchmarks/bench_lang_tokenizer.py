@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the structured lang tokenizer.
+Measures lang_tokenizer.tokenize_lang_entries throughput on large synthetic
+lang files and reports the prompt tokens saved by sending clean text instead
+of raw values (annotations and § formatting codes included).
+
+Usage:
+    python benchmarks/bench_lang_tokenizer.py
+    python benchmarks/bench_lang_tokenizer.py 10000 500000
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lang_tokenizer
+
+
+# Value shapes seen in Minecraft Education lang files
+TEMPLATES = [
+    "{words}\t#\t###(Less than 5 words)",
+    "{words}.\t#\t###(Less than 15 words)",
+    "§8\t#\t###{{LOCKED}}",
+    "1.0.{n}\t#\t###{{LOCKED}}",
+    "§l{words}:§r%1- {words}%1- {words}\t#\t###{{StrContains=\"§l\"}}{{StrContains=\"§r\"}}{{StrContains=\"%1\"}}",
+    "Press ':_input_key.use:' to {words}\t#\t###{{StrContains=\":_input_key.use:\"}}",
+    "{words}!",
+    "{words}?\t#\t###",
+]
+
+WORDS = ['Collect', 'wood', 'before', 'night', 'falls', 'craft', 'a', 'pickaxe', 'talk', 'to',
+         'the', 'villager', 'build', 'shelter', 'agent', 'code', 'teacher', 'student', 'zombie']
+
+SIZES = [10000, 100000, 500000]
+
+
+def make_lang_data(entry_count, seed=0):
+    """Build a synthetic lang dict in the shape of real Education lang files."""
+    rnd = random.Random(seed)
+    lang_data = {}
+    for i in range(entry_count):
+        words = ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 12)))
+        lang_data[f"npc.line.{i}"] = rnd.choice(TEMPLATES).format(words=words, n=i)
+    return lang_data
+
+
+def report(label, lang_data):
+    """Tokenize one lang dict and print its timing and token savings row."""
+    started = time.perf_counter()
+    structured = lang_tokenizer.tokenize_lang_entries(lang_data)
+    elapsed = time.perf_counter() - started
+    savings = lang_tokenizer.prompt_token_savings(lang_data, structured)
+    
+    rate = len(lang_data) / elapsed if elapsed else float('inf')
+    print(f"{label:>24} {len(lang_data):>9} {elapsed:>9.3f} {rate:>12,.0f} "
+          f"{savings['raw_tokens']:>11,} {savings['clean_tokens']:>11,} {savings['percent_saved']:>6.1f}%")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    
+    print("=" * 88)
+    print("Lang tokenizer benchmark")
+    print("=" * 88)
+    print(f"{'source':>24} {'entries':>9} {'secs':>9} {'entries/s':>12} "
+          f"{'raw tok':>11} {'clean tok':>11} {'saved':>7}")
+    print("-" * 88)
+    
+    for size in sizes:
+        report("synthetic", make_lang_data(size, seed=size))
+    
+    # Real extracted files, if any games are present
+    games_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "games")
+    for json_file in sorted(glob.glob(os.path.join(games_dir, "*", "lang", "en_*.json"))):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            lang_data = json.load(f)
+        report(os.path.basename(os.path.dirname(os.path.dirname(json_file)))[:24], lang_data)
+    
+    print("-" * 88)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
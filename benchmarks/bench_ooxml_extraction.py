@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark for streaming DOCX/PPTX text extraction.
+Compares the original python-docx / python-pptx object-model extraction with
+ooxml_extractor's streaming parse: time, peak Python memory (tracemalloc),
+characters extracted, and whether table cells, grouped shapes and speaker
+notes make it into the text. Without arguments a synthetic document and deck
+are generated with python-docx and python-pptx.
+
+Usage:
+    python benchmarks/bench_ooxml_extraction.py
+    python benchmarks/bench_ooxml_extraction.py guide.docx deck.pptx
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ooxml_extractor
+
+
+SYNTHETIC_PARAGRAPHS = 6000
+SYNTHETIC_TABLES = 60
+SYNTHETIC_SLIDES = 1000
+
+WORDS = ("the agent helps students learn about artificial intelligence and computational "
+         "thinking while they build a shelter before night falls in minecraft").split()
+
+# Markers written only into tables, grouped shapes and notes of the synthetic files
+TABLE_MARKER = "TABLECELL"
+GROUP_MARKER = "GROUPEDSHAPE"
+NOTES_MARKER = "SPEAKERNOTE"
+
+
+def sentence(rnd, words=14):
+    return " ".join(rnd.choice(WORDS) for _ in range(words))
+
+
+def make_docx(path, paragraphs, tables):
+    """Write a document with headings, paragraphs and 3x4 tables spread through it."""
+    from docx import Document
+    
+    rnd = random.Random(0)
+    doc = Document()
+    every = max(1, paragraphs // max(1, tables))
+    for i in range(paragraphs):
+        if i % 50 == 0:
+            doc.add_heading(f"Lesson {i // 50 + 1}", level=1)
+        doc.add_paragraph(sentence(rnd, 30))
+        if i % every == every - 1:
+            table = doc.add_table(rows=3, cols=4)
+            for r, row in enumerate(table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = f"{TABLE_MARKER} {r}.{c} {sentence(rnd, 4)}"
+    doc.save(path)
+
+
+def make_pptx(path, slides):
+    """Write a deck whose slides have a title, bullets, a table, a grouped text box and notes."""
+    from pptx import Presentation
+    from pptx.util import Inches
+    
+    rnd = random.Random(0)
+    prs = Presentation()
+    for i in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"Slide title {i + 1}"
+        slide.placeholders[1].text = "\n".join(sentence(rnd, 10) for _ in range(5))
+        table = slide.shapes.add_table(2, 3, Inches(1), Inches(5), Inches(6), Inches(1)).table
+        for r in range(2):
+            for c in range(3):
+                table.cell(r, c).text = f"{TABLE_MARKER} {r}.{c}"
+        group = slide.shapes.add_group_shape()
+        group.shapes.add_textbox(Inches(1), Inches(6.5), Inches(4), Inches(0.5)).text_frame.text = \
+            f"{GROUP_MARKER} {sentence(rnd, 6)}"
+        slide.notes_slide.notes_text_frame.text = f"{NOTES_MARKER} {sentence(rnd, 40)}"
+    prs.save(path)
+
+
+def object_model_docx(path):
+    """The original Word extraction: paragraphs of the python-docx document."""
+    from docx import Document
+    return '\n'.join(paragraph.text for paragraph in Document(path).paragraphs)
+
+
+def object_model_pptx(path):
+    """The original PowerPoint extraction: top-level shapes with text."""
+    from pptx import Presentation
+    text = []
+    for slide in Presentation(path).slides:
+        for shape in slide.shapes:
+            if hasattr(shape, "text"):
+                text.append(shape.text)
+    return '\n'.join(text)
+
+
+def measure(label, function, baseline=None):
+    """Time one extraction, then repeat it under tracemalloc for the peak memory."""
+    started = time.perf_counter()
+    text = function()
+    elapsed = time.perf_counter() - started
+    
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    speedup = f"{baseline / elapsed:>7.1f}x" if baseline else ""
+    found = "".join(flag if marker in text else "-" for flag, marker in
+                    (("T", TABLE_MARKER), ("G", GROUP_MARKER), ("N", NOTES_MARKER)))
+    print(f"{label:>24} {len(text):>10} {elapsed:>8.3f} {peak / 1024 / 1024:>9.1f} {found:>6} {speedup}")
+    return elapsed
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix="bench_ooxml_")
+    try:
+        if len(sys.argv) > 2:
+            docx_path, pptx_path = sys.argv[1], sys.argv[2]
+        else:
+            docx_path = os.path.join(work_dir, "synthetic.docx")
+            pptx_path = os.path.join(work_dir, "synthetic.pptx")
+            make_docx(docx_path, SYNTHETIC_PARAGRAPHS, SYNTHETIC_TABLES)
+            make_pptx(pptx_path, SYNTHETIC_SLIDES)
+        
+        print("=" * 72)
+        print("OOXML extraction benchmark")
+        print(f"  {os.path.basename(docx_path)}: {os.path.getsize(docx_path) / 1024:.0f} KB, "
+              f"{os.path.basename(pptx_path)}: {os.path.getsize(pptx_path) / 1024:.0f} KB")
+        print("  found: T = table cells, G = grouped shapes, N = speaker notes")
+        print("=" * 72)
+        print(f"{'method':>24} {'chars':>10} {'secs':>8} {'peak MB':>9} {'found':>6} {'speedup':>8}")
+        print("-" * 72)
+        
+        baseline = measure("python-docx", lambda: object_model_docx(docx_path))
+        measure("streaming docx", lambda: ooxml_extractor.extract_docx_text(docx_path), baseline)
+        baseline = measure("python-pptx", lambda: object_model_pptx(pptx_path))
+        measure("streaming pptx", lambda: ooxml_extractor.extract_pptx_text(pptx_path), baseline)
+        print("-" * 72)
+        return 0
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
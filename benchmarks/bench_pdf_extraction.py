@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark for page-level PDF extraction.
+Compares the original serial PyPDF2 page walk with pdf_extractor's process
+pool (cold page cache) and with a warm page cache, and checks that all three
+give the same text. Without a PDF argument a synthetic 200-page PDF is
+generated with reportlab.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py
+    python benchmarks/bench_pdf_extraction.py guide.pdf 4
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_extractor
+
+
+SYNTHETIC_PAGES = 200
+
+WORDS = ("the agent helps students learn about artificial intelligence and computational "
+         "thinking while they build a shelter before night falls in minecraft").split()
+
+
+def make_pdf(path, pages):
+    """Write a text-only PDF with 45 lines of random words per page."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    
+    rnd = random.Random(0)
+    pdf = canvas.Canvas(path, pagesize=letter)
+    for page in range(pages):
+        y = 750
+        pdf.drawString(72, y, f"Page {page + 1}")
+        for _ in range(45):
+            y -= 15
+            pdf.drawString(72, y, " ".join(rnd.choice(WORDS) for _ in range(14)))
+        pdf.showPage()
+    pdf.save()
+
+
+def serial_extract(path):
+    """The original extraction: every page on the calling thread."""
+    import PyPDF2
+    with open(path, 'rb') as f:
+        return [page.extract_text() or "" for page in PyPDF2.PdfReader(f).pages]
+
+
+def timed(label, function, baseline=None):
+    started = time.perf_counter()
+    pages = function()
+    elapsed = time.perf_counter() - started
+    speedup = f"{baseline / elapsed:>8.1f}x" if baseline else ""
+    print(f"{label:>28} {len(pages):>7} {elapsed:>9.3f} {speedup}")
+    return pages, elapsed
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix="bench_pdf_")
+    try:
+        if len(sys.argv) > 1:
+            pdf_path = sys.argv[1]
+        else:
+            pdf_path = os.path.join(work_dir, "synthetic.pdf")
+            make_pdf(pdf_path, SYNTHETIC_PAGES)
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+        cache_dir = os.path.join(work_dir, "cache")
+        
+        print("=" * 60)
+        print(f"PDF extraction benchmark ({workers} workers, {os.cpu_count()} CPUs)")
+        print("=" * 60)
+        print(f"{'method':>28} {'pages':>7} {'secs':>9} {'speedup':>9}")
+        print("-" * 60)
+        
+        serial, baseline = timed("serial PdfReader.pages", lambda: serial_extract(pdf_path))
+        pooled, _ = timed("process pool, cold cache", lambda: pdf_extractor.extract_pdf_pages(
+            pdf_path, cache_dir=cache_dir, max_workers=workers), baseline)
+        cached, _ = timed("warm page cache", lambda: pdf_extractor.extract_pdf_pages(
+            pdf_path, cache_dir=cache_dir, max_workers=workers), baseline)
+        
+        print("-" * 60)
+        if pooled != serial or cached != serial:
+            print("MISMATCH: extracted text differs from the serial extraction")
+            return 1
+        print("Extracted text identical across all methods")
+        return 0
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
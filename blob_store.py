@@ -0,0 +1,341 @@
+"""
+Blob store module for sharing uploaded world files and documents between games.
+
+Each upload is stored once under games/.blobs, named by its SHA-256, and
+every game folder gets a link to it instead of its own full copy. Placing
+a blob into a game tries, in order:
+- a reflink (copy-on-write clone: Btrfs/XFS on Linux, APFS on macOS)
+- a hardlink
+- os.copy_file_range (kernel-side copy, no round trip through Python)
+- a plain copy
+
+A new upload is hashed where it is, then brought into the store the same
+way (reflink, else copy_file_range, else a plain copy), so its bytes only
+pass through Python when the filesystem offers nothing better. The source
+is never hardlinked into the store, as it could later be edited in place.
+
+Blobs are never modified in place; re-uploading a file replaces the game's
+link rather than writing through it.
+
+Every placement is recorded under refs/ with the device, inode, size and
+mtime of the placed file, so reclaim() can tell which blobs no game file
+uses any more (after a game or document is deleted) and remove them
+together with their upload digest memos.
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+
+
+BLOB_STORE_DIRNAME = ".blobs"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Linux FICLONE ioctl request number
+FICLONE = 0x40049409
+
+# Serializes placing blobs and recording their refs against reclaim()
+_refs_lock = threading.RLock()
+
+
+class BlobStore:
+    """Content-addressed store of uploaded files, linked into game folders."""
+    
+    def __init__(self, games_dir):
+        self.root = os.path.join(games_dir, BLOB_STORE_DIRNAME)
+        for sub in ("objects", "sources", "refs", "tmp"):
+            os.makedirs(os.path.join(self.root, sub), exist_ok=True)
+    
+    def add_file(self, source_file, destination):
+        """Store source_file (if not already stored) and link it at destination.
+        
+        Returns:
+            dict with the file's "sha256", how it was placed ("reflink",
+            "hardlink", "copy_file_range" or "copy") and whether the blob
+            was "reused" from an earlier upload
+        """
+        # Hash and clone outside the lock; only moving the blob into place is serialized
+        stat = os.stat(source_file)
+        digest = self._known_digest(source_file, stat) or self._hash_source(source_file, stat)
+        with _refs_lock:
+            if os.path.exists(self._blob_path(digest)):
+                method = self._place(self._blob_path(digest), destination)
+                self._add_ref(digest, destination)
+                return {"sha256": digest, "method": method, "reused": True}
+        
+        tmp_path = self._ingest(source_file, stat)
+        with _refs_lock:
+            self._commit(tmp_path, digest)
+            method = self._place(self._blob_path(digest), destination)
+            self._add_ref(digest, destination)
+        return {"sha256": digest, "method": method, "reused": False}
+    
+    def reclaim(self):
+        """Remove blobs that no game file uses any more, and their upload memos.
+        
+        A blob is in use while one of its recorded destinations still holds it:
+        the same file (hardlink), the untouched clone or copy placed there
+        (same inode, size and mtime as recorded), or else a file with the
+        blob's content. Blobs with other hardlinks are kept even without refs.
+        
+        Returns:
+            dict with objects_removed and bytes_freed
+        """
+        removed = set()
+        freed = 0
+        with _refs_lock:
+            objects_dir = os.path.join(self.root, "objects")
+            for prefix in os.listdir(objects_dir):
+                prefix_dir = os.path.join(objects_dir, prefix)
+                for digest in os.listdir(prefix_dir):
+                    blob_path = os.path.join(prefix_dir, digest)
+                    try:
+                        stat = os.stat(blob_path)
+                        refs = {path: _file_identity(path) for path, identity in self._load_refs(digest).items()
+                                if _holds_blob(path, identity, digest, stat)}
+                        if refs or stat.st_nlink > 1:
+                            self._save_refs(digest, refs)
+                            continue
+                        os.remove(blob_path)
+                    except OSError as e:
+                        print(f"Error reclaiming blob {digest}: {e}")
+                        continue
+                    self._remove_refs(digest)
+                    removed.add(digest)
+                    freed += stat.st_size
+            
+            # Upload memos of removed blobs would name content that is gone
+            if removed:
+                sources_dir = os.path.join(self.root, "sources")
+                for name in os.listdir(sources_dir):
+                    memo_path = os.path.join(sources_dir, name)
+                    try:
+                        with open(memo_path, 'r', encoding='utf-8') as f:
+                            if json.load(f).get("sha256") in removed:
+                                os.remove(memo_path)
+                    except (OSError, ValueError):
+                        continue
+        
+        return {"objects_removed": len(removed), "bytes_freed": freed}
+    
+    def _blob_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest)
+    
+    def _refs_path(self, digest):
+        return os.path.join(self.root, "refs", f"{digest}.json")
+    
+    def _load_refs(self, digest):
+        """{destination: [dev, inode, size, mtime_ns] as placed} of a blob."""
+        try:
+            with open(self._refs_path(digest), 'r', encoding='utf-8') as f:
+                refs = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Refs recorded before placements were identified: a list of destinations
+        if isinstance(refs, list):
+            return {path: None for path in refs}
+        return refs
+    
+    def _save_refs(self, digest, refs):
+        """Write a blob's destinations atomically (removing the file when there are none)."""
+        if not refs:
+            self._remove_refs(digest)
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.root, "tmp"), suffix=".json")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(refs, f, sort_keys=True)
+            os.replace(tmp_path, self._refs_path(digest))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _remove_refs(self, digest):
+        if os.path.exists(self._refs_path(digest)):
+            os.remove(self._refs_path(digest))
+    
+    def _add_ref(self, digest, destination):
+        refs = self._load_refs(digest)
+        destination = os.path.abspath(destination)
+        refs[destination] = _file_identity(destination)
+        self._save_refs(digest, refs)
+    
+    def _source_memo_path(self, source_file):
+        name = hashlib.sha1(os.path.abspath(source_file).encode('utf-8')).hexdigest()
+        return os.path.join(self.root, "sources", f"{name}.json")
+    
+    def _known_digest(self, source_file, stat):
+        """Return the digest of a source file uploaded before, if it is unchanged since."""
+        try:
+            with open(self._source_memo_path(source_file), 'r', encoding='utf-8') as f:
+                memo = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if memo.get("size") == stat.st_size and memo.get("mtime_ns") == stat.st_mtime_ns:
+            return memo.get("sha256")
+        return None
+    
+    def _hash_source(self, source_file, stat):
+        """SHA-256 of a source file, read where it is; remembered for the next upload of it."""
+        digest = _file_digest(source_file)
+        
+        # Remember the digest so uploading the same file again skips hashing
+        memo_path = self._source_memo_path(source_file)
+        try:
+            with open(memo_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "path": os.path.abspath(source_file),
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha256": digest
+                }, f)
+        except OSError as e:
+            print(f"Error recording upload digest: {e}")
+        return digest
+    
+    def _ingest(self, source_file, stat):
+        """Clone or kernel-copy a hashed source file into the store's tmp folder.
+        
+        Returns:
+            The temporary file; _commit moves it into place
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.root, "tmp"))
+        os.close(fd)
+        # Only the unique name is wanted; clonefile will not replace an existing file
+        os.remove(tmp_path)
+        try:
+            _copy_file(source_file, tmp_path, hardlink=False)
+            # The digest was taken before the copy; a source written to since may not match it
+            after = os.stat(source_file)
+            if (after.st_size, after.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                raise OSError(f"{source_file} changed while it was being uploaded")
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return tmp_path
+    
+    def _commit(self, tmp_path, digest):
+        """Move an ingested file into place as its blob."""
+        blob_path = self._blob_path(digest)
+        try:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            if os.path.exists(blob_path):
+                # Same content already stored from another path
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, blob_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _place(self, blob_path, destination):
+        """Put a blob at destination using the cheapest method the filesystem allows."""
+        # Never write through an existing link into a shared blob
+        if os.path.lexists(destination):
+            os.remove(destination)
+        return _copy_file(blob_path, destination)
+
+
+def _copy_file(source, destination, hardlink=True):
+    """Copy a file to a new destination with the cheapest method the filesystem allows.
+    
+    Returns:
+        The method used ("reflink", "hardlink", "copy_file_range" or "copy")
+    """
+    if _reflink(source, destination):
+        return "reflink"
+    
+    if hardlink:
+        try:
+            os.link(source, destination)
+            return "hardlink"
+        except OSError:
+            pass
+    
+    if hasattr(os, "copy_file_range"):
+        try:
+            _copy_file_range(source, destination)
+            shutil.copystat(source, destination)
+            return "copy_file_range"
+        except OSError:
+            if os.path.exists(destination):
+                os.remove(destination)
+    
+    shutil.copy2(source, destination)
+    return "copy"
+
+
+def _file_identity(path):
+    """[dev, inode, size, mtime_ns] of a file, or None if it cannot be read."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def _holds_blob(path, identity, digest, blob_stat):
+    """Whether path still holds the blob: a hardlink to it, the clone or copy placed
+    there (identity as recorded), or else a file with the blob's content."""
+    current = _file_identity(path)
+    if current is None:
+        return False
+    if current[:2] == [blob_stat.st_dev, blob_stat.st_ino] or current == identity:
+        return True
+    # Replaced or rewritten since it was placed (or placed before identities were recorded)
+    return current[2] == blob_stat.st_size and _file_digest(path) == digest
+
+
+def _file_digest(path):
+    """SHA-256 of a file's content."""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _reflink(source, destination):
+    """Clone source to destination copy-on-write. Returns False if unsupported."""
+    if sys.platform == "darwin":
+        try:
+            import ctypes
+            libc = ctypes.CDLL("libc.dylib", use_errno=True)
+            return libc.clonefile(os.fsencode(source), os.fsencode(destination), 0) == 0
+        except (OSError, AttributeError):
+            return False
+    
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    
+    try:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(source, destination)
+        return True
+    except OSError:
+        if os.path.exists(destination):
+            os.remove(destination)
+        return False
+
+
+def _copy_file_range(source, destination):
+    """Copy a file inside the kernel with os.copy_file_range."""
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
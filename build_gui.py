@@ -74,6 +74,8 @@ def build_app(mode="gui"):
             "--hidden-import", "reportlab.lib.pagesizes",
             "--hidden-import", "reportlab.lib.units",
             "--hidden-import", "reportlab.lib.colors",
+            "--hidden-import", "tiktoken",
+            "--hidden-import", "tiktoken_ext.openai_public",
             entry_point
         ]
         
@@ -0,0 +1,149 @@
+"""
+Document chunker module for splitting long document text into section-aware chunks.
+
+Text extracted from educator guides, worksheets and slide decks has no
+markup, so sections are found from the shape of the lines: a heading is a
+short line without closing punctuation that is numbered ("3.", "2.1",
+"Lesson 4", "Appendix B"), in capitals, or in title case. Chunks are filled
+with whole sections where they fit, a new chunk starts at a heading rather
+than in the middle of one, and a section larger than a chunk is split at
+paragraphs, then lines, then words.
+"""
+
+import re
+
+import prompt_packer
+
+
+# A heading line has at most this many words
+MAX_HEADING_WORDS = 12
+
+NUMBERED_HEADING_RE = re.compile(
+    r'^(?:\d+(?:\.\d+)*\.?|[IVX]+\.|(?:lesson|unit|part|chapter|section|module|appendix|activity|step)\s+[\w.]+)\s',
+    re.IGNORECASE
+)
+PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+LINE_BREAK_RE = re.compile(r'\n')
+SPACES_RE = re.compile(r' +')
+CLOSING_PUNCTUATION = '.,;:!?)"\''
+SMALL_WORDS = frozenset("a an and as at by for from in into of on or the to with".split())
+
+
+def is_heading(line):
+    """Whether a line of extracted text looks like a section heading."""
+    line = line.strip()
+    words = line.split()
+    if not words or len(words) > MAX_HEADING_WORDS or line[-1] in CLOSING_PUNCTUATION:
+        return False
+    if NUMBERED_HEADING_RE.match(line + " "):
+        return True
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) >= 3 and all(c.isupper() for c in letters):
+        return True
+    significant = [w for w in words if w.lower() not in SMALL_WORDS and w[0].isalpha()]
+    return len(words) >= 2 and bool(significant) and all(w[0].isupper() for w in significant)
+
+
+def split_sections(text):
+    """Split text at heading lines.
+    
+    Returns:
+        list of (heading, section text); text before the first heading has heading None
+    """
+    sections = []
+    heading = None
+    lines = []
+    has_body = False
+    
+    for line in text.splitlines():
+        if not line.strip():
+            lines.append(line)
+        elif is_heading(line):
+            # Consecutive heading lines ("UNIT 2" / "Training the Agent") open one section
+            if has_body:
+                sections.append((heading, "\n".join(lines).strip()))
+                heading, lines, has_body = None, [], False
+            heading = f"{heading} - {line.strip()}" if heading else line.strip()
+            lines.append(line)
+        else:
+            lines.append(line)
+            has_body = True
+    
+    if any(l.strip() for l in lines):
+        sections.append((heading, "\n".join(lines).strip()))
+    return sections
+
+
+def chunk_document(text, max_tokens, model=None):
+    """Split document text into chunks of at most max_tokens tokens (counted as
+    prompt_packer does for model).
+    
+    Returns:
+        list of {"text", "headings" (section headings that start in the chunk),
+        "words", "tokens"}, in document order
+    """
+    chunks = []
+    current = []
+    current_headings = []
+    current_tokens = 0
+    
+    def flush():
+        nonlocal current, current_headings, current_tokens
+        if current:
+            chunk_text = "\n\n".join(current)
+            chunks.append({
+                "text": chunk_text,
+                "headings": current_headings,
+                "words": len(chunk_text.split()),
+                "tokens": current_tokens
+            })
+        current, current_headings, current_tokens = [], [], 0
+    
+    for heading, section in split_sections(text):
+        tokens = prompt_packer.count_tokens(section, model)
+        # Start sections on a fresh chunk when they would not fit in the current one
+        if current and current_tokens + tokens > max_tokens:
+            flush()
+        if heading:
+            current_headings.append(heading)
+        
+        for piece in _split_to_fit(section, max_tokens, model) if tokens > max_tokens else [section]:
+            piece_tokens = prompt_packer.count_tokens(piece, model)
+            if current and current_tokens + piece_tokens > max_tokens:
+                flush()
+            current.append(piece)
+            current_tokens += piece_tokens
+    
+    flush()
+    return chunks
+
+
+def _split_to_fit(text, max_tokens, model):
+    """Pieces of text within max_tokens, cut at paragraphs, else lines, else words."""
+    for separator_re, joiner in ((PARAGRAPH_BREAK_RE, "\n\n"), (LINE_BREAK_RE, "\n"), (SPACES_RE, " ")):
+        parts = [p for p in separator_re.split(text) if p.strip()]
+        if len(parts) > 1:
+            break
+    else:
+        return [text]
+    
+    pieces = []
+    current = []
+    current_tokens = 0
+    for part in parts:
+        tokens = prompt_packer.count_tokens(part, model)
+        if tokens > max_tokens:
+            if current:
+                pieces.append(joiner.join(current))
+                current, current_tokens = [], 0
+            pieces.extend(_split_to_fit(part, max_tokens, model))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(joiner.join(current))
+            current, current_tokens = [], 0
+        current.append(part)
+        current_tokens += tokens
+    
+    if current:
+        pieces.append(joiner.join(current))
+    return pieces
@@ -0,0 +1,160 @@
+"""
+Document fingerprint module for spotting near-duplicate documents before AI analysis.
+
+Teams upload the same guide in several revisions. Every document's text is
+reduced to shingles (hashes of overlapping five-word runs) and a MinHash
+sketch: the MINHASH_SIZE smallest shingle hashes. Comparing two sketches
+estimates the Jaccard similarity of the shingle sets without the texts, so
+candidates are cheap to find; a candidate is then confirmed with the exact
+Jaccard similarity of the two texts.
+
+Sketches are kept per game in document_fingerprints.json, keyed by filename
+and the SHA-256 of the extracted text. The size and mtime of the document a
+sketch was made from are kept too, so an unchanged document's sketch can be
+compared without loading its text.
+"""
+
+import os
+import re
+import json
+import hashlib
+import tempfile
+
+
+FINGERPRINT_VERSION = 1
+
+FINGERPRINTS_FILENAME = "document_fingerprints.json"
+
+# Words per shingle
+SHINGLE_WORDS = 5
+
+# Shingle hashes kept in a sketch
+MINHASH_SIZE = 256
+
+# A document at least this similar to an analyzed one reuses its analysis
+NEAR_DUPLICATE_SIMILARITY = 0.95
+
+# Sketch estimates at or above this are confirmed with the exact similarity
+CANDIDATE_SIMILARITY = 0.8
+
+WORD_RE = re.compile(r'\w+')
+
+
+def shingles(text):
+    """Set of 64-bit hashes of the text's overlapping SHINGLE_WORDS-word runs (case-insensitive)."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        words = words + [""] * (SHINGLE_WORDS - len(words))
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode('utf-8'),
+                                       digest_size=8).digest(), 'big')
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash(shingle_set):
+    """MinHash sketch of a shingle set: its MINHASH_SIZE smallest hashes, ascending."""
+    return sorted(shingle_set)[:MINHASH_SIZE]
+
+
+def estimate_similarity(sketch_a, sketch_b):
+    """Jaccard similarity estimated from two sketches.
+
+    Of the MINHASH_SIZE smallest hashes of both sketches together, the share
+    found in both is an unbiased estimate of the Jaccard similarity.
+    """
+    if not sketch_a or not sketch_b:
+        return 0.0
+    union = sorted(set(sketch_a) | set(sketch_b))[:MINHASH_SIZE]
+    a, b = set(sketch_a), set(sketch_b)
+    return sum(1 for h in union if h in a and h in b) / len(union)
+
+
+def jaccard(shingles_a, shingles_b):
+    """Exact Jaccard similarity of two shingle sets."""
+    if not shingles_a and not shingles_b:
+        return 1.0
+    return len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class FingerprintStore:
+    """MinHash sketches of a game's documents, by filename and text hash."""
+    
+    def __init__(self, game_path):
+        self.store_file = os.path.join(game_path, FINGERPRINTS_FILENAME)
+        self.entries = self._load()
+    
+    def sketch(self, filename, text, file_path=None):
+        """Sketch of a document's text, computed and saved if not stored for this text.
+        
+        Args:
+            file_path: The document the text came from; its size and mtime are
+                saved with the sketch for stored_sketch
+        """
+        digest = text_digest(text)
+        source = _source_stat(file_path)
+        record = self.entries.get(filename)
+        if record and record.get("sha256") == digest:
+            if source and record.get("source") != source:
+                record["source"] = source
+                self._save()
+            return record["minhash"]
+        
+        shingle_set = shingles(text)
+        record = {"sha256": digest, "shingles": len(shingle_set), "minhash": minhash(shingle_set)}
+        if source:
+            record["source"] = source
+        self.entries[filename] = record
+        self._save()
+        return record["minhash"]
+    
+    def stored_sketch(self, filename, file_path):
+        """Saved sketch of a document, or None if the document changed since (or was never) sketched."""
+        record = self.entries.get(filename)
+        source = _source_stat(file_path)
+        if record and source and record.get("source") == source:
+            return record["minhash"]
+        return None
+    
+    def remove(self, filename):
+        if self.entries.pop(filename, None) is not None:
+            self._save()
+    
+    def _load(self):
+        """Load the sketches; a missing, damaged or outdated file starts empty."""
+        try:
+            with open(self.store_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == FINGERPRINT_VERSION:
+                return data.get("documents", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+    
+    def _save(self):
+        """Write the sketches atomically."""
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.store_file), suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": FINGERPRINT_VERSION, "documents": self.entries}, f)
+            os.replace(tmp_path, self.store_file)
+        except OSError as e:
+            print(f"Error saving document fingerprints: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def _source_stat(file_path):
+    """[size, mtime_ns] of a document, or None if there is none to stat."""
+    if not file_path:
+        return None
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
@@ -0,0 +1,138 @@
+"""
+Document ingest module for onboarding a batch of documents into a game.
+
+A batch is a folder, a glob pattern or a single file. Every document goes
+through the stages upload -> extract -> analyze; GameManager runs several
+documents at once on a bounded worker pool, so one document can be analyzed
+while the next is still being extracted.
+
+Progress is kept in a journal next to the game's documents (ingest_journal.json):
+per source file its size and mtime and the stages it has finished. Running
+the same batch again, e.g. after an interruption, skips every stage that is
+already done for an unchanged source file.
+"""
+
+import os
+import glob
+import json
+import tempfile
+import threading
+from datetime import datetime
+
+from downloads_manifest import DOCUMENT_EXTENSIONS
+
+
+JOURNAL_VERSION = 1
+
+JOURNAL_FILENAME = "ingest_journal.json"
+
+STAGE_UPLOAD = "upload"
+STAGE_EXTRACT = "extract"
+STAGE_ANALYZE = "analyze"
+STAGES = (STAGE_UPLOAD, STAGE_EXTRACT, STAGE_ANALYZE)
+
+
+class IngestJournal:
+    """Finished ingest stages of a game's source documents, saved after every stage."""
+    
+    def __init__(self, game_path):
+        self.journal_file = os.path.join(game_path, JOURNAL_FILENAME)
+        self.entries = self._load()
+        self._lock = threading.Lock()
+    
+    def completed_stages(self, source_file):
+        """Stages already finished for source_file; empty if it changed since."""
+        try:
+            stat = os.stat(source_file)
+        except OSError:
+            return []
+        record = self.entries.get(os.path.abspath(source_file))
+        if not record or record.get("size") != stat.st_size or record.get("mtime_ns") != stat.st_mtime_ns:
+            return []
+        return list(record.get("stages", {}))
+    
+    def mark_done(self, source_file, filename, stage):
+        """Record a finished stage (a changed source file starts a fresh record)."""
+        self._update(source_file, filename, stage=stage)
+    
+    def mark_failed(self, source_file, filename, stage, error):
+        """Record a failed stage, also for a source file that is gone or unreadable."""
+        self._update(source_file, filename, error={"stage": stage, "message": str(error),
+                                                   "at": datetime.now().isoformat()})
+    
+    def _update(self, source_file, filename, stage=None, error=None):
+        path = os.path.abspath(source_file)
+        try:
+            stat = os.stat(source_file)
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            if stage:
+                raise
+            size = mtime_ns = None
+        with self._lock:
+            record = self.entries.get(path)
+            if not record or record.get("size") != size or record.get("mtime_ns") != mtime_ns:
+                record = {"filename": filename, "size": size, "mtime_ns": mtime_ns, "stages": {}}
+                self.entries[path] = record
+            if stage:
+                record["stages"][stage] = datetime.now().isoformat()
+                record.pop("error", None)
+            if error:
+                record["error"] = error
+            self._save()
+    
+    def _load(self):
+        """Load the journal; a missing, damaged or outdated one starts empty."""
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == JOURNAL_VERSION:
+                return data.get("sources", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+    
+    def _save(self):
+        """Write the journal atomically, so an interrupted batch never leaves it half written."""
+        tmp_path = None
+        try:
+            directory = os.path.dirname(self.journal_file)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": JOURNAL_VERSION, "sources": self.entries}, f, indent=4)
+            os.replace(tmp_path, self.journal_file)
+        except OSError as e:
+            print(f"Error saving ingest journal: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def find_documents(source):
+    """Documents named by a folder (not recursive), a glob pattern or a single file.
+
+    Returns:
+        (sorted list of document paths, list of paths skipped because another
+        document in the batch has the same filename)
+    """
+    source = os.path.expanduser(source.strip().strip('"').strip("'"))
+    if os.path.isdir(source):
+        candidates = [os.path.join(source, name) for name in os.listdir(source)]
+    elif glob.has_magic(source):
+        candidates = glob.glob(source, recursive=True)
+    else:
+        candidates = [source]
+    
+    documents = []
+    skipped = []
+    seen = set()
+    for path in sorted(candidates):
+        if not path.lower().endswith(DOCUMENT_EXTENSIONS) or not os.path.isfile(path):
+            continue
+        # Documents are stored by filename, so the first of several same-named files wins
+        filename = os.path.basename(path)
+        if filename in seen:
+            skipped.append(path)
+            continue
+        seen.add(filename)
+        documents.append(path)
+    return documents, skipped
@@ -0,0 +1,168 @@
+"""
+Document text cache module for parsing each uploaded document only once.
+
+The text extracted from a game's documents is kept next to documents/ in
+document_text/:
+- <sha256>.txt holds the text of one document content (documents with the
+  same content share it)
+- index.json maps each document filename to its SHA-256, size and mtime,
+  the extraction parameters and how long the extraction took
+
+A document whose size and mtime are unchanged is served without hashing; a
+touched file still hits if its content is the same, once the caller has
+hashed it (file_digest) and passes the digest in. Hashing is left to the
+caller so it can happen outside any lock held around the index.
+Changed extraction parameters (another extractor or page range) miss.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from datetime import datetime
+
+
+CACHE_VERSION = 1
+
+CACHE_DIRNAME = "document_text"
+INDEX_FILENAME = "index.json"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class DocumentTextCache:
+    """Extracted text of a game's documents, by content hash."""
+    
+    def __init__(self, game_path):
+        self.cache_dir = os.path.join(game_path, CACHE_DIRNAME)
+        self.index_file = os.path.join(self.cache_dir, INDEX_FILENAME)
+        self.entries = self._load()
+    
+    def get(self, file_path, parameters, digest=None):
+        """Cached text of a document, or None.
+
+        Args:
+            file_path: The document in the game's documents folder
+            parameters: Extraction parameters the text must have been produced with
+            digest: The document's SHA-256 (None = only an entry whose size and
+                mtime match the file can hit)
+        """
+        filename = os.path.basename(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        
+        record = self.entries.get(filename)
+        if (record and record.get("parameters") == parameters and record.get("size") == stat.st_size
+                and record.get("mtime_ns") == stat.st_mtime_ns and (digest is None or digest == record["sha256"])):
+            return self._read_text(record["sha256"])
+        
+        if digest is None:
+            return None
+        
+        # Same content under a new mtime or another filename
+        for other in self.entries.values():
+            if other["sha256"] == digest and other.get("parameters") == parameters:
+                text = self._read_text(digest)
+                if text is not None:
+                    self._set_entry(filename, dict(other, filename=filename, size=stat.st_size,
+                                                   mtime_ns=stat.st_mtime_ns))
+                return text
+        return None
+    
+    def put(self, file_path, text, parameters, seconds, digest=None):
+        """Store the text extracted from a document.
+
+        Args:
+            digest: The document's SHA-256 if already known (skips hashing)
+
+        Returns:
+            The index record for the document
+        """
+        filename = os.path.basename(file_path)
+        stat = os.stat(file_path)
+        digest = digest or file_digest(file_path)
+        
+        self._write(os.path.join(self.cache_dir, f"{digest}.txt"), text)
+        record = {
+            "filename": filename,
+            "sha256": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "parameters": parameters,
+            "characters": len(text),
+            "extracted_at": datetime.now().isoformat(),
+            "extract_seconds": round(seconds, 3)
+        }
+        self._set_entry(filename, record)
+        return record
+    
+    def remove(self, filename):
+        """Forget a document; its text file goes when no other document shares it."""
+        record = self.entries.pop(filename, None)
+        if record is None:
+            return
+        self._drop_text_if_unused(record["sha256"])
+        self._save()
+    
+    def _set_entry(self, filename, record):
+        """Point a document at a record; a text file no document uses any more is deleted."""
+        previous = self.entries.get(filename)
+        self.entries[filename] = record
+        if previous and previous["sha256"] != record["sha256"]:
+            self._drop_text_if_unused(previous["sha256"])
+        self._save()
+    
+    def _drop_text_if_unused(self, digest):
+        if any(other["sha256"] == digest for other in self.entries.values()):
+            return
+        try:
+            os.remove(os.path.join(self.cache_dir, f"{digest}.txt"))
+        except OSError:
+            pass
+    
+    def _read_text(self, digest):
+        try:
+            with open(os.path.join(self.cache_dir, f"{digest}.txt"), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _load(self):
+        """Load the index; a missing, damaged or outdated one starts empty."""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                return data.get("documents", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+    
+    def _save(self):
+        self._write(self.index_file, json.dumps({"version": CACHE_VERSION, "documents": self.entries},
+                                                indent=4, ensure_ascii=False))
+    
+    def _write(self, path, text):
+        """Write a cache file atomically."""
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing document text cache: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def file_digest(file_path):
+    """SHA-256 of a file's content."""
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
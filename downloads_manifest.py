@@ -0,0 +1,209 @@
+"""
+Downloads manifest module for listing world files and documents without rescanning them.
+
+Every file seen in the Downloads folder is remembered by path, size and
+mtime. World archives also get a small "peek" read from their zip central
+directory and a few tiny members:
+- the world name from levelname.txt
+- the name, version and type of every pack manifest.json
+- how many .lang files they carry
+- their total uncompressed size
+
+Unchanged files are served straight from the manifest, so only new or
+modified archives are ever reopened.
+"""
+
+import os
+import json
+import zipfile
+import tempfile
+
+
+MANIFEST_VERSION = 1
+
+WORLD_EXTENSIONS = ('.mcworld', '.mctemplate')
+DOCUMENT_EXTENSIONS = ('.pdf', '.docx', '.doc', '.pptx', '.ppt')
+
+# Members larger than this are never read while peeking
+PEEK_MEMBER_LIMIT = 256 * 1024
+
+
+class DownloadsManifest:
+    """Persistent cache of file listings and world peek metadata."""
+    
+    def __init__(self, manifest_file):
+        self.manifest_file = manifest_file
+        self.entries = self._load()
+    
+    def list_files(self, directory, extensions, peek_worlds=True):
+        """List files in directory with the given extensions, using cached info where unchanged.
+        
+        Args:
+            directory: Folder to list (not recursive)
+            extensions: Lower-case extensions to include
+            peek_worlds: Read world archive metadata for new or changed worlds
+        
+        Returns:
+            list of info dicts sorted by path, each with path, filename,
+            size and modified, plus "world" metadata for world archives
+        """
+        listed = []
+        changed = False
+        
+        try:
+            with os.scandir(directory) as scan:
+                for dir_entry in scan:
+                    if not dir_entry.name.lower().endswith(extensions) or not dir_entry.is_file():
+                        continue
+                    
+                    stat = dir_entry.stat()
+                    path = dir_entry.path
+                    cached = self.entries.get(path)
+                    is_world = dir_entry.name.lower().endswith(WORLD_EXTENSIONS)
+                    
+                    if (cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns
+                            and (not is_world or not peek_worlds or "world" in cached)):
+                        listed.append(cached)
+                        continue
+                    
+                    info = {
+                        "path": path,
+                        "filename": dir_entry.name,
+                        "size": stat.st_size,
+                        "mtime_ns": stat.st_mtime_ns,
+                        "modified": stat.st_mtime
+                    }
+                    if is_world and peek_worlds:
+                        info["world"] = peek_world_file(path)
+                    
+                    self.entries[path] = info
+                    listed.append(info)
+                    changed = True
+        except OSError:
+            return []
+        
+        # Forget files that have left this folder
+        listed_paths = {info["path"] for info in listed}
+        for path in [p for p in self.entries
+                     if os.path.dirname(p) == directory and p.lower().endswith(extensions)]:
+            if path not in listed_paths:
+                del self.entries[path]
+                changed = True
+        
+        if changed:
+            self._save()
+        
+        return sorted(listed, key=lambda info: info["path"])
+    
+    def _load(self):
+        """Load the manifest; a missing, damaged or outdated one starts empty."""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                return data.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+    
+    def _save(self):
+        """Write the manifest atomically."""
+        directory = os.path.dirname(self.manifest_file)
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": MANIFEST_VERSION, "files": self.entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_file)
+        except OSError as e:
+            print(f"Error saving downloads manifest: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def peek_world_file(world_file_path):
+    """Read summary metadata from a world archive without extracting it.
+    
+    Returns:
+        dict with level_name, packs (name, version, type), lang_files,
+        uncompressed_size and file_count, or an "error" on a bad archive
+    """
+    try:
+        with zipfile.ZipFile(world_file_path, 'r') as zip_ref:
+            infos = zip_ref.infolist()
+            level_name = None
+            packs = []
+            
+            # Shallowest levelname.txt is the world's own
+            level_files = sorted((i for i in infos if i.filename.split('/')[-1] == 'levelname.txt'),
+                                 key=lambda i: i.filename.count('/'))
+            if level_files and level_files[0].file_size <= PEEK_MEMBER_LIMIT:
+                level_name = zip_ref.read(level_files[0]).decode('utf-8', errors='ignore').strip()
+            
+            for info in infos:
+                if info.filename.split('/')[-1] != 'manifest.json' or info.file_size > PEEK_MEMBER_LIMIT:
+                    continue
+                pack = _read_pack_manifest(zip_ref, info)
+                if pack:
+                    packs.append(pack)
+            
+            return {
+                "level_name": level_name,
+                "packs": packs,
+                "lang_files": sum(1 for i in infos if i.filename.endswith('.lang')),
+                "uncompressed_size": sum(i.file_size for i in infos),
+                "file_count": len(infos)
+            }
+    except (zipfile.BadZipFile, OSError) as e:
+        return {"error": str(e)}
+
+
+def _read_pack_manifest(zip_ref, info):
+    """Return name/version/type of one pack manifest.json, or None if unreadable."""
+    try:
+        manifest = json.loads(zip_ref.read(info).decode('utf-8-sig', errors='ignore'))
+        header = manifest.get("header", {})
+        modules = manifest.get("modules") or [{}]
+        version = header.get("version")
+        if isinstance(version, list):
+            version = '.'.join(str(part) for part in version)
+        
+        return {
+            "path": info.filename,
+            "name": header.get("name"),
+            "version": version,
+            "type": modules[0].get("type") if isinstance(modules[0], dict) else None
+        }
+    except (ValueError, AttributeError, IndexError, zipfile.BadZipFile, OSError):
+        return None
+
+
+def format_size(num_bytes):
+    """Format a byte count for display (e.g. "12.4 MB")."""
+    size = float(num_bytes or 0)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def describe_world(info):
+    """One-line summary of a world file for pickers."""
+    world = info.get("world") or {}
+    if "error" in world:
+        return f"{format_size(info['size'])}, unreadable archive"
+    
+    parts = []
+    if world.get("level_name"):
+        parts.append(f'"{world["level_name"]}"')
+    packs = [p for p in world.get("packs", []) if p.get("type") in ("data", "resources")]
+    if packs:
+        parts.append(f"{len(packs)} pack(s): " + ", ".join(
+            f"{p['name']} {p['version']}" if p.get("version") else str(p['name']) for p in packs[:3]
+        ) + (" ..." if len(packs) > 3 else ""))
+    if world:
+        parts.append(f"{world.get('lang_files', 0)} lang file(s)")
+        parts.append(f"{format_size(world.get('uncompressed_size'))} unpacked")
+    parts.append(f"{format_size(info['size'])} file")
+    return ", ".join(parts)
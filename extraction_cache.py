@@ -0,0 +1,111 @@
+"""
+Extraction cache module for reusing lang scan results across repeat extractions.
+
+Entries are content addressed:
+- whole archives by SHA-256, so an unchanged world file skips the scan entirely
+- individual .lang members by path + CRC32 + size from the zip central directory,
+  so a world with one changed pack only rescans that pack's files
+
+Every record is its own small JSON file written atomically, which keeps the
+cache safe to share between the worker processes of a multi-world scan.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+
+
+# Bump when the scoring rules or the record layout change
+CACHE_VERSION = 1
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ExtractionCache:
+    """Persistent, content-addressed cache of lang extraction results."""
+    
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.join(cache_dir, f"extraction_v{CACHE_VERSION}")
+        for sub in ("archives", "members", "lang", "digests"):
+            os.makedirs(os.path.join(self.cache_dir, sub), exist_ok=True)
+    
+    def archive_digest(self, archive_path):
+        """Return the SHA-256 of an archive.
+        The digest is remembered against the file's size and mtime, so an
+        unchanged file is not re-hashed on the next extraction."""
+        stat = os.stat(archive_path)
+        memo_name = hashlib.sha1(os.path.abspath(archive_path).encode('utf-8')).hexdigest()
+        memo_path = os.path.join(self.cache_dir, "digests", f"{memo_name}.json")
+        
+        memo = self._read_json(memo_path)
+        if memo and memo.get("size") == stat.st_size and memo.get("mtime_ns") == stat.st_mtime_ns:
+            return memo["sha256"]
+        
+        sha = hashlib.sha256()
+        with open(archive_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        
+        self._write_json(memo_path, {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest
+        })
+        return digest
+    
+    def get_archive(self, digest):
+        """Return the cached scan result for an archive digest, or None."""
+        return self._read_json(os.path.join(self.cache_dir, "archives", f"{digest}.json"))
+    
+    def put_archive(self, digest, result):
+        """Cache an archive scan result (without its lang data, which lives in the member store)."""
+        record = {k: v for k, v in result.items() if k != "data"}
+        self._write_json(os.path.join(self.cache_dir, "archives", f"{digest}.json"), record)
+    
+    def get_member(self, member_path, crc, size):
+        """Return the cached {score, entries} for a .lang member, or None."""
+        return self._read_json(self._member_file(member_path, crc, size))
+    
+    def put_member(self, member_path, crc, size, score, entries):
+        """Cache the score and entry count of a .lang member."""
+        self._write_json(self._member_file(member_path, crc, size), {
+            "path": member_path,
+            "score": score,
+            "entries": entries
+        })
+    
+    def get_lang_data(self, crc, size):
+        """Return the cached parsed entries of a .lang member, or None."""
+        return self._read_json(os.path.join(self.cache_dir, "lang", f"{crc:08x}-{size}.json"))
+    
+    def put_lang_data(self, crc, size, lang_data):
+        """Cache the parsed entries of a .lang member (only winners are stored)."""
+        self._write_json(os.path.join(self.cache_dir, "lang", f"{crc:08x}-{size}.json"), lang_data)
+    
+    def _member_file(self, member_path, crc, size):
+        """Path scores depend on the member path, so the path is part of the key."""
+        key = hashlib.sha1(f"{member_path}\0{crc}\0{size}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, "members", f"{key}.json")
+    
+    def _read_json(self, path):
+        """Read a cache record; a missing or damaged record is simply a miss."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _write_json(self, path, data):
+        """Write a cache record atomically so concurrent readers never see partial files."""
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error writing extraction cache: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
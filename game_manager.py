@@ -10,6 +10,83 @@ import tempfile
 import mimetypes
 from datetime import datetime
 import re
+import time
+import threading
+
+import lang_scanner
+import lang_store
+import lang_tokenizer
+import lang_sampler
+import lang_readability
+import lang_index
+import prompt_packer
+import document_chunker
+import document_ingest
+import document_fingerprint
+import search_index
+import passage_retrieval
+import ai_client
+import pdf_extractor
+import ooxml_extractor
+from document_text_cache import DocumentTextCache, file_digest, CACHE_DIRNAME as DOCUMENT_TEXT_DIRNAME
+from blob_store import BlobStore, BLOB_STORE_DIRNAME
+from downloads_manifest import DownloadsManifest, WORLD_EXTENSIONS, DOCUMENT_EXTENSIONS
+
+
+# JSON files in a game's lang folder that are not lang data themselves
+LANG_SIDECAR_FILES = ('extraction_analysis.json', 'lang_sources.json', 'lang_delta.json',
+                      'lang_structured.json', 'lang_index.json', 'lang_analyzed.json')
+
+# Most removed keys listed, and estimated prompt tokens of added/changed
+# entries sent, when re-analyzing only a lang delta
+LANG_DELTA_SAMPLE_LIMIT = 200
+LANG_DELTA_SAMPLE_TOKENS = 6000
+
+# Hardest-to-read lang entries quoted in the text complexity analysis
+READABILITY_WORST_ENTRIES = 25
+
+# How each document type is turned into text; part of the document text
+# cache key, so changing an extractor re-parses the affected documents
+DOCUMENT_TEXT_EXTRACTORS = {
+    '.pdf': "PyPDF2 pages",
+    '.docx': "OOXML stream with tables",
+    '.doc': "OOXML stream with tables",
+    '.pptx': "OOXML stream with tables and notes",
+    '.ppt': "OOXML stream with tables and notes"
+}
+
+# Documents longer than this (estimated tokens) are analyzed in section-aware
+# chunks, then merged (overridable with the "document_chunk_tokens" setting)
+DOCUMENT_CHUNK_TOKENS = 6000
+
+# Map-reduce lang analysis: estimated prompt tokens of entries per chunk and
+# concurrent chunk requests (overridable with the "lang_chunk_tokens" and
+# "analysis_parallelism" settings)
+LANG_CHUNK_TOKENS = 6000
+ANALYSIS_PARALLELISM = 4
+
+# Per-game BM25 index of the passages retrieved into create_* prompts
+PASSAGE_INDEX_FILENAME = "passage_index.json"
+
+# The resource types generated by create_all: (key, label, GameManager method)
+CREATION_TYPES = (
+    ("student_guide", "Student Guide", "create_student_guide"),
+    ("student_workbook", "Student Workbook", "create_student_workbook"),
+    ("student_quiz", "Student Quiz", "create_student_quiz"),
+    ("parent_guide", "Parent Guide", "create_parent_guide"),
+    ("teacher_guide", "Teacher Guide", "create_teacher_guide"),
+    ("leadership_sheet", "School Leadership Sheet", "create_leadership_sheet"),
+    ("curriculum_mapping", "Curriculum Standards Mapping", "create_curriculum_mapping"),
+    ("text_complexity", "Text Complexity Analysis", "create_text_complexity_analysis")
+)
+
+# Creations generated at once by create_all: all of them by default, lower it
+# for deployments with tight rate limits ("creation_concurrency" setting)
+CREATION_CONCURRENCY = 8
+
+# Documents uploaded, extracted and analyzed at once by a batch ingest
+# (overridable with the "ingest_workers" setting)
+INGEST_WORKERS = 3
 
 
 class GameManager:
@@ -20,6 +97,13 @@ class GameManager:
         # Store games in the same directory as the application
         app_dir = os.path.dirname(os.path.abspath(__file__))
         self.games_dir = os.path.join(app_dir, "games")
+        # Extraction cache lives next to the settings, outside the games folder
+        self.cache_dir = os.path.join(os.path.expanduser("~"), ".educontent", "cache")
+        self._search_index = None
+        # {passage index file: SearchIndex}, shared by concurrent creations
+        self._passage_indexes = {}
+        # Serializes read-modify-write of a game's JSON files when documents are ingested concurrently
+        self._metadata_lock = threading.RLock()
         self._ensure_games_dir()
     
     def _ensure_games_dir(self):
@@ -62,6 +146,7 @@ class GameManager:
         
         try:
             shutil.rmtree(game_path)
+            self._reclaim_blobs()
             return True
         except Exception as e:
             print(f"Error deleting game folder: {e}")
@@ -71,28 +156,73 @@ class GameManager:
         """List all game folders."""
         try:
             games = [d for d in os.listdir(self.games_dir) 
-                    if os.path.isdir(os.path.join(self.games_dir, d))]
+                    if os.path.isdir(os.path.join(self.games_dir, d)) and d != BLOB_STORE_DIRNAME]
             return sorted(games)
         except OSError:
             return []
     
     def list_world_files_in_downloads(self):
         """List all .mcworld and .mctemplate files in the Downloads folder."""
+        return [info["path"] for info in self.list_world_files_in_downloads_with_info()]
+    
+    def list_world_files_in_downloads_with_info(self):
+        """List world files in the Downloads folder with their cached peek metadata.
+        Only new or changed archives are opened; see downloads_manifest."""
         downloads_dir = os.path.join(os.path.expanduser("~"), "Downloads")
         
         if not os.path.exists(downloads_dir):
             return []
         
-        try:
-            world_files = []
-            for file in os.listdir(downloads_dir):
-                if file.endswith(('.mcworld', '.mctemplate')):
-                    full_path = os.path.join(downloads_dir, file)
-                    if os.path.isfile(full_path):
-                        world_files.append(full_path)
-            return sorted(world_files)
-        except OSError:
-            return []
+        return self._downloads_manifest().list_files(downloads_dir, WORLD_EXTENSIONS)
+    
+    def _downloads_manifest(self):
+        """Load the Downloads manifest kept alongside the extraction cache."""
+        return DownloadsManifest(os.path.join(self.cache_dir, "downloads_manifest.json"))
+    
+    def update_search_index(self):
+        """Re-index the artifacts of every game that changed since the last update.
+        
+        Returns:
+            dict with files, files_indexed, files_removed, documents and terms
+        """
+        index_file = os.path.join(self.cache_dir, "search_index.json")
+        if self._search_index is None or self._search_index.games_dir != os.path.abspath(self.games_dir):
+            self._search_index = search_index.SearchIndex(index_file, self.games_dir)
+        return self._search_index.update(self._search_sources())
+    
+    def search_games(self, query, limit=20, game_name=None):
+        """Full-text search over every game's lang entries, analyses, info and creations.
+        
+        Returns:
+            list of {"game", "path", "kind", "label", "score", "snippet"}, best first
+        """
+        self.update_search_index()
+        return self._search_index.search(query, limit=limit, game=game_name)
+    
+    def _search_sources(self):
+        """{path relative to the games folder: kind} of every searchable file."""
+        sources = {}
+        for game_name in self.list_games():
+            game_path = os.path.join(self.games_dir, game_name)
+            
+            lang_dir = os.path.join(game_path, "lang")
+            if os.path.isdir(lang_dir):
+                for filename in self._find_lang_json_files(lang_dir)[:1]:
+                    sources[os.path.join(game_name, "lang", filename)] = search_index.KIND_LANG
+            
+            if os.path.exists(os.path.join(game_path, "document_analysis.json")):
+                sources[os.path.join(game_name, "document_analysis.json")] = search_index.KIND_DOCUMENTS
+            
+            for info_type in ("context", "gameplay", "objectives"):
+                if os.path.exists(os.path.join(game_path, f"{info_type}.json")):
+                    sources[os.path.join(game_name, f"{info_type}.json")] = search_index.KIND_INFO
+            
+            creations_dir = os.path.join(game_path, "creations")
+            if os.path.isdir(creations_dir):
+                for filename in sorted(os.listdir(creations_dir)):
+                    if filename.endswith('.md'):
+                        sources[os.path.join(game_name, "creations", filename)] = search_index.KIND_CREATION
+        return sources
     
     def upload_world_file(self, game_name, source_file):
         """Upload a world file to a game folder."""
@@ -113,9 +243,9 @@ class GameManager:
             if not os.path.exists(worlds_dir):
                 os.makedirs(worlds_dir)
             
-            # Copy the file
+            # Link the file from the shared blob store
             destination = os.path.join(worlds_dir, filename)
-            shutil.copy2(source_file, destination)
+            self._store_upload(source_file, destination)
             
             # Update metadata with world file info
             self._add_world_file_to_metadata(game_name, filename)
@@ -125,6 +255,34 @@ class GameManager:
             print(f"Error uploading world file: {e}")
             return False
     
+    def _store_upload(self, source_file, destination):
+        """Place an uploaded file in a game folder via the content-addressed blob store.
+        Identical files uploaded to several games share one copy on disk."""
+        replacing = os.path.lexists(destination)
+        try:
+            stored = BlobStore(self.games_dir).add_file(source_file, destination)
+        except OSError as e:
+            print(f"Blob store unavailable ({e}), copying file")
+            shutil.copy2(source_file, destination)
+            return None
+        
+        # The file it replaced may have been the last user of its blob
+        if replacing:
+            self._reclaim_blobs()
+        return stored
+    
+    def _reclaim_blobs(self):
+        """Free the blobs no game file uses any more (after a delete or replacement)."""
+        try:
+            reclaimed = BlobStore(self.games_dir).reclaim()
+        except OSError as e:
+            print(f"Error reclaiming blob store space: {e}")
+            return None
+        if reclaimed["objects_removed"]:
+            print(f"Freed {reclaimed['bytes_freed']} bytes from {reclaimed['objects_removed']} "
+                  f"unused stored file(s)")
+        return reclaimed
+    
     def _add_world_file_to_metadata(self, game_name, filename):
         """Add world file information to game metadata."""
         game_path = os.path.join(self.games_dir, game_name)
@@ -845,15 +1003,9 @@ class GameManager:
             return None
         
         try:
-            from openai import AzureOpenAI
-            
             config = self.settings.get_azure_config()
             
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             # Create appropriate prompt based on enhancement type
             prompts = {
@@ -887,8 +1039,6 @@ class GameManager:
             return None
         
         try:
-            from openai import AzureOpenAI
-            
             # Gather available data
             info = self.load_game_info(game_name)
             if not info:
@@ -900,7 +1050,7 @@ class GameManager:
             # Add existing gameplay if available (to maintain coherence)
             if "gameplay" in info and info["gameplay"]:
                 prompt_parts.append(f"""EXISTING GAMEPLAY DESCRIPTION:
-{info["gameplay"][:1500]}""")
+{info["gameplay"]}""")
             
             # Add language file analysis if available
             if "lang_analysis" in info and info["lang_analysis"]:
@@ -911,7 +1061,7 @@ class GameManager:
                     lang_text = str(lang_analysis)
                 
                 prompt_parts.append(f"""LANGUAGE FILE ANALYSIS (NPC dialogue and in-game narrative):
-{lang_text[:2000]}""")
+{lang_text}""")
             
             # Add document analysis if available
             if "document_analysis" in info and info["document_analysis"]:
@@ -924,18 +1074,16 @@ class GameManager:
                             analysis_text = str(doc_data)
                         
                         prompt_parts.append(f"""DOCUMENT: {doc_name}
-{analysis_text[:2000]}""")
+{analysis_text}""")
             
             if not prompt_parts:
                 return None
+            # Each part is a section of the prompt, named by its heading line
+            sections = {part.split("\n", 1)[0]: part for part in prompt_parts}
             
             config = self.settings.get_azure_config()
             
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             full_prompt = f"""Based on the following information from a Minecraft Education game, generate a comprehensive game context that includes:
 
@@ -947,14 +1095,17 @@ class GameManager:
 
 Available Information:
 
-{chr(10).join(prompt_parts)}
+{chr(10).join(prompt_packer.mark_sections(sections).values())}
 
 IMPORTANT: If an existing gameplay description is provided above, ensure the game context aligns with and frames that gameplay appropriately. Generate a well-structured game context that synthesizes this information into a cohesive educational narrative."""
             
+            system_message = "You are an expert in educational game design and Minecraft Education. Create comprehensive, well-organized game context descriptions that clearly communicate the educational value and gameplay experience."
+            full_prompt = self._pack_prompt(full_prompt, sections, system_message, 1500)
+            
             response = client.chat.completions.create(
                 model=config['deployment'],
                 messages=[
-                    {"role": "system", "content": "You are an expert in educational game design and Minecraft Education. Create comprehensive, well-organized game context descriptions that clearly communicate the educational value and gameplay experience."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": full_prompt}
                 ],
                 temperature=0.6,
@@ -974,8 +1125,6 @@ IMPORTANT: If an existing gameplay description is provided above, ensure the gam
             return None
         
         try:
-            from openai import AzureOpenAI
-            
             # Gather available data
             info = self.load_game_info(game_name)
             if not info:
@@ -987,7 +1136,7 @@ IMPORTANT: If an existing gameplay description is provided above, ensure the gam
             # Add existing context if available (to maintain coherence)
             if "context" in info and info["context"]:
                 prompt_parts.append(f"""EXISTING GAME CONTEXT:
-{info["context"][:1500]}""")
+{info["context"]}""")
             
             # Add language file analysis if available
             if "lang_analysis" in info and info["lang_analysis"]:
@@ -998,7 +1147,7 @@ IMPORTANT: If an existing gameplay description is provided above, ensure the gam
                     lang_text = str(lang_analysis)
                 
                 prompt_parts.append(f"""LANGUAGE FILE ANALYSIS (NPC dialogue and in-game narrative):
-{lang_text[:2000]}""")
+{lang_text}""")
             
             # Add document analysis if available
             if "document_analysis" in info and info["document_analysis"]:
@@ -1011,18 +1160,16 @@ IMPORTANT: If an existing gameplay description is provided above, ensure the gam
                             analysis_text = str(doc_data)
                         
                         prompt_parts.append(f"""DOCUMENT: {doc_name}
-{analysis_text[:2000]}""")
+{analysis_text}""")
             
             if not prompt_parts:
                 return None
+            # Each part is a section of the prompt, named by its heading line
+            sections = {part.split("\n", 1)[0]: part for part in prompt_parts}
             
             config = self.settings.get_azure_config()
             
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             full_prompt = f"""Based on the following information from a Minecraft Education game, generate a comprehensive gameplay description that includes:
 
@@ -1034,14 +1181,17 @@ IMPORTANT: If an existing gameplay description is provided above, ensure the gam
 
 Available Information:
 
-{chr(10).join(prompt_parts)}
+{chr(10).join(prompt_packer.mark_sections(sections).values())}
 
 IMPORTANT: If an existing game context is provided above, ensure the gameplay description aligns with and supports that educational context. Generate a detailed gameplay description that clearly explains what players will do, how they'll interact with the game world, and how the mechanics support the learning objectives."""
             
+            system_message = "You are an expert in game design and educational technology, specializing in Minecraft Education. Create clear, detailed gameplay descriptions that explain mechanics, player actions, and learning integration."
+            full_prompt = self._pack_prompt(full_prompt, sections, system_message, 1500)
+            
             response = client.chat.completions.create(
                 model=config['deployment'],
                 messages=[
-                    {"role": "system", "content": "You are an expert in game design and educational technology, specializing in Minecraft Education. Create clear, detailed gameplay descriptions that explain mechanics, player actions, and learning integration."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": full_prompt}
                 ],
                 temperature=0.6,
@@ -1061,15 +1211,9 @@ IMPORTANT: If an existing game context is provided above, ensure the gameplay de
             return None
         
         try:
-            from openai import AzureOpenAI
-            
             config = self.settings.get_azure_config()
             
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             # Create standardization prompts for consistency
             prompts = {
@@ -1122,21 +1266,19 @@ Current objectives:
             print(f"Error standardizing with AI: {e}")
             return None
     
+    def ai_connection_stats(self):
+        """Requests made through the shared AI client and how many reused a pooled connection."""
+        return ai_client.connection_stats()
+    
     def test_azure_connection(self):
         """Test Azure OpenAI connection."""
         if not self.settings.is_configured():
             return False
         
         try:
-            from openai import AzureOpenAI
-            
             config = self.settings.get_azure_config()
             
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             response = client.chat.completions.create(
                 model=config['deployment'],
@@ -1152,9 +1294,29 @@ Current objectives:
             print(f"Connection test failed: {e}")
             return False
     
-    def extract_lang_files(self, game_name):
+    def extract_lang_files(self, game_name, streaming=True, all_worlds=True, max_workers=None, use_cache=True,
+                           locale_store=True):
         """Extract language files (US/GB only) from uploaded .mcworld or .mctemplate files.
-        Searches entire archive structure and intelligently selects the file most likely to contain NPC text."""
+        Searches entire archive structure and intelligently selects the file most likely to contain NPC text.
+        
+        Args:
+            game_name: Name of the game
+            streaming: Score candidates line by line straight from the zip stream,
+                keeping only the running best, and re-read the winner at the end.
+                Peak memory then depends on the largest candidate rather than on
+                the total size of all candidates. Set to False for the legacy
+                load-everything scan.
+            all_worlds: Scan every uploaded world file (in a process pool when
+                there are several) and merge them into one lang store. When
+                False only the first world file is used.
+            max_workers: Process pool size for multi-world scans (default: CPU count)
+            use_cache: Reuse earlier scans of identical world files and .lang
+                members from the content-addressed extraction cache, and skip
+                rewriting the lang outputs when nothing has changed
+            locale_store: Also write every locale to lang/lang_store.bin (see
+                open_lang_store). It is streamed from the world files after the
+                scan and only rebuilt when the world files change.
+        """
         game_path = os.path.join(self.games_dir, game_name)
         worlds_dir = os.path.join(game_path, "worlds")
         
@@ -1162,190 +1324,354 @@ Current objectives:
             return {"success": False, "error": "No worlds directory found"}
         
         # Get all world files
-        world_files = [f for f in os.listdir(worlds_dir) 
-                      if f.endswith(('.mcworld', '.mctemplate'))]
+        world_files = sorted(f for f in os.listdir(worlds_dir)
+                             if f.endswith(('.mcworld', '.mctemplate')))
         
         if not world_files:
             return {"success": False, "error": "No world files found"}
         
+        if not all_worlds:
+            world_files = world_files[:1]
+        
         # Create lang directory if it doesn't exist
         lang_dir = os.path.join(game_path, "lang")
         if not os.path.exists(lang_dir):
             os.makedirs(lang_dir)
         
-        # Try to extract lang files from the first world file
-        world_file_path = os.path.join(worlds_dir, world_files[0])
+        scan_started = time.perf_counter()
+        
+        world_paths = [os.path.join(worlds_dir, f) for f in world_files]
+        results = lang_scanner.scan_world_archives(
+            world_paths,
+            streaming=streaming,
+            max_workers=max_workers,
+            cache_dir=self.cache_dir if use_cache else None
+        )
+        
+        succeeded = [r for r in results if r["success"]]
+        if not succeeded:
+            # Report the first archive's error, as the single-world scan always has
+            return {"success": False, "error": results[0]["error"]}
         
         try:
-            with zipfile.ZipFile(world_file_path, 'r') as zip_ref:
-                # Search for ALL .lang files in the entire archive structure
-                all_files = zip_ref.namelist()
-                lang_files = [f for f in all_files if f.endswith('.lang')]
-                
-                if not lang_files:
-                    return {"success": False, "error": "No .lang files found in world archive"}
-                
-                # Filter for en_US and en_GB only
-                preferred_langs = ['en_US.lang', 'en_GB.lang']
-                us_gb_files = []
-                
-                for lang_file in lang_files:
-                    for pref_lang in preferred_langs:
-                        if lang_file.endswith(pref_lang):
-                            us_gb_files.append(lang_file)
-                            break
-                
-                if not us_gb_files:
-                    return {"success": False, "error": "No en_US or en_GB language files found"}
-                
-                # Analyze each lang file to find the one with most NPC/dialogue content
-                best_file = None
-                best_score = 0
-                best_lang = None
-                all_candidates = []
-                
-                for lang_file_path in us_gb_files:
-                    try:
-                        lang_content = zip_ref.read(lang_file_path).decode('utf-8', errors='ignore')
-                        lang_data = {}
-                        
-                        for line in lang_content.split('\n'):
-                            line = line.strip()
-                            if line and not line.startswith('#') and '=' in line:
-                                key, value = line.split('=', 1)
-                                lang_data[key.strip()] = value.strip()
-                        
-                        # Score this file based on likelihood of containing NPC text
-                        score = self._score_lang_file_for_npc_content(lang_data, lang_file_path)
-                        
-                        all_candidates.append({
-                            'path': lang_file_path,
-                            'score': score,
-                            'entries': len(lang_data),
-                            'data': lang_data
-                        })
-                        
-                        if score > best_score:
-                            best_score = score
-                            best_file = lang_file_path
-                            best_lang = lang_data
-                    
-                    except Exception as e:
-                        print(f"Error reading {lang_file_path}: {e}")
-                        continue
+            # The best-scoring archive decides the language and wins key conflicts
+            primary = max(succeeded, key=lambda r: r["score"])
+            best_file = primary["selected_file"]
+            best_score = primary["score"]
+            best_lang, sources = lang_scanner.merge_archive_results(results)
                 
-                if not best_file:
-                    return {"success": False, "error": "Could not parse any language files"}
+            scan_stats = {
+                'scan_mode': 'streaming' if streaming else 'full',
+                'archives_scanned': len(results),
+                'elapsed_seconds': round(time.perf_counter() - scan_started, 4),
+                'peak_rss_bytes': lang_scanner.get_peak_rss_bytes(),
+                'peak_worker_rss_bytes': lang_scanner.get_peak_rss_bytes(children=True) if len(results) > 1 else None
+            }
+            
+            # Identifies the exact set of world files the outputs were built from
+            cache_key = [[r["archive"], r.get("sha256")] for r in results] if use_cache else None
+            if use_cache:
+                scan_stats['archive_cache_hits'] = sum(1 for r in succeeded if r.get("cache", {}).get("archive_hit"))
+                scan_stats['member_cache_hits'] = sum(r.get("cache", {}).get("member_hits", 0) for r in succeeded)
+                scan_stats['members_scored'] = sum(r.get("cache", {}).get("members_scored", 0) for r in succeeded)
                 
-                # Extract the best lang file
-                lang_filename = best_file.split('/')[-1]
-                output_file = os.path.join(lang_dir, lang_filename)
+            # Extract the best lang file
+            lang_filename = best_file.split('/')[-1]
+            output_file = os.path.join(lang_dir, lang_filename)
+            json_file = os.path.join(lang_dir, f"{lang_filename.replace('.lang', '.json')}")
+            sources_file = os.path.join(lang_dir, "lang_sources.json")
+            analysis_file = os.path.join(lang_dir, "extraction_analysis.json")
+            store_file = os.path.join(lang_dir, "lang_store.bin")
+            structured_file = os.path.join(lang_dir, "lang_structured.json")
+            index_file = os.path.join(lang_dir, "lang_index.json")
+            
+            previous_analysis = self._load_extraction_analysis(analysis_file)
+            outputs_current = (
+                cache_key is not None
+                and all(r.get("sha256") for r in succeeded)
+                and all(os.path.exists(p) for p in (output_file, json_file, sources_file, structured_file, index_file))
+                and previous_analysis.get('cache_key') == cache_key
+            )
+            # The locale store is keyed on the world files it was built from
+            store_current = (
+                cache_key is not None
+                and os.path.exists(store_file)
+                and (previous_analysis.get('locale_store') or {}).get('source_key') == cache_key
+            )
+            scan_stats['outputs_reused'] = outputs_current
+            
+            if (outputs_current and (store_current or not locale_store)
+                    and all(k in previous_analysis for k in ('candidates', 'tokenizer', 'index'))):
+                # Nothing changed: the outputs and their summaries are those of the previous run
+                scan_stats['locale_store_reused'] = bool(locale_store)
+                self._add_lang_file_to_metadata(game_name, lang_filename, len(best_lang))
+                return self._lang_extraction_result(
+                    previous_analysis, lang_filename, output_file, best_lang, results, scan_stats, None,
+                    previous_analysis.get('locale_store') if locale_store else None)
+            
+            delta_summary = None
+            if not outputs_current:
+                # Diff against the lang data the saved analysis was made from, so the changes
+                # of every extraction since then reach the next delta analysis; without an
+                # analysis, against the previous build's lang data before overwriting it
+                previous_lang, since = self._load_analyzed_lang(lang_dir), "analysis"
+                if previous_lang is None:
+                    previous_lang, since = self._load_previous_lang_data(lang_dir, os.path.basename(json_file)), "extraction"
+                if previous_lang is not None:
+                    delta = dict(self._compute_lang_delta(previous_lang, best_lang), since=since)
+                    delta_summary = {k: len(delta[k]) for k in ("added", "removed", "changed")}
+                    delta_summary["since"] = since
+                    with open(os.path.join(lang_dir, "lang_delta.json"), 'w', encoding='utf-8') as f:
+                        json.dump(delta, f, indent=4, ensure_ascii=False)
                 
                 with open(output_file, 'w', encoding='utf-8') as f:
                     for key, value in best_lang.items():
                         f.write(f"{key}={value}\n")
                 
                 # Save parsed data as JSON for easy access
-                json_file = os.path.join(lang_dir, f"{lang_filename.replace('.lang', '.json')}")
                 with open(json_file, 'w', encoding='utf-8') as f:
                     json.dump(best_lang, f, indent=4, ensure_ascii=False)
                 
-                # Save analysis info
-                analysis_file = os.path.join(lang_dir, "extraction_analysis.json")
-                with open(analysis_file, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        'selected_file': best_file,
-                        'score': best_score,
-                        'candidates': [{
-                            'path': c['path'],
-                            'score': c['score'],
-                            'entries': c['entries']
-                        } for c in all_candidates]
-                    }, f, indent=4)
+                # Record which world file each key came from
+                with open(sources_file, 'w', encoding='utf-8') as f:
+                    json.dump(sources, f, indent=4, ensure_ascii=False)
                 
-                # Update metadata
-                self._add_lang_file_to_metadata(game_name, lang_filename, len(best_lang))
+                # Text, translator notes, constraints and placeholders as separate fields
+                with open(structured_file, 'w', encoding='utf-8') as f:
+                    json.dump(lang_tokenizer.tokenize_lang_entries(best_lang), f, indent=4, ensure_ascii=False)
+                
+                # Key hierarchy and dialogue sequences, for namespace queries without a full scan
+                lang_index.LangIndex(best_lang).save(index_file)
+                
+            # Every locale side by side, for lookups without reopening the worlds
+            if locale_store and not store_current:
+                ranked = sorted((r for r in zip(results, world_paths) if r[0]["success"]),
+                                key=lambda r: r[0]["score"], reverse=True)
+                lang_scanner.write_archive_locale_store(store_file, [(path, r["selected_file"]) for r, path in ranked])
+            scan_stats['locale_store_reused'] = bool(locale_store and store_current)
                 
+            # Save analysis info
+            store_info = self._describe_lang_store(store_file, cache_key) if locale_store else None
+            token_stats = lang_tokenizer.prompt_token_savings(best_lang, self._load_structured_lang(lang_dir, best_lang),
+                                                              self._token_model())
+            index = self._load_lang_index(lang_dir, best_lang)
+            index_summary = index.summary()
+            
+            all_candidates = []
+            for r in succeeded:
+                for c in r["candidates"]:
+                    all_candidates.append(dict(c, archive=r["archive"]))
+                        
+            analysis = {
+                'selected_file': best_file,
+                'selected_archive': primary["archive"],
+                'score': best_score,
+                'candidates': all_candidates,
+                'archives': [{
+                    'archive': r["archive"],
+                    'success': r["success"],
+                    'selected_file': r.get("selected_file"),
+                    'score': r.get("score"),
+                    'entries': len(r["data"]) if r["success"] else 0,
+                    'keys_contributed': sum(1 for a in sources.values() if a == r["archive"]),
+                    'error': r.get("error")
+                } for r in results],
+                'cache_key': cache_key,
+                'locale_store': store_info,
+                'tokenizer': token_stats,
+                'index': index_summary,
+                'scan': scan_stats
+            }
+            with open(analysis_file, 'w', encoding='utf-8') as f:
+                json.dump(analysis, f, indent=4)
+                        
+            # Update metadata
+            self._add_lang_file_to_metadata(game_name, lang_filename, len(best_lang))
+                    
+            return self._lang_extraction_result(analysis, lang_filename, output_file, best_lang, results,
+                                                scan_stats, delta_summary, store_info)
+                
+        except Exception as e:
+            return {"success": False, "error": f"Error extracting lang files: {str(e)}"}
+    
+    def _lang_extraction_result(self, analysis, lang_filename, output_file, best_lang, results, scan_stats,
+                                delta_summary, store_info):
+        """The extract_lang_files result for an extraction_analysis.json block."""
+        return {
+            "success": True,
+            "language": lang_filename.replace('.lang', ''),
+            "lang_file": output_file,
+            "entry_count": len(best_lang),
+            "preview": best_lang,
+            "selected_from": len(analysis['candidates']),
+            "score": analysis['score'],
+            "file_path": analysis['selected_file'],
+            "archives": [r["archive"] for r in results if r["success"]],
+            "failed_archives": {r["archive"]: r["error"] for r in results if not r["success"]},
+            "scan": scan_stats,
+            "delta": delta_summary,
+            "locale_store": store_info,
+            "tokenizer": analysis['tokenizer'],
+            "index": analysis['index']
+        }
+    
+    def open_lang_store(self, game_name):
+        """Open the multi-locale lang store of a game.
+        
+        Returns:
+            lang_store.LangStore (close it when done), or None if the game has
+            not been extracted with a locale store
+        """
+        store_file = os.path.join(self.games_dir, game_name, "lang", "lang_store.bin")
+        if not os.path.exists(store_file):
+            return None
+        
+        try:
+            return lang_store.LangStore(store_file)
+        except (OSError, ValueError) as e:
+            print(f"Error opening lang store: {e}")
+            return None
+    
+    def load_lang_data(self, game_name):
+        """Load the extracted {key: value} lang data of a game, or None if there is none."""
+        lang_dir = os.path.join(self.games_dir, game_name, "lang")
+        if not os.path.exists(lang_dir):
+            return None
+        
+        json_files = self._find_lang_json_files(lang_dir)
+        if not json_files:
+            return None
+        
+        try:
+            with open(os.path.join(lang_dir, json_files[0]), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error loading lang data: {e}")
+            return None
+    
+    def open_lang_index(self, game_name, lang_data=None):
+        """Load the key-hierarchy index of a game's lang file.
+        
+        Returns:
+            lang_index.LangIndex, rebuilt from the lang data if lang_index.json
+            is missing or out of date, or None if no lang file has been extracted
+        """
+        if lang_data is None:
+            lang_data = self.load_lang_data(game_name)
+            if lang_data is None:
+                return None
+        
+        return self._load_lang_index(os.path.join(self.games_dir, game_name, "lang"), lang_data)
+    
+    def _load_lang_index(self, lang_dir, lang_data):
+        """Return the index of lang_data, from lang_index.json when it matches."""
+        index_file = os.path.join(lang_dir, "lang_index.json")
+        try:
+            index = lang_index.LangIndex.load(index_file)
+            if len(index) == len(lang_data) and all(key in index for key in lang_data):
+                return index
+        except (OSError, json.JSONDecodeError, KeyError, ValueError):
+            pass
+        
+        index = lang_index.LangIndex(lang_data)
+        try:
+            index.save(index_file)
+        except OSError:
+            pass
+        return index
+    
+    def _describe_lang_store(self, store_file, source_key=None):
+        """Summarize a lang store file for extraction_analysis.json.
+        
+        source_key is the extraction cache key of the world files it was built from.
+        """
+        try:
+            with lang_store.LangStore(store_file) as store:
                 return {
-                    "success": True,
-                    "language": lang_filename.replace('.lang', ''),
-                    "lang_file": output_file,
-                    "entry_count": len(best_lang),
-                    "preview": best_lang,
-                    "selected_from": len(all_candidates),
-                    "score": best_score,
-                    "file_path": best_file
+                    'file': os.path.basename(store_file),
+                    'locales': store.locales,
+                    'keys': len(store),
+                    'bytes': os.path.getsize(store_file),
+                    'source_key': source_key
                 }
+        except (OSError, ValueError):
+            return None
+    
+    def _load_structured_lang(self, lang_dir, lang_data):
+        """Return the tokenized form of lang_data, from lang_structured.json when it matches."""
+        try:
+            with open(os.path.join(lang_dir, "lang_structured.json"), 'r', encoding='utf-8') as f:
+                structured = json.load(f)
+            if structured.keys() == lang_data.keys():
+                return structured
+        except (OSError, json.JSONDecodeError):
+            pass
+        return lang_tokenizer.tokenize_lang_entries(lang_data)
+    
+    def _find_lang_json_files(self, lang_dir):
+        """List the parsed lang data files in a lang folder, skipping sidecar files."""
+        return sorted(f for f in os.listdir(lang_dir)
+                      if f.endswith('.json') and f not in LANG_SIDECAR_FILES)
+    
+    def _load_previous_lang_data(self, lang_dir, json_filename):
+        """Load the lang data of the previous extraction, preferring the same language."""
+        json_files = self._find_lang_json_files(lang_dir)
+        if not json_files:
+            return None
         
-        except zipfile.BadZipFile:
-            return {"success": False, "error": "Invalid or corrupted world file"}
-        except Exception as e:
-            return {"success": False, "error": f"Error extracting lang files: {str(e)}"}
+        previous = json_filename if json_filename in json_files else json_files[0]
+        try:
+            with open(os.path.join(lang_dir, previous), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+    
+    def _load_analyzed_lang(self, lang_dir):
+        """Load the lang data the saved lang analysis was made from, or None."""
+        try:
+            with open(os.path.join(lang_dir, "lang_analyzed.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)["entries"]
+        except (OSError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+    
+    def _save_analyzed_lang(self, lang_dir, lang_data, analyzed_at):
+        """Keep the lang data an analysis was made from, for diffing later extractions against."""
+        try:
+            with open(os.path.join(lang_dir, "lang_analyzed.json"), 'w', encoding='utf-8') as f:
+                json.dump({"analyzed_at": analyzed_at, "entries": lang_data}, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"Error saving analyzed lang data: {e}")
+    
+    def _compute_lang_delta(self, previous_lang, current_lang):
+        """Diff two lang dicts by key into added, removed and changed entries."""
+        added = {k: v for k, v in current_lang.items() if k not in previous_lang}
+        removed = {k: v for k, v in previous_lang.items() if k not in current_lang}
+        changed = {k: {"old": previous_lang[k], "new": v} for k, v in current_lang.items()
+                   if k in previous_lang and previous_lang[k] != v}
+        
+        return {
+            "compared_at": datetime.now().isoformat(),
+            "previous_entries": len(previous_lang),
+            "current_entries": len(current_lang),
+            "added": added,
+            "removed": removed,
+            "changed": changed,
+            "analyzed_at": None
+        }
+    
+    def _load_extraction_analysis(self, analysis_file):
+        """Return the previous extraction_analysis.json, or {} if there is none."""
+        try:
+            with open(analysis_file, 'r', encoding='utf-8') as f:
+                analysis = json.load(f)
+            return analysis if isinstance(analysis, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
     
     def _score_lang_file_for_npc_content(self, lang_data, file_path):
         """Score a language file based on likelihood of containing NPC dialogue and educational content.
         Higher scores indicate more relevant content."""
-        score = 0
-        
-        # Keywords that indicate NPC dialogue, educational content, or custom content
-        high_value_keywords = [
-            'npc', 'dialogue', 'dialog', 'quest', 'objective', 'mission',
-            'instruction', 'tutorial', 'hint', 'guide', 'student', 'teacher',
-            'learn', 'lesson', 'activity', 'challenge', 'task', 'step'
-        ]
-        
-        medium_value_keywords = [
-            'talk', 'speak', 'say', 'tell', 'ask', 'answer', 'explain',
-            'description', 'info', 'message', 'text', 'story', 'narrative'
-        ]
-        
-        # File path indicators (behavior packs, custom content)
-        if 'behavior_pack' in file_path.lower() or 'bp' in file_path.lower():
-            score += 50
-        if 'resource_pack' in file_path.lower() or 'rp' in file_path.lower():
-            score += 30
-        if 'texts' in file_path.lower():
-            score += 20
-        
-        # Analyze content
-        for key, value in lang_data.items():
-            key_lower = key.lower()
-            value_lower = value.lower()
-            
-            # High value indicators
-            for keyword in high_value_keywords:
-                if keyword in key_lower or keyword in value_lower:
-                    score += 5
-            
-            # Medium value indicators
-            for keyword in medium_value_keywords:
-                if keyword in key_lower or keyword in value_lower:
-                    score += 2
-            
-            # Long text values likely indicate dialogue or descriptions
-            if len(value) > 50:
-                score += 3
-            elif len(value) > 100:
-                score += 5
-            
-            # Custom keys (not standard minecraft keys)
-            if not key_lower.startswith(('entity.', 'item.', 'tile.', 'block.')):
-                score += 2
-            
-            # Sentence-like content (has punctuation)
-            if any(p in value for p in ['.', '?', '!']):
-                score += 2
-        
-        # Bonus for larger files with diverse content
-        entry_count = len(lang_data)
-        if entry_count > 100:
-            score += 20
-        elif entry_count > 50:
-            score += 10
-        elif entry_count > 20:
-            score += 5
-        
-        return score
+        return lang_scanner.score_lang_file(lang_data, file_path)
     
     def _add_lang_file_to_metadata(self, game_name, lang_file, entry_count):
         """Add language file information to game metadata."""
@@ -1384,26 +1710,23 @@ Current objectives:
     
     def list_documents_in_downloads(self):
         """List all PDF, Word, and PowerPoint files in the Downloads folder."""
+        return [info["path"] for info in self.list_documents_in_downloads_with_info()]
+    
+    def list_documents_in_downloads_with_info(self):
+        """List documents in the Downloads folder with their size and modification time."""
         downloads_dir = os.path.join(os.path.expanduser("~"), "Downloads")
         
         if not os.path.exists(downloads_dir):
             return []
         
-        try:
-            documents = []
-            supported_extensions = ('.pdf', '.docx', '.doc', '.pptx', '.ppt')
-            
-            for file in os.listdir(downloads_dir):
-                if file.lower().endswith(supported_extensions):
-                    full_path = os.path.join(downloads_dir, file)
-                    if os.path.isfile(full_path):
-                        documents.append(full_path)
-            return sorted(documents)
-        except OSError:
-            return []
+        return self._downloads_manifest().list_files(downloads_dir, DOCUMENT_EXTENSIONS)
     
-    def upload_document(self, game_name, source_file):
-        """Upload a document (PDF, Word, PPT) to a game folder."""
+    def upload_document(self, game_name, source_file, extract=True):
+        """Upload a document (PDF, Word, PPT) to a game folder.
+        
+        Args:
+            extract: Parse the document into the text cache right away
+        """
         game_path = os.path.join(self.games_dir, game_name)
         
         if not os.path.exists(game_path):
@@ -1422,15 +1745,23 @@ Current objectives:
             if not os.path.exists(docs_dir):
                 os.makedirs(docs_dir)
             
-            # Copy the file
+            # Link the file from the shared blob store
             destination = os.path.join(docs_dir, filename)
-            shutil.copy2(source_file, destination)
+            stored = self._store_upload(source_file, destination)
             
             # Determine document type
             doc_type = "PDF" if ext == ".pdf" else "Word" if ext in [".docx", ".doc"] else "PowerPoint"
             
             # Update metadata with document info
-            self._add_document_to_metadata(game_name, filename, doc_type)
+            with self._metadata_lock:
+                self._add_document_to_metadata(game_name, filename, doc_type)
+            
+            # Parse once now; every later analysis reads the cached text
+            if extract:
+                text = self.get_document_text(game_name, filename, digest=stored["sha256"] if stored else None)
+                # Flag revisions of documents that are already analyzed
+                if text:
+                    self.find_similar_document(game_name, filename, text)
             
             return True
         except (OSError, IOError) as e:
@@ -1503,8 +1834,133 @@ Current objectives:
             print(f"Error regenerating analysis: {e}")
             return False
     
-    def analyze_document_with_ai(self, game_name, filename):
-        """Analyze uploaded document using Azure OpenAI and save in standardized format."""
+    def ingest_documents(self, game_name, source, analyze=True, max_workers=None, progress=None):
+        """Upload, extract and analyze a batch of documents on a bounded worker pool.
+        
+        Each document runs through the stages upload -> extract -> analyze, with
+        up to max_workers documents in flight at once. Finished stages are
+        recorded in the game's ingest journal, so running the same batch again
+        (e.g. after an interruption) only does the work that is left.
+        
+        Args:
+            game_name: Game to add the documents to
+            source: Folder, glob pattern (e.g. "~/Packs/*.pdf") or single document
+            analyze: Run the AI analysis stage (skipped when Azure OpenAI is not configured)
+            max_workers: Documents processed at once (None = "ingest_workers" setting)
+            progress: Optional callback(filename, stage, status, counts), called when a
+                stage is "started", "done", "skipped" (already in the journal) or
+                "failed"; counts maps each stage to the documents finished with it
+        
+        Returns:
+            dict with documents, stages, completed (per-stage counts), resumed
+            (stages skipped from the journal), failed, duplicates and seconds;
+            None if the game does not exist or the source has no documents
+        """
+        game_path = os.path.join(self.games_dir, game_name)
+        if not os.path.exists(game_path):
+            return None
+        
+        documents, duplicates = document_ingest.find_documents(source)
+        for path in duplicates:
+            print(f"Skipping {path}: another document in the batch has the same filename")
+        if not documents:
+            return None
+        
+        analyze = analyze and self.settings.is_configured()
+        stages = document_ingest.STAGES if analyze else document_ingest.STAGES[:-1]
+        if max_workers is None:
+            max_workers = int(self.settings.get_value('ingest_workers', INGEST_WORKERS))
+        journal = document_ingest.IngestJournal(game_path)
+        
+        completed = {stage: 0 for stage in stages}
+        resumed = []
+        failed = []
+        counts_lock = threading.Lock()
+        
+        def report(filename, stage, status):
+            with counts_lock:
+                if status in ("done", "skipped"):
+                    completed[stage] += 1
+                counts = dict(completed)
+                if not progress:
+                    print(f"[{stage} {counts[stage]}/{len(documents)}] {filename}: {status}")
+            if progress:
+                progress(filename, stage, status, counts)
+        
+        def ingest(source_file):
+            filename = os.path.basename(source_file)
+            done = journal.completed_stages(source_file)
+            if not os.path.exists(os.path.join(game_path, "documents", filename)):
+                # Removed from the game since the journal entry was written
+                done = []
+            
+            for stage in stages:
+                if stage in done:
+                    with counts_lock:
+                        resumed.append((filename, stage))
+                    report(filename, stage, "skipped")
+                    continue
+                
+                report(filename, stage, "started")
+                try:
+                    error = self._run_ingest_stage(game_name, source_file, filename, stage)
+                    if not error:
+                        # Raises OSError if the source file went away or became unreadable mid-batch
+                        journal.mark_done(source_file, filename, stage)
+                except Exception as e:
+                    error = str(e)
+                if error:
+                    journal.mark_failed(source_file, filename, stage, error)
+                    with counts_lock:
+                        failed.append({"filename": filename, "stage": stage, "error": error})
+                    report(filename, stage, "failed")
+                    return
+                report(filename, stage, "done")
+        
+        from concurrent.futures import ThreadPoolExecutor
+        
+        started = time.perf_counter()
+        pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        try:
+            list(pool.map(ingest, documents))
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            print("\nBatch interrupted; run it again to resume where it stopped")
+            raise
+        pool.shutdown()
+        
+        return {
+            "documents": len(documents),
+            "stages": list(stages),
+            "completed": completed,
+            "resumed": len(resumed),
+            "failed": failed,
+            "duplicates": duplicates,
+            "seconds": round(time.perf_counter() - started, 2)
+        }
+    
+    def _run_ingest_stage(self, game_name, source_file, filename, stage):
+        """Run one ingest stage for a document; returns an error message, or None on success."""
+        if stage == document_ingest.STAGE_UPLOAD:
+            if not self.upload_document(game_name, source_file, extract=False):
+                return "upload failed"
+        elif stage == document_ingest.STAGE_EXTRACT:
+            if not self.get_document_text(game_name, filename):
+                return "no text could be extracted"
+        elif stage == document_ingest.STAGE_ANALYZE:
+            if not self.analyze_document_with_ai(game_name, filename):
+                return "AI analysis failed"
+        return None
+    
+    def analyze_document_with_ai(self, game_name, filename, reuse_similar=True):
+        """Analyze uploaded document using Azure OpenAI and save in standardized format.
+        
+        Args:
+            reuse_similar: Reuse the analysis of an analyzed document that is a
+                near duplicate of this one instead of paying for a new one
+                (never when this document already has an analysis: analyzing
+                it again asks for a fresh one)
+        """
         if not self.settings.is_configured():
             print("Azure OpenAI is not configured!")
             return None
@@ -1517,27 +1973,57 @@ Current objectives:
             return None
         
         try:
-            # Extract text from document
-            text_content = self._extract_text_from_document(doc_path)
+            # Extract text from document (parsed once per upload, then cached)
+            text_content = self.get_document_text(game_name, filename)
             
             if not text_content:
                 print("Could not extract text from document.")
                 return None
             
-            # Limit text size for API call (take first ~4000 words)
-            words = text_content.split()
-            if len(words) > 4000:
-                text_content = ' '.join(words[:4000]) + "\\n\\n[Document truncated for analysis]"
-            
-            from openai import AzureOpenAI
+            analyses = (self.load_game_info(game_name) or {}).get("document_analysis") or {}
+            if reuse_similar and filename not in analyses:
+                match = self.find_similar_document(game_name, filename, text_content)
+                if match and match["near_duplicate"]:
+                    return self._reuse_document_analysis(game_name, filename, match)
             
             config = self.settings.get_azure_config()
             
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
+            
+            total_words = len(text_content.split())
+            chunk_tokens = int(self.settings.get_value('document_chunk_tokens', DOCUMENT_CHUNK_TOKENS))
+            parallelism = max(1, int(self.settings.get_value('analysis_parallelism', ANALYSIS_PARALLELISM)))
+            chunks = document_chunker.chunk_document(text_content, chunk_tokens, config['deployment'])
+            
+            started = time.perf_counter()
+            
+            if len(chunks) <= 1:
+                source_text = text_content
+                content_label = "Document content"
+                analyzed_words = total_words
+                failed_chunks = 0
+            else:
+                # Long document: notes on each chunk concurrently, merged by the call below
+                from concurrent.futures import ThreadPoolExecutor
+                
+                print(f"Analyzing {filename} in {len(chunks)} parts...")
+                with ThreadPoolExecutor(max_workers=parallelism) as pool:
+                    chunk_notes = list(pool.map(
+                        lambda item: self._analyze_document_chunk(client, config, filename, item[0], len(chunks), item[1]),
+                        enumerate(chunks, 1)
+                    ))
+                
+                succeeded = [(chunk, notes) for chunk, notes in zip(chunks, chunk_notes) if notes]
+                if not succeeded:
+                    print("Error analyzing document: every chunk analysis failed")
+                    return None
+                
+                analyzed_words = sum(chunk["words"] for chunk, _ in succeeded)
+                failed_chunks = len(chunks) - len(succeeded)
+                source_text = "\n\n".join(f"--- Part {i} of {len(chunks)} ---\n{notes}"
+                                           for i, notes in enumerate(chunk_notes, 1) if notes)
+                content_label = (f"Document content (notes on {len(succeeded)} parts covering "
+                                 f"{analyzed_words} of {total_words} words, in document order)")
             
             prompt = f"""Analyze this educational document related to a Minecraft Education game and provide a structured analysis:
 
@@ -1565,13 +2051,20 @@ Current objectives:
    - Standards alignment
    - Supplementary activities
 
-Document content:
-{text_content}"""
+{content_label}:
+{prompt_packer.section_marker("document")}"""
+            
+            # Trim the document (or notes) at paragraph boundaries to what the context window allows
+            system_message = "You are an educational content analyst specializing in Minecraft Education. Provide detailed, structured analysis of educational documents to extract teaching guidance, learning objectives, and implementation details."
+            packer = prompt_packer.PromptPacker.from_settings(self.settings, 2500)
+            prompt = packer.fit_prompt(prompt, {"document": source_text}, system_message)
+            for record in packer.dropped:
+                analyzed_words = int(analyzed_words * record["kept_tokens"] / record["tokens"])
             
             response = client.chat.completions.create(
                 model=config['deployment'],
                 messages=[
-                    {"role": "system", "content": "You are an educational content analyst specializing in Minecraft Education. Provide detailed, structured analysis of educational documents to extract teaching guidance, learning objectives, and implementation details."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.5,
@@ -1580,36 +2073,239 @@ Document content:
             
             analysis_text = response.choices[0].message.content.strip()
             
-            # Load existing document analysis or create new
-            analysis_file = os.path.join(game_path, "document_analysis.json")
-            if os.path.exists(analysis_file):
-                with open(analysis_file, 'r') as f:
-                    all_analyses = json.load(f)
-                    if "content" in all_analyses:
-                        all_analyses = all_analyses["content"]
-            else:
-                all_analyses = {}
+            with self._metadata_lock:
+                # Load existing document analysis or create new
+                analysis_file = os.path.join(game_path, "document_analysis.json")
+                if os.path.exists(analysis_file):
+                    with open(analysis_file, 'r') as f:
+                        all_analyses = json.load(f)
+                        if "content" in all_analyses:
+                            all_analyses = all_analyses["content"]
+                else:
+                    all_analyses = {}
+                
+                # Save analysis for this document
+                all_analyses[filename] = {
+                    "analyzed_at": datetime.now().isoformat(),
+                    "document_type": os.path.splitext(filename)[1],
+                    "coverage": {
+                        "words_analyzed": analyzed_words,
+                        "total_words": total_words,
+                        "percent": round(100.0 * analyzed_words / total_words, 1) if total_words else 100.0
+                    },
+                    "chunks": len(chunks),
+                    "failed_chunks": failed_chunks,
+                    "latency_seconds": round(time.perf_counter() - started, 2),
+                    "analysis": analysis_text,
+                    "summary": self._extract_summary(analysis_text)
+                }
+                
+                # Save to game info folder
+                self.save_game_info(game_name, "document_analysis", all_analyses)
+                
+                # Update metadata
+                self._update_document_metadata(game_name, filename, analyzed=True)
             
-            # Save analysis for this document
-            all_analyses[filename] = {
-                "analyzed_at": datetime.now().isoformat(),
-                "document_type": os.path.splitext(filename)[1],
-                "analysis": analysis_text,
-                "summary": self._extract_summary(analysis_text)
-            }
+            return analysis_text
+        
+        except Exception as e:
+            print(f"Error analyzing document: {e}")
+            return None
+    
+    def find_similar_document(self, game_name, filename, text=None):
+        """Find the analyzed document most similar to this one and record it in metadata.json.
+        
+        Candidates are picked by MinHash sketch and confirmed with the exact
+        shingle similarity of the two texts (see document_fingerprint).
+        
+        Returns:
+            {"filename", "similarity", "near_duplicate"} for the most similar
+            analyzed document, or None if none comes close
+        """
+        game_path = os.path.join(self.games_dir, game_name)
+        docs_dir = os.path.join(game_path, "documents")
+        text = text or self.get_document_text(game_name, filename)
+        if not text:
+            return None
+        
+        analyses = (self.load_game_info(game_name) or {}).get("document_analysis") or {}
+        documents = (self._load_metadata(game_name) or {}).get("documents", [])
+        # Documents whose analysis was copied from this one: "reusing" it would
+        # only hand this document its own previous analysis back
+        derived = {other for other, record in analyses.items() if record.get("reused_from") == filename}
+        derived.update(doc["filename"] for doc in documents
+                       if (doc.get("similar_to") or {}).get("filename") == filename)
+        others = [other for other in analyses
+                  if other != filename and other not in derived and os.path.exists(os.path.join(docs_dir, other))]
+        
+        # Stored sketches of unchanged documents are compared without loading their text
+        with self._metadata_lock:
+            store = document_fingerprint.FingerprintStore(game_path)
+            sketch = store.sketch(filename, text, os.path.join(docs_dir, filename))
+            sketches = {other: store.stored_sketch(other, os.path.join(docs_dir, other)) for other in others}
+        
+        texts = {}
+        for other in others:
+            if sketches[other] is None:
+                other_text = self.get_document_text(game_name, other)
+                if other_text:
+                    texts[other] = other_text
+        if texts:
+            with self._metadata_lock:
+                store = document_fingerprint.FingerprintStore(game_path)
+                for other, other_text in texts.items():
+                    sketches[other] = store.sketch(other, other_text, os.path.join(docs_dir, other))
+        
+        candidates = sorted(
+            ((document_fingerprint.estimate_similarity(sketch, other_sketch), other)
+             for other, other_sketch in sketches.items() if other_sketch is not None),
+            reverse=True
+        )
+        
+        match = None
+        shingles = None
+        for estimate, other in candidates:
+            if estimate < document_fingerprint.CANDIDATE_SIMILARITY:
+                break
+            other_text = texts.get(other) or self.get_document_text(game_name, other)
+            if not other_text:
+                continue
+            shingles = shingles or document_fingerprint.shingles(text)
+            similarity = document_fingerprint.jaccard(shingles, document_fingerprint.shingles(other_text))
+            if not match or similarity > match["similarity"]:
+                match = {
+                    "filename": other,
+                    "similarity": round(similarity, 4),
+                    "near_duplicate": similarity >= document_fingerprint.NEAR_DUPLICATE_SIMILARITY
+                }
+        
+        self._record_document_similarity(game_name, filename, match)
+        if match:
+            reuse = " - its analysis will be reused" if match["near_duplicate"] else ""
+            print(f"{filename} is {match['similarity']:.1%} similar to {match['filename']}{reuse}")
+        return match
+    
+    def _record_document_similarity(self, game_name, filename, match):
+        """Store a document's closest analyzed document (or its absence) in metadata.json."""
+        metadata_file = os.path.join(self.games_dir, game_name, "metadata.json")
+        
+        with self._metadata_lock:
+            try:
+                with open(metadata_file, 'r') as f:
+                    metadata = json.load(f)
+                
+                for doc in metadata.get("documents", []):
+                    if doc["filename"] == filename:
+                        if match:
+                            doc["similar_to"] = dict(match, checked_at=datetime.now().isoformat())
+                        else:
+                            doc.pop("similar_to", None)
+                        break
+                
+                with open(metadata_file, 'w') as f:
+                    json.dump(metadata, f, indent=4)
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Error updating metadata: {e}")
+    
+    def _reuse_document_analysis(self, game_name, filename, match):
+        """Save a near-duplicate's analysis as this document's; returns the analysis text."""
+        game_path = os.path.join(self.games_dir, game_name)
+        analysis_file = os.path.join(game_path, "document_analysis.json")
+        
+        with self._metadata_lock:
+            with open(analysis_file, 'r') as f:
+                all_analyses = json.load(f)
+                if "content" in all_analyses:
+                    all_analyses = all_analyses["content"]
+            
+            source = all_analyses.get(match["filename"])
+            if not source:
+                return None
+            all_analyses[filename] = dict(
+                source,
+                analyzed_at=datetime.now().isoformat(),
+                document_type=os.path.splitext(filename)[1],
+                latency_seconds=0.0,
+                reused_from=match["filename"],
+                similarity=match["similarity"]
+            )
             
-            # Save to game info folder
             self.save_game_info(game_name, "document_analysis", all_analyses)
-            
-            # Update metadata
             self._update_document_metadata(game_name, filename, analyzed=True)
-            
-            return analysis_text
         
+        print(f"Reused the analysis of {match['filename']} ({match['similarity']:.1%} similar)")
+        return source["analysis"]
+    
+    def _analyze_document_chunk(self, client, config, filename, index, total, chunk):
+        """Map step of the long-document analysis: condensed notes on one chunk.
+        Returns None if the request fails, so the other chunks still count."""
+        sections = f" (sections: {'; '.join(chunk['headings'][:8])})" if chunk["headings"] else ""
+        prompt = f"""This is part {index} of {total} of the educational document "{filename}"{sections}, related to a Minecraft Education game.
+Write concise notes on this part, to be combined with the notes on the other parts:
+- purpose, audience and structure
+- learning objectives, subject areas, concepts, grade level and curriculum or standards connections
+- game mechanics, gameplay instructions and in-game activities
+- teacher guidance: implementation steps, assessment or rubrics, timings and prerequisites
+- related materials, extensions and supplementary activities
+Keep specific details (standards codes, timings, names). Skip anything this part does not cover.
+
+Text:
+{chunk['text']}"""
+        
+        try:
+            response = client.chat.completions.create(
+                model=config['deployment'],
+                messages=[
+                    {"role": "system", "content": "You are an educational content analyst specializing in Minecraft Education."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=800
+            )
+            return response.choices[0].message.content.strip()
         except Exception as e:
-            print(f"Error analyzing document: {e}")
+            print(f"Error analyzing part {index} of {total} of {filename}: {e}")
             return None
     
+    def get_document_text(self, game_name, filename, digest=None):
+        """Text of an uploaded document, from the game's document text cache.
+        
+        The document is only parsed when its content (by SHA-256) or the
+        extraction parameters have not been seen before; the extraction time
+        is recorded with the cached text.
+        
+        Returns:
+            The text, or None if it could not be extracted
+        """
+        game_path = os.path.join(self.games_dir, game_name)
+        doc_path = os.path.join(game_path, "documents", filename)
+        parameters = {"extractor": DOCUMENT_TEXT_EXTRACTORS.get(os.path.splitext(filename)[1].lower())}
+        
+        try:
+            with self._metadata_lock:
+                text = DocumentTextCache(game_path).get(doc_path, parameters, digest)
+            if text is None and digest is None:
+                # Hashed outside the lock so concurrent ingests are not serialized behind it
+                digest = file_digest(doc_path)
+                with self._metadata_lock:
+                    text = DocumentTextCache(game_path).get(doc_path, parameters, digest)
+        except OSError as e:
+            print(f"Document text cache unavailable ({e}), extracting without it")
+            return self._extract_text_from_document(doc_path)
+        if text is not None:
+            return text
+        
+        started = time.perf_counter()
+        text = self._extract_text_from_document(doc_path)
+        if text:
+            try:
+                # Reloaded under the lock so documents extracted concurrently all stay in the index
+                with self._metadata_lock:
+                    DocumentTextCache(game_path).put(doc_path, text, parameters, time.perf_counter() - started, digest)
+            except OSError as e:
+                print(f"Error caching document text: {e}")
+        return text
+    
     def _extract_text_from_document(self, file_path):
         """Extract text content from PDF, Word, or PowerPoint files."""
         ext = os.path.splitext(file_path)[1].lower()
@@ -1625,16 +2321,25 @@ Document content:
             print(f"Error extracting text: {e}")
             return None
     
-    def _extract_text_from_pdf(self, file_path):
-        """Extract text from PDF file."""
+    def _extract_text_from_pdf(self, file_path, pages=None):
+        """Extract text from PDF file.
+        
+        Pages are extracted in parallel and cached by file hash and page index,
+        so a page is only ever parsed once (see pdf_extractor).
+        
+        Args:
+            file_path: PDF file
+            pages: Page indexes to extract (0-based); None = every page
+        """
         try:
-            import PyPDF2
-            text = []
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text.append(page.extract_text())
-            return '\\n'.join(text)
+            stats = {}
+            started = time.perf_counter()
+            text = pdf_extractor.extract_pdf_pages(file_path, pages, cache_dir=self.cache_dir, stats=stats)
+            if stats["extracted_pages"]:
+                workers = f" by {stats['workers']} workers" if stats["workers"] else ""
+                print(f"PDF pages: {stats['extracted_pages']} extracted{workers}, "
+                      f"{stats['cached_pages']} from cache in {time.perf_counter() - started:.2f}s")
+            return '\n'.join(text)
         except ImportError:
             print("PyPDF2 not installed. Install with: pip install PyPDF2")
             return None
@@ -1643,14 +2348,21 @@ Document content:
             return None
     
     def _extract_text_from_word(self, file_path):
-        """Extract text from Word document."""
+        """Extract text from Word document.
+        
+        Streams word/document.xml (paragraphs and tables in reading order);
+        files that are not OOXML packages go through python-docx.
+        """
+        text = self._extract_text_from_ooxml(file_path, ooxml_extractor.extract_docx_text)
+        if text is not None:
+            return text
         try:
             from docx import Document
             doc = Document(file_path)
             text = []
             for paragraph in doc.paragraphs:
                 text.append(paragraph.text)
-            return '\\n'.join(text)
+            return '\n'.join(text)
         except ImportError:
             print("python-docx not installed. Install with: pip install python-docx")
             return None
@@ -1659,7 +2371,15 @@ Document content:
             return None
     
     def _extract_text_from_ppt(self, file_path):
-        """Extract text from PowerPoint presentation."""
+        """Extract text from PowerPoint presentation.
+        
+        Streams the slide and notes XML (slides in order, grouped shapes,
+        tables and speaker notes included); files that are not OOXML
+        packages go through python-pptx.
+        """
+        text = self._extract_text_from_ooxml(file_path, ooxml_extractor.extract_pptx_text)
+        if text is not None:
+            return text
         try:
             from pptx import Presentation
             prs = Presentation(file_path)
@@ -1668,7 +2388,7 @@ Document content:
                 for shape in slide.shapes:
                     if hasattr(shape, "text"):
                         text.append(shape.text)
-            return '\\n'.join(text)
+            return '\n'.join(text)
         except ImportError:
             print("python-pptx not installed. Install with: pip install python-pptx")
             return None
@@ -1676,6 +2396,16 @@ Document content:
             print(f"Error reading PowerPoint: {e}")
             return None
     
+    def _extract_text_from_ooxml(self, file_path, extract):
+        """Run a streaming OOXML extractor; None when the file is not a readable OOXML package."""
+        if not zipfile.is_zipfile(file_path):
+            return None
+        try:
+            return extract(file_path)
+        except ooxml_extractor.OOXML_ERRORS as e:
+            print(f"Streaming extraction failed ({e}), falling back to the document object model")
+            return None
+    
     def _update_document_metadata(self, game_name, filename, analyzed=False):
         """Update document metadata with analysis status."""
         game_path = os.path.join(self.games_dir, game_name)
@@ -1727,6 +2457,9 @@ Document content:
             doc_file = os.path.join(docs_dir, filename)
             if os.path.exists(doc_file):
                 os.remove(doc_file)
+                self._reclaim_blobs()
+            DocumentTextCache(game_path).remove(filename)
+            document_fingerprint.FingerprintStore(game_path).remove(filename)
             
             # Remove from metadata
             if os.path.exists(metadata_file):
@@ -1735,6 +2468,9 @@ Document content:
                 
                 if "documents" in metadata:
                     metadata["documents"] = [d for d in metadata["documents"] if d["filename"] != filename]
+                    for doc in metadata["documents"]:
+                        if doc.get("similar_to", {}).get("filename") == filename:
+                            del doc["similar_to"]
                     metadata["modified"] = datetime.now().isoformat()
                     
                     with open(metadata_file, 'w') as f:
@@ -1775,6 +2511,11 @@ Document content:
             docs_dir = os.path.join(game_path, "documents")
             if os.path.exists(docs_dir):
                 shutil.rmtree(docs_dir)
+                self._reclaim_blobs()
+            shutil.rmtree(os.path.join(game_path, DOCUMENT_TEXT_DIRNAME), ignore_errors=True)
+            for state_file in (document_ingest.JOURNAL_FILENAME, document_fingerprint.FINGERPRINTS_FILENAME):
+                if os.path.exists(os.path.join(game_path, state_file)):
+                    os.remove(os.path.join(game_path, state_file))
             
             # Remove from metadata
             metadata_file = os.path.join(game_path, "metadata.json")
@@ -1799,8 +2540,23 @@ Document content:
             print(f"Error removing all documents: {e}")
             return False
     
-    def _gather_all_game_info(self, game_name):
-        """Gather all available information about a game for creation tasks."""
+    def _gather_all_game_info(self, game_name, purpose=None, query="", base_info=None):
+        """Gather all available information about a game for creation tasks.
+        
+        Args:
+            purpose: Creation type (a key of passage_retrieval.CREATION_QUERIES);
+                its lang and document analysis sections are then the passages
+                most relevant to it instead of everything
+            query: Extra retrieval terms (e.g. the standards being mapped)
+            base_info: Info already gathered without a purpose (create_all
+                gathers once for every creation); not modified
+        """
+        if base_info is not None:
+            combined_info = dict(base_info)
+            if purpose in passage_retrieval.CREATION_QUERIES:
+                self._retrieve_game_info_passages(game_name, purpose, query, combined_info)
+            return combined_info
+        
         info = self.load_game_info(game_name)
         metadata = self._load_metadata(game_name)
         
@@ -1835,31 +2591,202 @@ Document content:
         if info and "world_files" in info and info["world_files"]:
             combined_info["has_world_files"] = True
         
+        if purpose in passage_retrieval.CREATION_QUERIES:
+            self._retrieve_game_info_passages(game_name, purpose, query, combined_info)
+        
         return combined_info
     
-    def create_student_guide(self, game_name):
+    def _retrieve_game_info_passages(self, game_name, purpose, query, combined_info):
+        """Replace the lang and document analysis of combined_info with their
+        passages ranked most relevant to the creation; a section with no
+        matching passages keeps its full text."""
+        top_k = int(self.settings.get_value('retrieval_top_k', passage_retrieval.RETRIEVAL_TOP_K))
+        budget = int(self.settings.get_value('retrieval_tokens', passage_retrieval.RETRIEVAL_SECTION_TOKENS))
+        if top_k <= 0:
+            return
+        
+        index = self.open_passage_index(game_name)
+        if index is None:
+            return
+        extra = " ".join([query] + [str(objective) for objective in combined_info["objectives"]])
+        model = self._token_model()
+        
+        for section in passage_retrieval.SECTION_KINDS:
+            # Small enough to go in whole
+            full_tokens = prompt_packer.count_tokens(combined_info[section], model)
+            if full_tokens <= budget:
+                continue
+            # update() rewrites the index under the same lock, e.g. while create_all runs
+            with self._metadata_lock:
+                text, stats = passage_retrieval.retrieve_section(index, game_name, purpose, section, extra,
+                                                                 top_k, budget, model)
+            if not text:
+                continue
+            combined_info[section] = text
+            print(f"Retrieved {stats['passages']} of {stats['candidates']} matching passages for "
+                  f"{section.replace('_', ' ')} ({stats['tokens']} tokens, full text {full_tokens})")
+    
+    def open_passage_index(self, game_name):
+        """The game's passage index (document text, analyses and lang entries), brought up to date.
+        
+        Returns:
+            search_index.SearchIndex, or None if the game does not exist
+        """
+        game_path = os.path.join(self.games_dir, game_name)
+        if not os.path.exists(game_path):
+            return None
+        
+        sources = {}
+        lang_dir = os.path.join(game_path, "lang")
+        if os.path.isdir(lang_dir):
+            for filename in self._find_lang_json_files(lang_dir)[:1]:
+                sources[os.path.join(game_name, "lang", filename)] = search_index.KIND_LANG_PASSAGES
+        for filename, kind in (("lang_analysis.json", search_index.KIND_LANG_ANALYSIS),
+                               ("document_analysis.json", search_index.KIND_DOCUMENTS),
+                               (os.path.join(DOCUMENT_TEXT_DIRNAME, "index.json"), search_index.KIND_DOCUMENT_TEXT)):
+            if os.path.exists(os.path.join(game_path, filename)):
+                sources[os.path.join(game_name, filename)] = kind
+        
+        index_file = os.path.join(game_path, PASSAGE_INDEX_FILENAME)
+        with self._metadata_lock:
+            index = self._passage_indexes.get(index_file)
+            if index is None:
+                index = self._passage_indexes[index_file] = search_index.SearchIndex(index_file, self.games_dir)
+            index.update(sources)
+        return index
+    
+    def _game_info_sections(self, game_info):
+        """Variable sections of a create_* prompt, in the order they appear."""
+        return {
+            "game context": game_info["context"],
+            "gameplay": game_info["gameplay"],
+            "language file analysis": game_info["lang_analysis"],
+            "document analysis": game_info["document_analysis"]
+        }
+    
+    def _prompt_game_info(self, game_info):
+        """Copy of game_info whose prompt sections are section markers, for building
+        the prompt template that _pack_prompt fills in (empty sections stay empty)."""
+        markers = prompt_packer.mark_sections(self._game_info_sections(game_info))
+        return dict(game_info,
+                    context=markers["game context"],
+                    gameplay=markers["gameplay"],
+                    lang_analysis=markers["language file analysis"],
+                    document_analysis=markers["document analysis"])
+    
+    def _token_model(self):
+        """Deployment that prompt token budgets are counted for (see prompt_packer.count_tokens)."""
+        return self.settings.get_azure_config().get('deployment')
+    
+    def _pack_prompt(self, template, sections, system_message, max_tokens):
+        """Fill the section markers of a prompt template, trimming the sections at
+        paragraph boundaries so the request and its max_tokens reply fit the
+        deployment's context window."""
+        packer = prompt_packer.PromptPacker.from_settings(self.settings, max_tokens)
+        return packer.fit_prompt(template, sections, system_message)
+    
+    def create_all(self, game_name, country=None, standards=None, max_concurrency=None, progress=None):
+        """Generate every resource type concurrently.
+        
+        The game info is gathered once and shared; the creations run on a
+        thread pool driven by asyncio, at most max_concurrency at a time, so
+        the total time approaches that of the slowest creation.
+        
+        Args:
+            country, standards: For the curriculum mapping, which is skipped without them
+            max_concurrency: Creations in flight at once (None = "creation_concurrency" setting)
+            progress: Optional callback(key, label, status, result), called when a creation
+                is "started", "done", "failed" or "skipped"; result is its dict in the return value
+        
+        Returns:
+            dict with results ([{"type", "label", "status", "file", "seconds"}] in
+            CREATION_TYPES order), seconds and slowest_seconds; None if Azure
+            OpenAI is not configured
+        """
+        if not self.settings.is_configured():
+            return None
+        
+        if max_concurrency is None:
+            max_concurrency = int(self.settings.get_value('creation_concurrency', CREATION_CONCURRENCY))
+        base_info = self._gather_all_game_info(game_name)
+        # Index the passages up front; the creations then only search the shared index
+        self.open_passage_index(game_name)
+        
+        import asyncio
+        
+        started = time.perf_counter()
+        results = asyncio.run(self._create_all_async(game_name, base_info, country, standards,
+                                                     max(1, max_concurrency), progress))
+        return {
+            "results": results,
+            "seconds": round(time.perf_counter() - started, 2),
+            "slowest_seconds": max((r["seconds"] for r in results), default=0.0)
+        }
+    
+    async def _create_all_async(self, game_name, base_info, country, standards, max_concurrency, progress):
+        """Run the creations of create_all, each in a worker thread, under a semaphore."""
+        import asyncio
+        import functools
+        from concurrent.futures import ThreadPoolExecutor
+        
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        def report(result):
+            if progress:
+                progress(result["type"], result["label"], result["status"], result)
+            else:
+                detail = f" in {result['seconds']}s" if result["status"] in ("done", "failed") else ""
+                print(f"[{result['label']}] {result['status']}{detail}")
+        
+        async def create(key, label, method_name, pool):
+            result = {"type": key, "label": label, "status": "skipped", "file": None, "seconds": 0.0}
+            if key == "curriculum_mapping":
+                if not (country and standards):
+                    report(result)
+                    return result
+                call = functools.partial(self.create_curriculum_mapping, game_name, country, standards,
+                                         base_info=base_info)
+            else:
+                call = functools.partial(getattr(self, method_name), game_name, base_info=base_info)
+            
+            async with semaphore:
+                result["status"] = "started"
+                report(result)
+                item_started = time.perf_counter()
+                try:
+                    result["file"] = await loop.run_in_executor(pool, call)
+                except Exception as e:
+                    print(f"Error creating {label}: {e}")
+                result["seconds"] = round(time.perf_counter() - item_started, 2)
+            
+            result["status"] = "done" if result["file"] else "failed"
+            report(result)
+            return result
+        
+        # Own pool, so the concurrency limit is not capped by the default executor's size
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            return list(await asyncio.gather(*(create(key, label, method_name, pool)
+                                               for key, label, method_name in CREATION_TYPES)))
+    
+    def create_student_guide(self, game_name, base_info=None):
         """Create a comprehensive student guide using all available information."""
         if not self.settings.is_configured():
             return None
         
-        game_info = self._gather_all_game_info(game_name)
+        game_info = self._gather_all_game_info(game_name, purpose="student_guide", base_info=base_info)
         
         if not game_info["context"] and not game_info["gameplay"]:
             print("Not enough game information available. Please add context and gameplay first.")
             return None
         
         try:
-            from openai import AzureOpenAI
-            
             config = self.settings.get_azure_config()
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             # Build comprehensive prompt
             objectives_text = "\n".join([f"- {obj}" for obj in game_info["objectives"]]) if game_info["objectives"] else "Not specified"
+            prompt_info = self._prompt_game_info(game_info)
             
             prompt = f"""Create a comprehensive STUDENT GUIDE for the Minecraft Education game "{game_info['game_name']}". 
 
@@ -1868,19 +2795,19 @@ This guide should be written directly for students and should be clear, engaging
 Available Information:
 
 GAME CONTEXT:
-{game_info['context']}
+{prompt_info['context']}
 
 GAMEPLAY:
-{game_info['gameplay']}
+{prompt_info['gameplay']}
 
 LEARNING OBJECTIVES:
 {objectives_text}
 
 LANGUAGE FILE ANALYSIS:
-{game_info['lang_analysis'] if game_info['lang_analysis'] else 'Not available'}
+{prompt_info['lang_analysis'] if prompt_info['lang_analysis'] else 'Not available'}
 
 ADDITIONAL CONTEXT:
-{game_info['document_analysis'] if game_info['document_analysis'] else 'Not available'}
+{prompt_info['document_analysis'] if prompt_info['document_analysis'] else 'Not available'}
 
 Create a student guide with the following sections:
 
@@ -1916,10 +2843,13 @@ Create a student guide with the following sections:
 
 Make it student-friendly, encouraging, and educational!"""
             
+            system_message = "You are an expert educational content creator specializing in creating engaging student materials for Minecraft Education. Write in a friendly, encouraging tone that speaks directly to students."
+            prompt = self._pack_prompt(prompt, self._game_info_sections(game_info), system_message, 3000)
+            
             response = client.chat.completions.create(
                 model=config['deployment'],
                 messages=[
-                    {"role": "system", "content": "You are an expert educational content creator specializing in creating engaging student materials for Minecraft Education. Write in a friendly, encouraging tone that speaks directly to students."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
@@ -1949,28 +2879,23 @@ Make it student-friendly, encouraging, and educational!"""
             print(f"Error creating student guide: {e}")
             return None
     
-    def create_student_workbook(self, game_name):
+    def create_student_workbook(self, game_name, base_info=None):
         """Create an interactive student workbook with activities."""
         if not self.settings.is_configured():
             return None
         
-        game_info = self._gather_all_game_info(game_name)
+        game_info = self._gather_all_game_info(game_name, purpose="student_workbook", base_info=base_info)
         
         if not game_info["context"] and not game_info["gameplay"]:
             print("Not enough game information available. Please add context and gameplay first.")
             return None
         
         try:
-            from openai import AzureOpenAI
-            
             config = self.settings.get_azure_config()
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             objectives_text = "\n".join([f"- {obj}" for obj in game_info["objectives"]]) if game_info["objectives"] else "Not specified"
+            prompt_info = self._prompt_game_info(game_info)
             
             prompt = f"""Create an interactive STUDENT WORKBOOK for the Minecraft Education game "{game_info['game_name']}". 
 
@@ -1979,19 +2904,19 @@ This workbook should include spaces for students to write, draw, and reflect. Us
 Available Information:
 
 GAME CONTEXT:
-{game_info['context']}
+{prompt_info['context']}
 
 GAMEPLAY:
-{game_info['gameplay']}
+{prompt_info['gameplay']}
 
 LEARNING OBJECTIVES:
 {objectives_text}
 
 LANGUAGE FILE ANALYSIS:
-{game_info['lang_analysis'] if game_info['lang_analysis'] else 'Not available'}
+{prompt_info['lang_analysis'] if prompt_info['lang_analysis'] else 'Not available'}
 
 ADDITIONAL CONTEXT:
-{game_info['document_analysis'] if game_info['document_analysis'] else 'Not available'}
+{prompt_info['document_analysis'] if prompt_info['document_analysis'] else 'Not available'}
 
 Create a workbook with these sections:
 
@@ -2036,10 +2961,13 @@ Use formatting like:
 - [ ] Checkboxes for tracking
 - Numbered/lettered spaces for responses"""
             
+            system_message = "You are an expert educational content creator. Create engaging, interactive workbooks that encourage active learning and reflection. Include clear spaces for student responses."
+            prompt = self._pack_prompt(prompt, self._game_info_sections(game_info), system_message, 3500)
+            
             response = client.chat.completions.create(
                 model=config['deployment'],
                 messages=[
-                    {"role": "system", "content": "You are an expert educational content creator. Create engaging, interactive workbooks that encourage active learning and reflection. Include clear spaces for student responses."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
@@ -2071,47 +2999,42 @@ Use formatting like:
             print(f"Error creating student workbook: {e}")
             return None
     
-    def create_student_quiz(self, game_name):
+    def create_student_quiz(self, game_name, base_info=None):
         """Create a student quiz with answer key."""
         if not self.settings.is_configured():
             return None
         
-        game_info = self._gather_all_game_info(game_name)
+        game_info = self._gather_all_game_info(game_name, purpose="student_quiz", base_info=base_info)
         
         if not game_info["context"] and not game_info["gameplay"]:
             print("Not enough game information available. Please add context and gameplay first.")
             return None
         
         try:
-            from openai import AzureOpenAI
-            
             config = self.settings.get_azure_config()
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             objectives_text = "\n".join([f"- {obj}" for obj in game_info["objectives"]]) if game_info["objectives"] else "Not specified"
+            prompt_info = self._prompt_game_info(game_info)
             
             prompt = f"""Create a comprehensive STUDENT QUIZ for the Minecraft Education game "{game_info['game_name']}". 
 
 Available Information:
 
 GAME CONTEXT:
-{game_info['context']}
+{prompt_info['context']}
 
 GAMEPLAY:
-{game_info['gameplay']}
+{prompt_info['gameplay']}
 
 LEARNING OBJECTIVES:
 {objectives_text}
 
 LANGUAGE FILE ANALYSIS:
-{game_info['lang_analysis'] if game_info['lang_analysis'] else 'Not available'}
+{prompt_info['lang_analysis'] if prompt_info['lang_analysis'] else 'Not available'}
 
 ADDITIONAL CONTEXT:
-{game_info['document_analysis'] if game_info['document_analysis'] else 'Not available'}
+{prompt_info['document_analysis'] if prompt_info['document_analysis'] else 'Not available'}
 
 Create a quiz with:
 
@@ -2137,10 +3060,13 @@ Provide both:
 1. The student quiz (questions only)
 2. Complete answer key with explanations"""
             
+            system_message = "You are an expert educational assessment creator. Create clear, fair quizzes that assess student understanding at multiple levels. Provide detailed answer keys with explanations."
+            prompt = self._pack_prompt(prompt, self._game_info_sections(game_info), system_message, 3500)
+            
             response = client.chat.completions.create(
                 model=config['deployment'],
                 messages=[
-                    {"role": "system", "content": "You are an expert educational assessment creator. Create clear, fair quizzes that assess student understanding at multiple levels. Provide detailed answer keys with explanations."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.6,
@@ -2202,47 +3128,42 @@ Provide both:
             print(f"Error creating student quiz: {e}")
             return None
     
-    def create_parent_guide(self, game_name):
+    def create_parent_guide(self, game_name, base_info=None):
         """Create a parent guide for the Minecraft Education game."""
         if not self.settings.is_configured():
             return None
         
-        game_info = self._gather_all_game_info(game_name)
+        game_info = self._gather_all_game_info(game_name, purpose="parent_guide", base_info=base_info)
         
         if not game_info["context"] and not game_info["gameplay"]:
             print("Not enough game information available. Please add context and gameplay first.")
             return None
         
         try:
-            from openai import AzureOpenAI
-            
             config = self.settings.get_azure_config()
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             objectives_text = "\n".join([f"- {obj}" for obj in game_info["objectives"]]) if game_info["objectives"] else "Not specified"
+            prompt_info = self._prompt_game_info(game_info)
             
             prompt = f"""Create a comprehensive PARENT GUIDE for the Minecraft Education game "{game_info['game_name']}".
 
 Available Information:
 
 GAME CONTEXT:
-{game_info['context']}
+{prompt_info['context']}
 
 GAMEPLAY:
-{game_info['gameplay']}
+{prompt_info['gameplay']}
 
 LEARNING OBJECTIVES:
 {objectives_text}
 
 LANGUAGE FILE ANALYSIS:
-{game_info['lang_analysis'] if game_info['lang_analysis'] else 'Not available'}
+{prompt_info['lang_analysis'] if prompt_info['lang_analysis'] else 'Not available'}
 
 ADDITIONAL CONTEXT:
-{game_info['document_analysis'] if game_info['document_analysis'] else 'Not available'}
+{prompt_info['document_analysis'] if prompt_info['document_analysis'] else 'Not available'}
 
 Create a parent guide that includes:
 
@@ -2273,10 +3194,13 @@ Create a parent guide that includes:
 
 Write in a friendly, accessible tone that helps parents understand the educational value and support their child's learning."""
             
+            system_message = "You are an expert in educational communication with parents. Create clear, supportive guides that help parents understand and support their child's learning through Minecraft Education."
+            prompt = self._pack_prompt(prompt, self._game_info_sections(game_info), system_message, 3000)
+            
             response = client.chat.completions.create(
                 model=config['deployment'],
                 messages=[
-                    {"role": "system", "content": "You are an expert in educational communication with parents. Create clear, supportive guides that help parents understand and support their child's learning through Minecraft Education."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.6,
@@ -2306,47 +3230,42 @@ Write in a friendly, accessible tone that helps parents understand the education
             print(f"Error creating parent guide: {e}")
             return None
     
-    def create_teacher_guide(self, game_name):
+    def create_teacher_guide(self, game_name, base_info=None):
         """Create a teacher guide for the Minecraft Education game."""
         if not self.settings.is_configured():
             return None
         
-        game_info = self._gather_all_game_info(game_name)
+        game_info = self._gather_all_game_info(game_name, purpose="teacher_guide", base_info=base_info)
         
         if not game_info["context"] and not game_info["gameplay"]:
             print("Not enough game information available. Please add context and gameplay first.")
             return None
         
         try:
-            from openai import AzureOpenAI
-            
             config = self.settings.get_azure_config()
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             objectives_text = "\n".join([f"- {obj}" for obj in game_info["objectives"]]) if game_info["objectives"] else "Not specified"
+            prompt_info = self._prompt_game_info(game_info)
             
             prompt = f"""Create a comprehensive TEACHER GUIDE for the Minecraft Education game "{game_info['game_name']}".
 
 Available Information:
 
 GAME CONTEXT:
-{game_info['context']}
+{prompt_info['context']}
 
 GAMEPLAY:
-{game_info['gameplay']}
+{prompt_info['gameplay']}
 
 LEARNING OBJECTIVES:
 {objectives_text}
 
 LANGUAGE FILE ANALYSIS:
-{game_info['lang_analysis'] if game_info['lang_analysis'] else 'Not available'}
+{prompt_info['lang_analysis'] if prompt_info['lang_analysis'] else 'Not available'}
 
 ADDITIONAL CONTEXT:
-{game_info['document_analysis'] if game_info['document_analysis'] else 'Not available'}
+{prompt_info['document_analysis'] if prompt_info['document_analysis'] else 'Not available'}
 
 Create a detailed teacher guide that includes:
 
@@ -2391,10 +3310,13 @@ Create a detailed teacher guide that includes:
 
 Write in a professional, practical tone that gives teachers actionable guidance."""
             
+            system_message = "You are an expert in educational pedagogy and Minecraft Education implementation. Create comprehensive, practical teacher guides that support effective classroom instruction."
+            prompt = self._pack_prompt(prompt, self._game_info_sections(game_info), system_message, 4000)
+            
             response = client.chat.completions.create(
                 model=config['deployment'],
                 messages=[
-                    {"role": "system", "content": "You are an expert in educational pedagogy and Minecraft Education implementation. Create comprehensive, practical teacher guides that support effective classroom instruction."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.6,
@@ -2424,47 +3346,42 @@ Write in a professional, practical tone that gives teachers actionable guidance.
             print(f"Error creating teacher guide: {e}")
             return None
     
-    def create_leadership_sheet(self, game_name):
+    def create_leadership_sheet(self, game_name, base_info=None):
         """Create a school leadership information sheet for the Minecraft Education game."""
         if not self.settings.is_configured():
             return None
         
-        game_info = self._gather_all_game_info(game_name)
+        game_info = self._gather_all_game_info(game_name, purpose="leadership_sheet", base_info=base_info)
         
         if not game_info["context"] and not game_info["gameplay"]:
             print("Not enough game information available. Please add context and gameplay first.")
             return None
         
         try:
-            from openai import AzureOpenAI
-            
             config = self.settings.get_azure_config()
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             objectives_text = "\n".join([f"- {obj}" for obj in game_info["objectives"]]) if game_info["objectives"] else "Not specified"
+            prompt_info = self._prompt_game_info(game_info)
             
             prompt = f"""Create a concise SCHOOL LEADERSHIP INFORMATION SHEET for the Minecraft Education game "{game_info['game_name']}".
 
 Available Information:
 
 GAME CONTEXT:
-{game_info['context']}
+{prompt_info['context']}
 
 GAMEPLAY:
-{game_info['gameplay']}
+{prompt_info['gameplay']}
 
 LEARNING OBJECTIVES:
 {objectives_text}
 
 LANGUAGE FILE ANALYSIS:
-{game_info['lang_analysis'] if game_info['lang_analysis'] else 'Not available'}
+{prompt_info['lang_analysis'] if prompt_info['lang_analysis'] else 'Not available'}
 
 ADDITIONAL CONTEXT:
-{game_info['document_analysis'] if game_info['document_analysis'] else 'Not available'}
+{prompt_info['document_analysis'] if prompt_info['document_analysis'] else 'Not available'}
 
 Create a 1-2 page executive summary that includes:
 
@@ -2510,10 +3427,13 @@ Create a 1-2 page executive summary that includes:
 
 Write in a concise, executive-level tone focused on strategic value and practical implementation. Use bullet points and clear sections for easy scanning."""
             
+            system_message = "You are an expert in educational leadership communication and strategic planning. Create concise, compelling information sheets that help school leaders make informed decisions about educational technology initiatives."
+            prompt = self._pack_prompt(prompt, self._game_info_sections(game_info), system_message, 3000)
+            
             response = client.chat.completions.create(
                 model=config['deployment'],
                 messages=[
-                    {"role": "system", "content": "You are an expert in educational leadership communication and strategic planning. Create concise, compelling information sheets that help school leaders make informed decisions about educational technology initiatives."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.6,
@@ -2543,30 +3463,27 @@ Write in a concise, executive-level tone focused on strategic value and practica
             print(f"Error creating leadership information sheet: {e}")
             return None
     
-    def create_curriculum_mapping(self, game_name, country, standards):
+    def create_curriculum_mapping(self, game_name, country, standards, base_info=None):
         """Create a curriculum standards mapping document."""
         if not self.settings.is_configured():
             return None
         
-        game_info = self._gather_all_game_info(game_name)
+        game_info = self._gather_all_game_info(game_name, purpose="curriculum_mapping", query=f"{country} {standards}",
+                                               base_info=base_info)
         
         if not game_info["context"] and not game_info["gameplay"]:
             print("Not enough game information available. Please add context and gameplay first.")
             return None
         
         try:
-            from openai import AzureOpenAI
-            
             config = self.settings.get_azure_config()
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             objectives_text = "\n".join([f"- {obj}" for obj in game_info["objectives"]]) if game_info["objectives"] else "Not specified"
             standards_text = "\n".join([f"- {std}" for std in standards])
             
+            prompt_info = self._prompt_game_info(game_info)
+            
             prompt = f"""Create a comprehensive CURRICULUM STANDARDS MAPPING document for the Minecraft Education game "{game_info['game_name']}".
 
 COUNTRY/REGION: {country}
@@ -2577,19 +3494,19 @@ STANDARDS TO MAP:
 GAME INFORMATION:
 
 CONTEXT:
-{game_info['context']}
+{prompt_info['context']}
 
 GAMEPLAY:
-{game_info['gameplay']}
+{prompt_info['gameplay']}
 
 LEARNING OBJECTIVES:
 {objectives_text}
 
 LANGUAGE FILE ANALYSIS:
-{game_info['lang_analysis'] if game_info['lang_analysis'] else 'Not available'}
+{prompt_info['lang_analysis'] if prompt_info['lang_analysis'] else 'Not available'}
 
 ADDITIONAL CONTEXT:
-{game_info['document_analysis'] if game_info['document_analysis'] else 'Not available'}
+{prompt_info['document_analysis'] if prompt_info['document_analysis'] else 'Not available'}
 
 Create a detailed standards mapping document that includes:
 
@@ -2635,10 +3552,13 @@ Create a detailed standards mapping document that includes:
 
 Be specific and detailed. Include actual standard codes/identifiers where applicable. Provide clear evidence of how game activities align with each standard. Make this document practical for teachers to use for lesson planning and reporting."""
             
+            system_message = f"You are an expert in curriculum standards alignment and educational assessment, with deep knowledge of {country} education standards. Create detailed, accurate mappings between learning activities and curriculum standards, using specific standard codes and identifiers where applicable."
+            prompt = self._pack_prompt(prompt, self._game_info_sections(game_info), system_message, 4000)
+            
             response = client.chat.completions.create(
                 model=config['deployment'],
                 messages=[
-                    {"role": "system", "content": f"You are an expert in curriculum standards alignment and educational assessment, with deep knowledge of {country} education standards. Create detailed, accurate mappings between learning activities and curriculum standards, using specific standard codes and identifiers where applicable."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.5,
@@ -2672,39 +3592,48 @@ Be specific and detailed. Include actual standard codes/identifiers where applic
             print(f"Error creating curriculum mapping: {e}")
             return None
     
-    def create_text_complexity_analysis(self, game_name):
+    def create_text_complexity_analysis(self, game_name, base_info=None):
         """Create a text complexity analysis with simplification recommendations."""
         if not self.settings.is_configured():
             return None
         
-        game_info = self._gather_all_game_info(game_name)
+        game_info = self._gather_all_game_info(game_name, purpose="text_complexity", base_info=base_info)
+        # The documents' notes on audience and reading level say which grade the text
+        # should be simplified for; only retrieved passages (or notes already within
+        # the retrieval budget) go in, never every document analysis in full
+        budget = int(self.settings.get_value('retrieval_tokens', passage_retrieval.RETRIEVAL_SECTION_TOKENS))
+        if prompt_packer.count_tokens(game_info["document_analysis"], self._token_model()) > budget:
+            game_info["document_analysis"] = ""
         
-        if not game_info["lang_analysis"]:
-            print("No language file analysis available. Please extract and analyze language files first.")
+        # Readability is measured locally over every entry; only the metrics, the
+        # hardest lines and the audience notes above go to the model
+        readability = self.measure_lang_readability(game_name)
+        if not readability:
+            print("No language file available. Please extract language files first.")
             return None
         
+        metrics_text = lang_readability.format_metrics(readability["summary"], readability["worst_entries"])
+        
         try:
-            from openai import AzureOpenAI
-            
             config = self.settings.get_azure_config()
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
             
             objectives_text = "\n".join([f"- {obj}" for obj in game_info["objectives"]]) if game_info["objectives"] else "Not specified"
+            prompt_info = self._prompt_game_info(game_info)
             
             prompt = f"""Analyze the TEXT COMPLEXITY of the in-game language for the Minecraft Education game "{game_info['game_name']}" and provide detailed recommendations for simplification to improve accessibility.
 
 GAME CONTEXT:
-{game_info['context'] if game_info['context'] else 'Not available'}
+{prompt_info['context'] if prompt_info['context'] else 'Not available'}
 
 LEARNING OBJECTIVES:
 {objectives_text}
 
-LANGUAGE FILE ANALYSIS (NPC Dialogue & In-Game Text):
-{game_info['lang_analysis']}
+MEASURED READABILITY (computed over every NPC dialogue and in-game text entry):
+{metrics_text}
+
+AUDIENCE AND READING LEVEL NOTES FROM THE GAME'S DOCUMENTS:
+{prompt_info['document_analysis'] if prompt_info['document_analysis'] else 'Not available'}
 
 Provide a comprehensive TEXT COMPLEXITY ANALYSIS that includes:
 
@@ -2782,12 +3711,15 @@ Provide a comprehensive TEXT COMPLEXITY ANALYSIS that includes:
    - Reading level improvement
    - Maintained educational value
 
-Be specific and actionable. Provide actual text examples from the game. Focus on maintaining educational integrity while improving accessibility. Consider the target audience and learning objectives when making recommendations."""
+Use the measured figures above for all readability scores, grade levels and ratios rather than estimating your own, and take your text examples from the hardest entries listed. Be specific and actionable. Provide actual text examples from the game. Focus on maintaining educational integrity while improving accessibility. Consider the target audience and learning objectives when making recommendations."""
+            
+            system_message = "You are an expert in educational linguistics, readability analysis, and accessible content design. You specialize in analyzing text complexity for educational games and providing practical recommendations to improve accessibility while maintaining learning objectives. Use readability formulas, cognitive load theory, and UDL principles in your analysis."
+            prompt = self._pack_prompt(prompt, self._game_info_sections(game_info), system_message, 4000)
             
             response = client.chat.completions.create(
                 model=config['deployment'],
                 messages=[
-                    {"role": "system", "content": "You are an expert in educational linguistics, readability analysis, and accessible content design. You specialize in analyzing text complexity for educational games and providing practical recommendations to improve accessibility while maintaining learning objectives. Use readability formulas, cognitive load theory, and UDL principles in your analysis."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.5,
@@ -2812,6 +3744,8 @@ Be specific and actionable. Provide actual text examples from the game. Focus on
                 f.write("## Purpose\n\n")
                 f.write("This analysis evaluates the complexity of in-game text and provides recommendations ")
                 f.write("to simplify language for improved accessibility while maintaining educational value.\n\n")
+                f.write("## Measured Readability\n\n")
+                f.write("```\n" + lang_readability.format_metrics(readability["summary"], []) + "\n```\n\n")
                 f.write("---\n\n")
                 f.write(content)
             
@@ -2821,8 +3755,52 @@ Be specific and actionable. Provide actual text examples from the game. Focus on
             print(f"Error creating text complexity analysis: {e}")
             return None
     
-    def analyze_lang_file_with_ai(self, game_name):
-        """Analyze the extracted language file using Azure OpenAI and save in standardized format."""
+    def measure_lang_readability(self, game_name, worst_count=READABILITY_WORST_ENTRIES):
+        """Compute readability metrics over every entry of the extracted lang file and save them.
+        
+        Returns:
+            dict with "summary" (aggregate metrics) and "worst_entries" (the
+            hardest-to-read lines with their metrics), or None without lang data
+        """
+        lang_dir = os.path.join(self.games_dir, game_name, "lang")
+        if not os.path.exists(lang_dir):
+            return None
+        
+        json_files = self._find_lang_json_files(lang_dir)
+        if not json_files:
+            return None
+        
+        try:
+            with open(os.path.join(lang_dir, json_files[0]), 'r', encoding='utf-8') as f:
+                lang_data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error reading lang file: {e}")
+            return None
+        
+        clean_entries = lang_tokenizer.clean_lang_entries(self._load_structured_lang(lang_dir, lang_data))
+        metrics = lang_readability.ReadabilityMetrics(clean_entries)
+        
+        readability = {
+            "measured_at": datetime.now().isoformat(),
+            "source": json_files[0],
+            "summary": metrics.summary(),
+            "worst_entries": metrics.worst_entries(worst_count)
+        }
+        # create_all measures on a worker thread, alongside uploads rewriting metadata.json
+        with self._metadata_lock:
+            self.save_game_info(game_name, "lang_readability", readability)
+        return readability
+    
+    def analyze_lang_file_with_ai(self, game_name, delta_only=False):
+        """Analyze the extracted language file using Azure OpenAI and save in standardized format.
+        
+        Args:
+            game_name: Name of the game
+            delta_only: Update the existing analysis from the entries in
+                lang_delta.json instead of re-analyzing the whole file. Falls
+                back to a full analysis when there is no delta or no earlier
+                analysis to update.
+        """
         if not self.settings.is_configured():
             print("Azure OpenAI is not configured!")
             return None
@@ -2834,31 +3812,72 @@ Be specific and actionable. Provide actual text examples from the game. Focus on
         if not os.path.exists(lang_dir):
             return None
             
-        json_files = [f for f in os.listdir(lang_dir) if f.endswith('.json') and f != 'extraction_analysis.json']
+        json_files = self._find_lang_json_files(lang_dir)
         
         if not json_files:
             return None
         
         json_file = os.path.join(lang_dir, json_files[0])
         
+        if delta_only:
+            analysis = self._analyze_lang_delta_with_ai(game_name, lang_dir, json_file)
+            if analysis is not None:
+                return analysis
+        
         try:
             with open(json_file, 'r', encoding='utf-8') as f:
                 lang_data = json.load(f)
             
-            # Create a sample of the lang data for analysis
-            sample_entries = dict(list(lang_data.items())[:50])  # First 50 entries
-            sample_text = json.dumps(sample_entries, indent=2)
-            
-            from openai import AzureOpenAI
+            # Clean text only, without LOCKED/formatting-only values or near-duplicates.
+            # No token budget: map-reduce covers every remaining entry, however many
+            model = self._token_model()
+            clean_entries, sampling = lang_sampler.sample_lang_entries(
+                self._load_structured_lang(lang_dir, lang_data), raw_data=lang_data, model=model
+            )
+            # Conversations in line order and namespaces kept together, so each chunk
+            # holds whole subtrees of the key hierarchy rather than scattered lines
+            index = self._load_lang_index(lang_dir, lang_data)
+            clean_entries = {key: clean_entries[key] for key in index.reading_order(list(clean_entries))}
+            chunk_tokens = int(self.settings.get_value('lang_chunk_tokens', LANG_CHUNK_TOKENS))
+            parallelism = max(1, int(self.settings.get_value('analysis_parallelism', ANALYSIS_PARALLELISM)))
+            chunks = lang_tokenizer.chunk_lang_entries(clean_entries, chunk_tokens, model)
             
             config = self.settings.get_azure_config()
             
-            client = AzureOpenAI(
-                api_key=config['api_key'],
-                api_version=config['api_version'],
-                azure_endpoint=config['endpoint']
-            )
+            client = ai_client.get_client(config)
+            
+            started = time.perf_counter()
             
+            if len(chunks) <= 1:
+                # Everything fits in one request: no need for a separate reduce step
+                entries_text = json.dumps(chunks[0] if chunks else {}, indent=2, ensure_ascii=False)
+                source_text = (f"Language file entries ({len(clean_entries)} distinct entries with readable text, "
+                               f"out of {len(lang_data)}):\n{entries_text}")
+                analyzed_entries = len(clean_entries)
+                failed_chunks = 0
+            else:
+                # Map: summarize each chunk concurrently
+                from concurrent.futures import ThreadPoolExecutor
+                
+                with ThreadPoolExecutor(max_workers=parallelism) as pool:
+                    chunk_notes = list(pool.map(
+                        lambda item: self._analyze_lang_chunk(client, config, item[0], len(chunks), item[1]),
+                        enumerate(chunks, 1)
+                    ))
+                
+                succeeded = [(chunk, notes) for chunk, notes in zip(chunks, chunk_notes) if notes]
+                if not succeeded:
+                    print("Error analyzing lang file: every chunk analysis failed")
+                    return None
+                
+                analyzed_entries = sum(len(chunk) for chunk, _ in succeeded)
+                failed_chunks = len(chunks) - len(succeeded)
+                notes_text = "\n\n".join(f"--- Part {i} of {len(chunks)} ---\n{notes}"
+                                          for i, notes in enumerate(chunk_notes, 1) if notes)
+                source_text = (f"Notes from {len(succeeded)} parts covering {analyzed_entries} of "
+                               f"{len(clean_entries)} distinct entries with readable text, out of {len(lang_data)}:\n{notes_text}")
+            
+            # Reduce: one structured analysis of everything
             prompt = f"""Analyze this Minecraft Education language file data and provide a structured analysis in the following format:
 
 1. NARRATIVE ELEMENTS:
@@ -2886,8 +3905,7 @@ Be specific and actionable. Provide actual text examples from the game. Focus on
    - Curriculum alignment
    - Overall educational theme
 
-Language file sample (showing {len(sample_entries)} of {len(lang_data)} entries):
-{sample_text}"""
+{source_text}"""
             
             response = client.chat.completions.create(
                 model=config['deployment'],
@@ -2905,7 +3923,21 @@ Language file sample (showing {len(sample_entries)} of {len(lang_data)} entries)
             analysis_data = {
                 "analyzed_at": datetime.now().isoformat(),
                 "total_entries": len(lang_data),
-                "sample_size": len(sample_entries),
+                "sample_size": analyzed_entries,
+                "coverage": {
+                    "entries_analyzed": analyzed_entries,
+                    "readable_entries": sampling["readable_entries"],
+                    # Readable entries not sent: near-duplicates of analyzed ones, and
+                    # those in chunks whose request failed
+                    "near_duplicates": sampling["near_duplicates"],
+                    "failed_entries": len(clean_entries) - analyzed_entries,
+                    "percent": (round(100.0 * analyzed_entries / sampling["readable_entries"], 1)
+                                if sampling["readable_entries"] else 100.0)
+                },
+                "chunks": len(chunks),
+                "failed_chunks": failed_chunks,
+                "sampling": sampling,
+                "latency_seconds": round(time.perf_counter() - started, 2),
                 "analysis": analysis_text,
                 "summary": self._extract_summary(analysis_text)
             }
@@ -2916,12 +3948,155 @@ Language file sample (showing {len(sample_entries)} of {len(lang_data)} entries)
             # Update metadata
             self._update_lang_metadata(game_name, analyzed=True)
             
+            # A full analysis covers any pending delta
+            self._save_analyzed_lang(lang_dir, lang_data, analysis_data["analyzed_at"])
+            self._mark_lang_delta_analyzed(lang_dir, analysis_data["analyzed_at"])
+            
             return analysis_text
         
         except Exception as e:
             print(f"Error analyzing lang file: {e}")
             return None
     
+    def _analyze_lang_chunk(self, client, config, index, total, chunk):
+        """Map step of the lang analysis: condensed notes on one chunk of entries.
+        Returns None if the request fails, so the other chunks still count."""
+        prompt = f"""This is part {index} of {total} of a Minecraft Education language file.
+Write concise notes on what this part contains, to be combined with the notes on the other parts:
+- story, characters/NPCs and dialogue themes
+- educational subjects, concepts and learning activities
+- goals, quests and success criteria
+- player guidance and tutorial text
+Quote distinctive lines briefly. Skip UI boilerplate.
+
+Entries:
+{json.dumps(chunk, indent=2, ensure_ascii=False)}"""
+        
+        try:
+            response = client.chat.completions.create(
+                model=config['deployment'],
+                messages=[
+                    {"role": "system", "content": "You are an educational game content analyst specializing in Minecraft Education."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=800
+            )
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"Error analyzing lang chunk {index} of {total}: {e}")
+            return None
+    
+    def _analyze_lang_delta_with_ai(self, game_name, lang_dir, json_file):
+        """Update the saved lang analysis using only the added, removed and changed entries.
+        Returns None when a full analysis is needed instead."""
+        delta_file = os.path.join(lang_dir, "lang_delta.json")
+        previous = self.load_game_info(game_name) or {}
+        previous_analysis = previous.get("lang_analysis")
+        
+        if not os.path.exists(delta_file) or not isinstance(previous_analysis, dict) or "analysis" not in previous_analysis:
+            return None
+        
+        try:
+            with open(delta_file, 'r', encoding='utf-8') as f:
+                delta = json.load(f)
+            with open(json_file, 'r', encoding='utf-8') as f:
+                lang_data = json.load(f)
+            
+            changed_count = len(delta["added"]) + len(delta["removed"]) + len(delta["changed"])
+            
+            # Nothing changed (or already applied): the saved analysis still holds
+            if changed_count == 0 or delta.get("analyzed_at"):
+                return previous_analysis["analysis"]
+            
+            # Send only what differs from the build the analysis was made from, as a
+            # deduplicated clean-text sample shared between added and changed entries
+            new_values = dict(delta["added"])
+            new_values.update({k: v["new"] for k, v in delta["changed"].items()})
+            sample, sampling = lang_sampler.sample_lang_entries(
+                lang_tokenizer.tokenize_lang_entries(new_values), LANG_DELTA_SAMPLE_TOKENS, raw_data=new_values,
+                model=self._token_model()
+            )
+            updates = {k: v for k, v in sample.items() if k in delta["added"]}
+            changed = {k: v for k, v in sample.items() if k not in delta["added"]}
+            removed_keys = list(delta["removed"].keys())[:LANG_DELTA_SAMPLE_LIMIT]
+            
+            config = self.settings.get_azure_config()
+            
+            client = ai_client.get_client(config)
+            
+            prompt = f"""A new build of this Minecraft Education world has changed some of its language file entries.
+Update the existing analysis below to reflect the changes. Keep the same five-section structure
+(NARRATIVE ELEMENTS, EDUCATIONAL CONTENT, GAME OBJECTIVES, INSTRUCTIONAL TEXT, EDUCATIONAL FOCUS)
+and return the complete updated analysis.
+
+EXISTING ANALYSIS:
+{previous_analysis["analysis"]}
+
+ADDED ENTRIES ({len(delta["added"])} total, showing {len(updates)}):
+{json.dumps(updates, indent=2, ensure_ascii=False)}
+
+CHANGED ENTRIES, NEW TEXT ({len(delta["changed"])} total, showing {len(changed)}):
+{json.dumps(changed, indent=2, ensure_ascii=False)}
+
+REMOVED KEYS ({len(delta["removed"])} total, showing {len(removed_keys)}):
+{json.dumps(removed_keys, indent=2, ensure_ascii=False)}"""
+            
+            response = client.chat.completions.create(
+                model=config['deployment'],
+                messages=[
+                    {"role": "system", "content": "You are an educational game content analyst specializing in Minecraft Education. Provide structured, detailed analysis of language files to extract educational context and gameplay information."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.5,
+                max_tokens=2000
+            )
+            
+            analysis_text = response.choices[0].message.content.strip()
+            
+            analysis_data = {
+                "analyzed_at": datetime.now().isoformat(),
+                "total_entries": delta["current_entries"],
+                "sample_size": len(updates) + len(changed) + len(removed_keys),
+                "delta": {
+                    "added": len(delta["added"]),
+                    "removed": len(delta["removed"]),
+                    "changed": len(delta["changed"])
+                },
+                "sampling": sampling,
+                "analysis": analysis_text,
+                "summary": self._extract_summary(analysis_text)
+            }
+            
+            self.save_game_info(game_name, "lang_analysis", analysis_data)
+            self._update_lang_metadata(game_name, analyzed=True)
+            
+            # Later extractions are diffed against this build; mark the delta as
+            # applied so it is not sent again
+            self._save_analyzed_lang(lang_dir, lang_data, analysis_data["analyzed_at"])
+            self._mark_lang_delta_analyzed(lang_dir, analysis_data["analyzed_at"])
+            
+            return analysis_text
+        
+        except Exception as e:
+            print(f"Error analyzing lang delta: {e}")
+            return None
+    
+    def _mark_lang_delta_analyzed(self, lang_dir, analyzed_at):
+        """Record that the current lang delta is reflected in the saved analysis."""
+        delta_file = os.path.join(lang_dir, "lang_delta.json")
+        if not os.path.exists(delta_file):
+            return
+        
+        try:
+            with open(delta_file, 'r', encoding='utf-8') as f:
+                delta = json.load(f)
+            delta["analyzed_at"] = analyzed_at
+            with open(delta_file, 'w', encoding='utf-8') as f:
+                json.dump(delta, f, indent=4, ensure_ascii=False)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error updating lang delta: {e}")
+    
     def _extract_summary(self, analysis_text):
         """Extract a brief summary from the analysis text."""
         lines = analysis_text.split('\n')
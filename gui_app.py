@@ -21,8 +21,10 @@ except Exception as e:
     TKINTER_ERROR = f"Tkinter initialization error: {str(e)}"
 
 import threading
+import multiprocessing
 from game_manager import GameManager
 from settings import Settings
+from downloads_manifest import format_size
 
 
 class EduContentToolsGUI:
@@ -100,21 +102,97 @@ class EduContentToolsGUI:
         title = ttk.Label(header_frame, text="EduContentTools", style="Title.TLabel")
         title.grid(row=0, column=0, sticky=tk.W)
         
+        # Search across all games
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(header_frame, textvariable=self.search_var, width=30, font=("Helvetica", 11))
+        search_entry.grid(row=0, column=1, sticky=tk.E, padx=(0, 5))
+        search_entry.bind('<Return>', lambda e: self.search_games())
+        ttk.Button(header_frame, text="Search", 
+                  command=self.search_games, style="Action.TButton").grid(row=0, column=2, sticky=tk.E, padx=(0, 15))
+        
         # AI connection indicator
         self.ai_indicator = tk.Canvas(header_frame, width=12, height=12, highlightthickness=0)
-        self.ai_indicator.grid(row=0, column=1, sticky=tk.E, padx=(0, 5))
+        self.ai_indicator.grid(row=0, column=3, sticky=tk.E, padx=(0, 5))
         self.update_ai_indicator()
         
         ai_label = ttk.Label(header_frame, text="AI", font=("Helvetica", 10))
-        ai_label.grid(row=0, column=2, sticky=tk.E, padx=(0, 15))
+        ai_label.grid(row=0, column=4, sticky=tk.E, padx=(0, 15))
         
         # Settings button
         settings_btn = ttk.Button(header_frame, text="Settings", 
                                   command=self.open_settings, style="Action.TButton")
-        settings_btn.grid(row=0, column=3, sticky=tk.E, padx=5)
+        settings_btn.grid(row=0, column=5, sticky=tk.E, padx=5)
         
         header_frame.columnconfigure(0, weight=1)
     
+    def search_games(self):
+        """Search every game's lang entries, analyses, info and creations, and list the ranked matches."""
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        
+        self.status_label.config(text="Searching...")
+        self.root.update()
+        results = self.game_manager.search_games(query, limit=50)
+        self.status_label.config(text=f"{len(results)} match(es) for '{query}'")
+        
+        if not results:
+            messagebox.showinfo("Search", f"No matches found for '{query}'.")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title(f"Search: {query}")
+        dialog.geometry("900x500")
+        dialog.transient(self.root)
+        
+        columns = ("kind", "label", "score")
+        tree = ttk.Treeview(dialog, columns=columns, show="tree headings", selectmode="browse")
+        tree.heading("#0", text="Game")
+        tree.heading("kind", text="Source")
+        tree.heading("label", text="Entry")
+        tree.heading("score", text="Score")
+        tree.column("#0", width=220)
+        tree.column("kind", width=90)
+        tree.column("label", width=480)
+        tree.column("score", width=60, anchor=tk.E)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        for index, result in enumerate(results):
+            tree.insert("", tk.END, iid=str(index), text=result["game"], values=(
+                result["kind"],
+                result["label"] or os.path.basename(result["path"]),
+                result["score"]
+            ))
+        
+        detail = scrolledtext.ScrolledText(dialog, wrap=tk.WORD, height=6, font=("Helvetica", 11))
+        detail.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        def on_select(event):
+            selection = tree.selection()
+            if not selection:
+                return
+            result = results[int(selection[0])]
+            detail.delete(1.0, tk.END)
+            detail.insert(tk.END, f"{result['path']}\n\n{result['snippet']}")
+        
+        def open_game(event):
+            # Select the result's game in the sidebar
+            selection = tree.selection()
+            if not selection:
+                return
+            game = results[int(selection[0])]["game"]
+            games = self.game_listbox.get(0, tk.END)
+            if game in games:
+                position = games.index(game)
+                self.game_listbox.selection_clear(0, tk.END)
+                self.game_listbox.selection_set(position)
+                self.game_listbox.see(position)
+                self.on_game_select(None)
+        
+        tree.bind('<<TreeviewSelect>>', on_select)
+        tree.bind('<Double-1>', open_game)
+        dialog.bind('<Escape>', lambda e: dialog.destroy())
+    
     def update_ai_indicator(self):
         """Update the AI connection status indicator."""
         self.ai_indicator.delete("all")
@@ -198,10 +276,16 @@ class EduContentToolsGUI:
         
         ttk.Button(btn_frame, text="Upload World File", 
                   command=self.upload_world_file, style="Action.TButton").grid(row=0, column=0, padx=5)
+        ttk.Button(btn_frame, text="World from Downloads", 
+                  command=self.pick_world_from_downloads, style="Action.TButton").grid(row=0, column=1, padx=5)
         ttk.Button(btn_frame, text="Upload Documents", 
-                  command=self.upload_documents, style="Action.TButton").grid(row=0, column=1, padx=5)
+                  command=self.upload_documents, style="Action.TButton").grid(row=0, column=2, padx=5)
         ttk.Button(btn_frame, text="Extract Language Files", 
-                  command=self.extract_language_files, style="Action.TButton").grid(row=0, column=2, padx=5)
+                  command=self.extract_language_files, style="Action.TButton").grid(row=0, column=3, padx=5)
+        ttk.Button(btn_frame, text="Browse Lang Keys", 
+                  command=self.browse_lang_keys, style="Action.TButton").grid(row=0, column=4, padx=5)
+        ttk.Button(btn_frame, text="Ingest Folder", 
+                  command=self.ingest_document_folder, style="Action.TButton").grid(row=0, column=5, padx=5)
         
         tab.columnconfigure(0, weight=1)
         tab.rowconfigure(0, weight=1)
@@ -281,15 +365,23 @@ class EduContentToolsGUI:
                   command=lambda: self.create_content("text_complexity"), 
                   style="Action.TButton").grid(row=0, column=1, padx=5, pady=5, sticky=(tk.W, tk.E))
         
+        # Everything at once
+        all_frame = ttk.LabelFrame(tab, text="All Resources", padding="10")
+        all_frame.grid(row=4, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        
+        ttk.Button(all_frame, text="Create All", 
+                  command=self.create_all_content, 
+                  style="Action.TButton").grid(row=0, column=0, padx=5, pady=5, sticky=(tk.W, tk.E))
+        
         # Progress display
-        ttk.Label(tab, text="Creation Progress:", style="Heading.TLabel").grid(row=4, column=0, sticky=tk.W, pady=(10, 5))
+        ttk.Label(tab, text="Creation Progress:", style="Heading.TLabel").grid(row=5, column=0, sticky=tk.W, pady=(10, 5))
         self.progress_text = scrolledtext.ScrolledText(tab, wrap=tk.WORD, height=10, font=("Courier", 10))
-        self.progress_text.grid(row=5, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        self.progress_text.grid(row=6, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         
         tab.columnconfigure(0, weight=1)
-        tab.rowconfigure(5, weight=1)
+        tab.rowconfigure(6, weight=1)
         
-        for frame in [student_frame, adult_frame, leadership_frame, curriculum_frame]:
+        for frame in [student_frame, adult_frame, leadership_frame, curriculum_frame, all_frame]:
             for i in range(3):
                 frame.columnconfigure(i, weight=1)
     
@@ -479,7 +571,11 @@ Files will be saved to: games/[game-name]/exports/
             if metadata and metadata.get("documents"):
                 output += f"DOCUMENTS ({len(metadata['documents'])}):\n"
                 for doc in metadata["documents"]:
-                    output += f"  • {doc}\n"
+                    output += f"  • {doc['filename']}\n"
+                    similar = doc.get("similar_to")
+                    if similar:
+                        reused = " (analysis reused)" if similar.get("near_duplicate") else ""
+                        output += f"    Similar to: {similar['filename']} ({similar['similarity']:.1%}){reused}\n"
                 output += "\n"
         else:
             output += "No information available for this game.\n"
@@ -534,6 +630,78 @@ Files will be saved to: games/[game-name]/exports/
                 messagebox.showerror("Error", "Failed to upload world file.")
                 self.status_label.config(text="Upload failed")
     
+    def pick_world_from_downloads(self):
+        """Pick a world file from Downloads, showing the cached peek metadata for each."""
+        if not self.current_game:
+            messagebox.showwarning("No Game Selected", "Please select a game first.")
+            return
+        
+        world_infos = self.game_manager.list_world_files_in_downloads_with_info()
+        if not world_infos:
+            messagebox.showinfo("No World Files", "No .mcworld or .mctemplate files found in Downloads.")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("World Files in Downloads")
+        dialog.geometry("900x400")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        columns = ("world", "packs", "lang", "unpacked", "size")
+        tree = ttk.Treeview(dialog, columns=columns, show="tree headings", selectmode="browse")
+        tree.heading("#0", text="File")
+        tree.heading("world", text="World Name")
+        tree.heading("packs", text="Packs")
+        tree.heading("lang", text="Lang Files")
+        tree.heading("unpacked", text="Unpacked")
+        tree.heading("size", text="Size")
+        tree.column("#0", width=220)
+        tree.column("world", width=160)
+        tree.column("packs", width=260)
+        for column in ("lang", "unpacked", "size"):
+            tree.column(column, width=80, anchor=tk.E)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        for index, info in enumerate(world_infos):
+            world = info.get("world") or {}
+            packs = [p for p in world.get("packs", []) if p.get("type") in ("data", "resources")]
+            tree.insert("", tk.END, iid=str(index), text=info["filename"], values=(
+                world.get("level_name") or ("(unreadable)" if "error" in world else ""),
+                ", ".join(f"{p['name']} {p['version'] or ''}".strip() for p in packs),
+                world.get("lang_files", ""),
+                format_size(world["uncompressed_size"]) if "uncompressed_size" in world else "",
+                format_size(info["size"])
+            ))
+        
+        def upload():
+            selection = tree.selection()
+            if not selection:
+                messagebox.showwarning("No File Selected", "Please select a world file.", parent=dialog)
+                return
+            
+            file_path = world_infos[int(selection[0])]["path"]
+            dialog.destroy()
+            
+            self.status_label.config(text="Uploading world file...")
+            self.root.update()
+            
+            if self.game_manager.upload_world_file(self.current_game, file_path):
+                messagebox.showinfo("Success", "World file uploaded successfully!")
+                self.load_game_info()
+                self.status_label.config(text="World file uploaded")
+            else:
+                messagebox.showerror("Error", "Failed to upload world file.")
+                self.status_label.config(text="Upload failed")
+        
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.pack(pady=(0, 10))
+        
+        ttk.Button(btn_frame, text="Upload", command=upload, style="Primary.TButton").pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cancel", command=dialog.destroy, style="Action.TButton").pack(side=tk.LEFT, padx=5)
+        
+        tree.bind('<Double-1>', lambda e: upload())
+        dialog.bind('<Escape>', lambda e: dialog.destroy())
+    
     def upload_documents(self):
         """Upload documents."""
         if not self.current_game:
@@ -556,19 +724,82 @@ Files will be saved to: games/[game-name]/exports/
             self.root.update()
             
             success_count = 0
+            uploaded = []
             for filename in filenames:
                 if self.game_manager.upload_document(self.current_game, filename):
                     success_count += 1
+                    uploaded.append(os.path.basename(filename))
+            
+            # Revisions of documents that are already analyzed
+            metadata = self.game_manager._load_metadata(self.current_game) or {}
+            similar_lines = []
+            for doc in metadata.get("documents", []):
+                similar = doc.get("similar_to")
+                if doc["filename"] in uploaded and similar:
+                    reused = ", its analysis will be reused" if similar.get("near_duplicate") else ""
+                    similar_lines.append(f"{doc['filename']} is {similar['similarity']:.1%} similar to "
+                                         f"{similar['filename']}{reused}")
+            similar_text = ("\n\n" + "\n".join(similar_lines)) if similar_lines else ""
             
             if success_count == len(filenames):
-                messagebox.showinfo("Success", f"All {success_count} document(s) uploaded successfully!")
+                messagebox.showinfo("Success", f"All {success_count} document(s) uploaded successfully!{similar_text}")
             else:
                 messagebox.showwarning("Partial Success", 
-                                      f"Uploaded {success_count} of {len(filenames)} document(s).")
+                                      f"Uploaded {success_count} of {len(filenames)} document(s).{similar_text}")
             
             self.load_game_info()
             self.status_label.config(text=f"Uploaded {success_count} document(s)")
     
+    def ingest_document_folder(self):
+        """Upload, extract and analyze every document in a folder as a background batch."""
+        if not self.current_game:
+            messagebox.showwarning("No Game Selected", "Please select a game first.")
+            return
+        
+        folder = filedialog.askdirectory(title="Select Folder of Documents")
+        if not folder:
+            return
+        
+        game_name = self.current_game
+        self.status_label.config(text="Starting batch ingest...")
+        
+        def on_progress(filename, stage, status, counts):
+            summary = ", ".join(f"{name} {done}" for name, done in counts.items())
+            text = f"Ingest: {filename} {stage} {status} ({summary})"
+            self.root.after(0, lambda: self.status_label.config(text=text))
+        
+        def ingest():
+            try:
+                result = self.game_manager.ingest_documents(game_name, folder, progress=on_progress)
+                if not result:
+                    self.root.after(0, lambda: messagebox.showwarning("No Documents",
+                                                                      "No supported documents found in that folder."))
+                    self.root.after(0, lambda: self.status_label.config(text="Ready"))
+                    return
+                
+                lines = [f"{result['documents']} document(s) in {result['seconds']}s"]
+                lines += [f"{stage}: {result['completed'][stage]} done" for stage in result["stages"]]
+                if result["resumed"]:
+                    lines.append(f"{result['resumed']} stage(s) already done in an earlier run")
+                if "analyze" not in result["stages"]:
+                    lines.append("Azure OpenAI not configured: documents were not analyzed")
+                for failure in result["failed"]:
+                    lines.append(f"FAILED {failure['filename']} ({failure['stage']}): {failure['error']}")
+                stats = self.game_manager.ai_connection_stats()
+                if stats["requests"]:
+                    lines.append(f"AI requests: {stats['requests']}, {stats['reuse_percent']}% on reused connections")
+                message = "\n".join(lines)
+                
+                self.root.after(0, lambda: messagebox.showinfo("Batch Ingest", message))
+                self.root.after(0, lambda: self.status_label.config(
+                    text=f"Ingested {result['documents']} document(s), {len(result['failed'])} failed"))
+                self.root.after(0, self.load_game_info)
+            except Exception as e:
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Batch ingest failed: {str(e)}"))
+                self.root.after(0, lambda: self.status_label.config(text="Batch ingest failed"))
+        
+        threading.Thread(target=ingest, daemon=True).start()
+    
     def extract_language_files(self):
         """Extract and analyze language files."""
         if not self.current_game:
@@ -585,8 +816,12 @@ Files will be saved to: games/[game-name]/exports/
                 self.root.after(0, lambda: self.status_label.config(text="Extraction complete"))
                 
                 if result:
-                    self.root.after(0, lambda: messagebox.showinfo("Success", 
-                                                                   "Language files extracted and analyzed successfully!"))
+                    message = "Language files extracted and analyzed successfully!"
+                    delta = result.get("delta")
+                    if delta:
+                        message += (f"\n\nChanges since the last {delta['since']}: {delta['added']} added, "
+                                    f"{delta['removed']} removed, {delta['changed']} changed")
+                    self.root.after(0, lambda: messagebox.showinfo("Success", message))
                     self.root.after(0, self.load_game_info)
                 else:
                     self.root.after(0, lambda: messagebox.showwarning("No Files", 
@@ -597,6 +832,74 @@ Files will be saved to: games/[game-name]/exports/
         
         threading.Thread(target=extract, daemon=True).start()
     
+    def browse_lang_keys(self):
+        """Browse the lang keys by namespace, loading each level of the key index when it is opened."""
+        if not self.current_game:
+            messagebox.showwarning("No Game Selected", "Please select a game first.")
+            return
+        
+        lang_data = self.game_manager.load_lang_data(self.current_game)
+        index = self.game_manager.open_lang_index(self.current_game, lang_data) if lang_data else None
+        if index is None:
+            messagebox.showinfo("No Language File", "Extract the language files first.")
+            return
+        
+        summary = index.summary()
+        dialog = tk.Toplevel(self.root)
+        dialog.title(f"Lang Keys - {summary['keys']} keys, {summary['namespaces']} namespaces, "
+                     f"{summary['conversations']} conversations")
+        dialog.geometry("900x500")
+        dialog.transient(self.root)
+        
+        tree = ttk.Treeview(dialog, columns=("keys", "text"), show="tree headings", selectmode="browse")
+        tree.heading("#0", text="Key")
+        tree.heading("keys", text="Keys")
+        tree.heading("text", text="Text")
+        tree.column("#0", width=260)
+        tree.column("keys", width=60, anchor=tk.E)
+        tree.column("text", width=540)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        detail = scrolledtext.ScrolledText(dialog, wrap=tk.WORD, height=6, font=("Helvetica", 11))
+        detail.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        def add_children(parent):
+            # Only the opened level is inserted; deeper levels get a placeholder
+            # child so they show as expandable
+            for segment, count in index.children(parent).items():
+                key = f"{parent}.{segment}" if parent else segment
+                tree.insert(parent, tk.END, iid=key, text=segment,
+                            values=(count, lang_data.get(key, "").replace("\n", " ")))
+                if index.children(key):
+                    tree.insert(key, tk.END, iid=f"{key}\x00")
+        
+        def on_open(event):
+            item = tree.focus()
+            placeholder = f"{item}\x00"
+            if tree.exists(placeholder):
+                tree.delete(placeholder)
+                add_children(item)
+        
+        def on_select(event):
+            selection = tree.selection()
+            if not selection:
+                return
+            key = selection[0]
+            lines = [key]
+            if key in lang_data:
+                lines.append(lang_data[key])
+            conversation = index.conversation_of(key)
+            if conversation:
+                lines.append(f"\n{conversation['kind'].title()} {conversation['id']}:")
+                lines.extend(index.transcript(conversation, lang_data))
+            detail.delete(1.0, tk.END)
+            detail.insert(tk.END, "\n".join(lines))
+        
+        add_children("")
+        tree.bind('<<TreeviewOpen>>', on_open)
+        tree.bind('<<TreeviewSelect>>', on_select)
+        dialog.bind('<Escape>', lambda e: dialog.destroy())
+    
     def save_content(self):
         """Save content from the content tab."""
         if not self.current_game:
@@ -678,6 +981,68 @@ Files will be saved to: games/[game-name]/exports/
         
         threading.Thread(target=create, daemon=True).start()
     
+    def create_all_content(self):
+        """Create every resource type at once, generated concurrently."""
+        if not self.current_game:
+            messagebox.showwarning("No Game Selected", "Please select a game first.")
+            return
+        
+        # Switch to creation tab
+        self.notebook.select(2)
+        
+        self.progress_text.delete(1.0, tk.END)
+        self.progress_text.insert(tk.END, "Creating all resources concurrently...\n")
+        self.progress_text.insert(tk.END, "Curriculum standards use the default: USA Common Core\n\n")
+        self.status_label.config(text="Creating all resources...")
+        self.root.update()
+        
+        def append(message):
+            self.root.after(0, lambda: (self.progress_text.insert(tk.END, message + "\n"),
+                                        self.progress_text.see(tk.END)))
+        
+        def show_progress(key, label, status, result):
+            if status == "started":
+                append(f"... {label}")
+            elif status == "done":
+                append(f"[OK] {label} ({result['seconds']}s)")
+            elif status == "failed":
+                append(f"[ERROR] {label} failed ({result['seconds']}s)")
+            else:
+                append(f"[SKIP] {label}")
+        
+        def create():
+            try:
+                summary = self.game_manager.create_all(self.current_game, "USA", "Common Core",
+                                                       progress=show_progress)
+                if summary is None:
+                    append("\n[ERROR] Azure OpenAI must be configured to use creation features")
+                    self.root.after(0, lambda: self.status_label.config(text="Creation failed"))
+                    return
+                
+                created = sum(1 for r in summary["results"] if r["status"] == "done")
+                failed = [r["label"] for r in summary["results"] if r["status"] == "failed"]
+                message = (f"Created {created} of {len(summary['results'])} resources in {summary['seconds']}s "
+                           f"(slowest single resource: {summary['slowest_seconds']}s)")
+                stats = self.game_manager.ai_connection_stats()
+                if stats["requests"]:
+                    message += (f"\nAI requests this session: {stats['requests']} over "
+                                f"{stats['new_connections']} connection(s), {stats['reuse_percent']}% reused")
+                if failed:
+                    message += f"\nFailed: {', '.join(failed)}"
+                append("\n" + message)
+                
+                if failed:
+                    self.root.after(0, lambda: messagebox.showwarning("Create All", message))
+                else:
+                    self.root.after(0, lambda: messagebox.showinfo("Create All", message))
+                self.root.after(0, lambda: self.status_label.config(text="Creation complete"))
+            except Exception as e:
+                append(f"\n[ERROR] Error: {str(e)}")
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Creation failed: {str(e)}"))
+                self.root.after(0, lambda: self.status_label.config(text="Creation failed"))
+        
+        threading.Thread(target=create, daemon=True).start()
+    
     def open_exports_folder(self):
         """Open the exports folder for the current game."""
         if not self.current_game:
@@ -844,4 +1209,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for process pools in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,354 @@
+"""
+Lang index module for querying lang keys by their dotted hierarchy.
+
+Lang keys are dotted paths such as "actionbar.code.k" or
+"item.itemLock.hoverText.cantBe.moved". The index holds:
+- a prefix trie of the key segments, with the number of keys under every
+  node, so namespace queries and counts cost O(prefix length) and listing
+  a namespace only visits that subtree
+- the dialogue and quest sequences reconstructed from numbered keys
+
+Numbered keys are read as <speaker>.<numbers...>.<field>, for example
+"agent.02.1.8.d" is speaker "agent", scene 02, conversation 1, line 8,
+field "d" (dialogue; "n" is the speaker name and "b0", "b1"... the
+buttons). Keys with three or more numbers are dialogue: lines of all
+speakers with the same leading numbers form one conversation. Shallower
+keys ("book.01", "actionbar.03.1k", "sidebar.light.1a") form an ordered
+sequence per prefix.
+
+The index is built at extraction time and saved as lang_index.json next
+to the lang data.
+"""
+
+import re
+import json
+
+
+INDEX_VERSION = 1
+
+# Numbered keys with at least this many numbers are dialogue trees
+DIALOGUE_DEPTH = 3
+
+# A numbered segment: digits with an optional one-letter variant ("1a", "1k")
+NUMBER_SEGMENT_RE = re.compile(r'^(\d+)([A-Za-z]?)$')
+
+BUTTON_FIELD_RE = re.compile(r'^b\d+$')
+
+
+class _TrieNode:
+    __slots__ = ("count", "children", "index")
+    
+    def __init__(self):
+        self.count = 0
+        self.children = {}
+        # File position of the key ending here, or None
+        self.index = None
+
+
+class LangIndex:
+    """Prefix trie and dialogue sequences over the keys of one lang file."""
+    
+    def __init__(self, keys=()):
+        self.root = _TrieNode()
+        self.conversations = []
+        self._conversation_of = {}
+        self._size = 0
+        
+        inserted = [key for key in keys if self._insert(key)]
+        if inserted:
+            self.conversations = build_conversations(inserted)
+            self._index_conversations()
+    
+    def __len__(self):
+        return self._size
+    
+    def __contains__(self, key):
+        node = self._find(key)
+        return node is not None and node.index is not None
+    
+    def _insert(self, key):
+        """Add a key; returns False if it was already present."""
+        segments = key.split('.')
+        node = self.root
+        for segment in segments:
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _TrieNode()
+            node = child
+        if node.index is not None:
+            return False
+        
+        node.index = self._size
+        self._size += 1
+        
+        node = self.root
+        node.count += 1
+        for segment in segments:
+            node = node.children[segment]
+            node.count += 1
+        return True
+    
+    def _find(self, prefix):
+        """Trie node at a dotted prefix ("" is the root), or None."""
+        node = self.root
+        if not prefix:
+            return node
+        for segment in prefix.split('.'):
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+    
+    def count(self, prefix=""):
+        """Number of keys under a dotted prefix (the key itself included)."""
+        node = self._find(prefix)
+        return node.count if node else 0
+    
+    def children(self, prefix=""):
+        """{segment: key count} directly under a prefix, in order of first appearance."""
+        node = self._find(prefix)
+        return {segment: child.count for segment, child in node.children.items()} if node else {}
+    
+    def namespace_counts(self, prefix="", depth=1):
+        """{dotted namespace: key count} for the namespaces depth levels below prefix."""
+        node = self._find(prefix)
+        if node is None:
+            return {}
+        
+        level = [(prefix, node)]
+        for _ in range(depth):
+            level = [(f"{path}.{segment}" if path else segment, child)
+                     for path, parent in level for segment, child in parent.children.items()]
+        return {path: child.count for path, child in level}
+    
+    def keys(self, prefix=""):
+        """Keys under a dotted prefix, in lang file order. Only that subtree is visited."""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        
+        found = []
+        stack = [(prefix, node)]
+        while stack:
+            path, current = stack.pop()
+            if current.index is not None:
+                found.append((current.index, path))
+            for segment, child in current.children.items():
+                stack.append((f"{path}.{segment}" if path else segment, child))
+        return [key for _, key in sorted(found)]
+    
+    def conversation_of(self, key):
+        """The conversation (or sequence) a numbered key belongs to, or None."""
+        position = self._conversation_of.get(key)
+        return self.conversations[position] if position is not None else None
+    
+    def reading_order(self, keys):
+        """Order keys for reading: each conversation's lines in step order, in the
+        order conversations first appear, then the rest grouped by namespace."""
+        wanted = set(keys)
+        ordered = []
+        seen = set()
+        
+        for conversation in self.conversations:
+            for step in conversation["steps"]:
+                for key in step["keys"].values():
+                    if key in wanted and key not in seen:
+                        ordered.append(key)
+                        seen.add(key)
+        
+        for namespace in self.root.children:
+            for key in self.keys(namespace):
+                if key in wanted and key not in seen:
+                    ordered.append(key)
+                    seen.add(key)
+        
+        # Keys the index does not know about keep their given order at the end
+        ordered.extend(key for key in keys if key not in seen)
+        return ordered
+    
+    def transcript(self, conversation, lang_data):
+        """Readable lines of a conversation: "speaker: text [choices: ...]"."""
+        lines = []
+        for step in conversation["steps"]:
+            fields = step["keys"]
+            field = main_field(fields)
+            text = lang_data.get(fields[field], "") if field else ""
+            speaker = lang_data.get(fields["n"], step["speaker"]) if "n" in fields else step["speaker"]
+            choices = [lang_data.get(fields[f], "") for f in sorted(fields) if BUTTON_FIELD_RE.match(f)]
+            
+            line = f"{speaker}: {text}" if speaker else text
+            if any(choices):
+                line += " [choices: " + " | ".join(c for c in choices if c) + "]"
+            lines.append(line)
+        return lines
+    
+    def summary(self, top=10):
+        """Counts for reports: keys, top-level namespaces and conversations."""
+        namespaces = sorted(self.namespace_counts().items(), key=lambda item: -item[1])
+        dialogue = [c for c in self.conversations if c["kind"] == "dialogue"]
+        return {
+            "keys": self._size,
+            "namespaces": len(self.root.children),
+            "top_namespaces": dict(namespaces[:top]),
+            "conversations": len(dialogue),
+            "dialogue_lines": sum(len(c["steps"]) for c in dialogue),
+            "sequences": len(self.conversations) - len(dialogue)
+        }
+    
+    def to_dict(self):
+        """Serializable form: the trie (counts and key positions) and the conversations."""
+        return {
+            "version": INDEX_VERSION,
+            "keys": self._size,
+            "trie": _node_to_dict(self.root),
+            "conversations": self.conversations
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild an index saved with to_dict."""
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError("Unsupported lang index version")
+        
+        index = cls()
+        index.root = _node_from_dict(data["trie"])
+        index._size = data.get("keys", index.root.count)
+        index.conversations = data.get("conversations", [])
+        index._index_conversations()
+        return index
+    
+    def save(self, index_file):
+        with open(index_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+    
+    @classmethod
+    def load(cls, index_file):
+        with open(index_file, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+    
+    def _index_conversations(self):
+        self._conversation_of = {}
+        for position, conversation in enumerate(self.conversations):
+            for step in conversation["steps"]:
+                for key in step["keys"].values():
+                    self._conversation_of[key] = position
+
+
+def parse_numbered_key(key):
+    """Split a numbered key into (speaker, family, numbers, number_text, field).
+    
+    family is the numbered part with numbers replaced by '#' ("#.#.#"),
+    number_text the numbered segments as written. Returns None for keys
+    without a numbered segment.
+    """
+    segments = key.split('.')
+    first = last = None
+    numbers = []
+    for i, segment in enumerate(segments):
+        # Cheap check first: most segments are words
+        if segment[:1].isdigit():
+            match = NUMBER_SEGMENT_RE.match(segment)
+            if match:
+                if first is None:
+                    first = i
+                last = i
+                numbers.append((i, match))
+    if first is None:
+        return None
+    
+    numbered = {i for i, _ in numbers}
+    family = '.'.join('#' if i in numbered else segments[i] for i in range(first, last + 1))
+    number_text = segments[first:last]
+    number_text.append(numbers[-1][1].group(1))
+    
+    suffix = numbers[-1][1].group(2)
+    field = '.'.join(([suffix] if suffix else []) + segments[last + 1:])
+    return ('.'.join(segments[:first]), family, tuple(int(match.group(1)) for _, match in numbers),
+            number_text, field)
+
+
+def build_conversations(keys):
+    """Group numbered keys into ordered dialogue conversations and sequences.
+    
+    Returns:
+        list of {"id", "kind" ("dialogue" or "sequence"), "scene", "steps"},
+        in order of first appearance; each step is {"number", "speaker",
+        "keys": {field: key}} and steps are in numeric order
+    """
+    conversations = {}
+    
+    for position, key in enumerate(keys):
+        parsed = parse_numbered_key(key)
+        if parsed is None:
+            continue
+        speaker, family, numbers, number_text, field = parsed
+        
+        if len(numbers) >= DIALOGUE_DEPTH:
+            # Speakers take turns within a conversation: group without the speaker
+            group = ("dialogue", family, numbers[:-1])
+            conversation_id = '.'.join(number_text[:-1])
+            scene = number_text[0]
+        else:
+            group = ("sequence", speaker, family, numbers[:-1])
+            conversation_id = '.'.join(part for part in [speaker] + number_text[:-1] if part)
+            scene = None
+        
+        conversation = conversations.get(group)
+        if conversation is None:
+            conversation = conversations[group] = {
+                "id": conversation_id,
+                "kind": group[0],
+                "scene": scene,
+                "first": position,
+                "steps": {}
+            }
+        
+        step = conversation["steps"].get((numbers[-1], speaker))
+        if step is None:
+            step = conversation["steps"][numbers[-1], speaker] = {
+                "number": numbers[-1],
+                "speaker": speaker,
+                "first": position,
+                "keys": {}
+            }
+        step["keys"].setdefault(field or "text", key)
+    
+    ordered = []
+    for conversation in sorted(conversations.values(), key=lambda c: c["first"]):
+        steps = sorted(conversation["steps"].values(), key=lambda s: (s["number"], s["first"]))
+        ordered.append({
+            "id": conversation["id"],
+            "kind": conversation["kind"],
+            "scene": conversation["scene"],
+            "steps": [{"number": s["number"], "speaker": s["speaker"], "keys": s["keys"]} for s in steps]
+        })
+    return ordered
+
+
+def main_field(fields):
+    """The field holding a step's main text: "d" (dialogue), the bare key, or the first non-name, non-button field."""
+    for name in ("d", "text"):
+        if name in fields:
+            return name
+    for name in fields:
+        if name != "n" and not BUTTON_FIELD_RE.match(name):
+            return name
+    return None
+
+
+def _node_to_dict(node):
+    data = {"n": node.count}
+    if node.index is not None:
+        data["i"] = node.index
+    if node.children:
+        data["c"] = {segment: _node_to_dict(child) for segment, child in node.children.items()}
+    return data
+
+
+def _node_from_dict(data):
+    node = _TrieNode()
+    node.count = data["n"]
+    node.index = data.get("i")
+    for segment, child in data.get("c", {}).items():
+        node.children[segment] = _node_from_dict(child)
+    return node
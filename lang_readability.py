@@ -0,0 +1,240 @@
+"""
+Lang readability module for measuring the text complexity of every lang entry locally.
+
+Metrics are computed over the clean text of all entries (from
+lang_tokenizer), not over an AI summary:
+- words, sentences and syllables per entry, and from them the Flesch
+  Reading Ease score and Flesch-Kincaid grade
+- average sentence length and the share of long sentences
+- the rare-word ratio: words that are neither common English words nor
+  short, and have three or more syllables or eight or more letters
+- passive-voice constructions ("is placed", "were given", "been found")
+
+The work is batched over the whole corpus rather than done entry by entry:
+one str.translate normalizes every entry at once, each distinct word is
+scored once (syllables, rarity) into packed counters that a single sum()
+per entry adds up, and the results are kept as columns in typed arrays,
+so aggregates and the worst lines come from whole-column passes. 100k
+entries take about half a second.
+"""
+
+import re
+import heapq
+import string
+from array import array
+from bisect import bisect_left
+
+
+# The corpus is normalized with one str.translate so plain str.split yields
+# the words: letters are lower-cased, sentence punctuation becomes SENTENCE_MARK
+# (kept on the word it follows), and everything else becomes a space
+ENTRY_SEPARATOR = "\x01"
+SENTENCE_MARK = "\x02"
+NORMALIZE_TABLE = str.maketrans(
+    {**{i: " " for i in range(128) if i != 1},
+     **{ord(c): c.lower() for c in string.ascii_letters},
+     ord("'"): "'", ord("."): SENTENCE_MARK, ord("!"): SENTENCE_MARK, ord("?"): SENTENCE_MARK}
+)
+
+VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+SEPARATOR_RE = re.compile(ENTRY_SEPARATOR)
+ICON_PLACEHOLDER_RE = re.compile(r":[A-Za-z_][\w.]*:")
+
+# Runs of newlines, ~LINEBREAK~ markers and bare %1 (Education's line break)
+LINE_BREAK_RE = re.compile(r"(?:\n|~LINEBREAK~|%1(?![$\d]))(?:\s*(?:\n|~LINEBREAK~|%1(?![$\d])))*")
+
+# be/get auxiliary, an optional adverb, then a past participle. The leading
+# word boundary is checked separately: without it the regex engine can skip
+# ahead on the auxiliaries' first letters, several times faster.
+PASSIVE_RE = re.compile(
+    r"(?:am|is|are|was|were|be|been|being|get|gets|got|gotten) +(?:[a-z]+ly +)?"
+    r"(?:[a-z]+ed|built|made|done|given|taken|found|seen|shown|known|written|chosen|"
+    r"broken|hidden|held|kept|left|lost|put|set|sent|told|thrown|worn|won)\b"
+)
+
+# Bit fields of the packed per-token counters, so one sum per entry adds them all
+FIELD_BITS = 20
+WORD, SENTENCE, SYLLABLES, POLYSYLLABLE, RARE = range(5)
+FIELD_MASK = (1 << FIELD_BITS) - 1
+
+# Entries shorter than this are labels and button text; their grade is noise
+MIN_WORDS_FOR_GRADE = 6
+
+LONG_SENTENCE_WORDS = 20
+
+# Frequent English words that are never counted as rare, however long
+COMMON_WORDS = frozenset("""
+a about above across after again against all almost along already also always am among an and another any
+anything are around as ask at away back be because become been before began begin behind being below best
+better between big both bring build but by call came can cannot carefully change children city close come
+complete could create day did different do does done down during each early earth easy either else end enough
+even every everyone everything example eye face family far farm father feel few find first follow food for
+found four friend from full gave get give go good got great grow had hand happen has have he head hear help her
+here him his home house how however i idea if important in information inside into is it its just keep kind
+know land large last later learn leave left let life light like line little live long look made make man many
+may me mean might more most mother move much must my name near need never new next night no not nothing now
+number of off often old on once one only open or other our out outside over own page paper part people place
+plant play point problem question quickly read ready really remember right river room said same saw say school
+sea second see seem sentence set she should show side since small so some something sometimes soon sound start
+still stop story study such sure take talk tell than that the their them then there these they thing think
+this those thought three through time to today together too took toward tree try turn two under understand
+until up upon us use usually very walk want was watch water way we well went were what when where which while
+white who why will with without word work world would write year yes yet you young your
+""".split())
+
+
+def syllable_count(word):
+    """Estimate the syllables of one lower-case word from its vowel groups."""
+    groups = len(VOWEL_GROUP_RE.findall(word))
+    # Silent final e ("make", "place"), but not "-le" ("table", "puzzle")
+    if word.endswith('e') and not word.endswith('le') and groups > 1:
+        groups -= 1
+    return max(1, groups)
+
+
+class ReadabilityMetrics:
+    """Per-entry readability columns and aggregates for a set of lang entries."""
+    
+    def __init__(self, entries):
+        """Measure {key: text} entries (clean text, no formatting codes)."""
+        self.keys = list(entries)
+        self.texts = [entries[key] for key in self.keys]
+        
+        # One corpus for every entry. Line breaks end a sentence (list items and
+        # titles rarely carry a full stop); :icon: names and other placeholders
+        # are not words.
+        corpus = f" {ENTRY_SEPARATOR} ".join(self.texts)
+        corpus = ICON_PLACEHOLDER_RE.sub(" ", LINE_BREAK_RE.sub(". ", corpus)).translate(NORMALIZE_TABLE)
+        
+        # Packed counters of each distinct token are computed once, then summed per entry in C
+        table = _TokenTable()
+        lookup = table.__getitem__
+        packed = [sum(map(lookup, segment.split())) for segment in corpus.split(ENTRY_SEPARATOR)]
+        
+        self.words = array('I', _field(packed, WORD))
+        self.sentences = array('I', (max(1, s) if w else 0 for s, w in zip(_field(packed, SENTENCE), self.words)))
+        self.syllables = array('I', _field(packed, SYLLABLES))
+        self.long_words = array('I', _field(packed, POLYSYLLABLE))
+        self.rare_words = array('I', _field(packed, RARE))
+        self.grades = array('f', (_flesch_kincaid_grade(w, s, y) if w else 0.0
+                                  for w, s, y in zip(self.words, self.sentences, self.syllables)))
+        
+        # Passive matches are mapped back to their entry by character offset
+        self.passives = array('I', bytes(4 * len(self.keys)))
+        separators = [m.start() for m in SEPARATOR_RE.finditer(corpus)]
+        for match in PASSIVE_RE.finditer(corpus):
+            position = match.start()
+            if position and corpus[position - 1].isalpha():
+                continue
+            self.passives[bisect_left(separators, position)] += 1
+        
+        self.distinct_words = len({token.strip(SENTENCE_MARK + "'") for token, value in table.items() if value & FIELD_MASK})
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def summary(self):
+        """Aggregate metrics over every entry with words in it."""
+        words = sum(self.words)
+        sentences = sum(self.sentences)
+        syllables = sum(self.syllables)
+        graded = [g for g, w in zip(self.grades, self.words) if w >= MIN_WORDS_FOR_GRADE]
+        long_sentences = sum(1 for w, s in zip(self.words, self.sentences) if s and w / s > LONG_SENTENCE_WORDS)
+        
+        return {
+            "entries": len(self.keys),
+            "entries_with_text": sum(1 for w in self.words if w),
+            "words": words,
+            "distinct_words": self.distinct_words,
+            "sentences": sentences,
+            "avg_sentence_length": round(words / sentences, 1) if sentences else 0.0,
+            "avg_syllables_per_word": round(syllables / words, 2) if words else 0.0,
+            "flesch_reading_ease": round(_flesch_reading_ease(words, sentences, syllables), 1) if words else 0.0,
+            "flesch_kincaid_grade": round(_flesch_kincaid_grade(words, sentences, syllables), 1) if words else 0.0,
+            "polysyllable_ratio": round(sum(self.long_words) / words, 3) if words else 0.0,
+            "rare_word_ratio": round(sum(self.rare_words) / words, 3) if words else 0.0,
+            "passive_constructions": sum(self.passives),
+            "entries_with_passive": sum(1 for p in self.passives if p),
+            "long_sentence_entries": long_sentences,
+            "graded_entries": len(graded),
+            "max_entry_grade": round(max(graded), 1) if graded else 0.0
+        }
+    
+    def entry(self, index):
+        """Metrics of one entry as a dict."""
+        return {
+            "key": self.keys[index],
+            "text": self.texts[index],
+            "words": self.words[index],
+            "sentences": self.sentences[index],
+            "grade": round(self.grades[index], 1),
+            "rare_words": self.rare_words[index],
+            "passives": self.passives[index]
+        }
+    
+    def worst_entries(self, count=20):
+        """The hardest-to-read entries: highest grade first, rare words and passives breaking ties.
+        Entries too short for a meaningful grade are skipped."""
+        candidates = (i for i, w in enumerate(self.words) if w >= MIN_WORDS_FOR_GRADE)
+        worst = heapq.nlargest(count, candidates,
+                               key=lambda i: (self.grades[i], self.rare_words[i] + self.passives[i]))
+        return [self.entry(i) for i in worst]
+
+
+class _TokenTable(dict):
+    """Packed counters of each distinct token, computed on first sight."""
+    
+    def __missing__(self, token):
+        value = 0
+        word = token.strip(SENTENCE_MARK + "'").replace(SENTENCE_MARK, "")
+        if word:
+            # A sentence ends at a word; a stray mark (". . .", a break after a full stop) adds none
+            if token.endswith(SENTENCE_MARK):
+                value = 1 << (SENTENCE * FIELD_BITS)
+            syllables = syllable_count(word)
+            rare = word not in COMMON_WORDS and len(word) > 3 and (syllables >= 3 or len(word) >= 8)
+            value |= ((1 << (WORD * FIELD_BITS)) | (syllables << (SYLLABLES * FIELD_BITS))
+                      | ((syllables >= 3) << (POLYSYLLABLE * FIELD_BITS)) | (rare << (RARE * FIELD_BITS)))
+        self[token] = value
+        return value
+
+
+def _field(packed, field):
+    """Unpack one counter from every packed per-entry total."""
+    shift = field * FIELD_BITS
+    return [(value >> shift) & FIELD_MASK for value in packed]
+
+
+def _flesch_kincaid_grade(words, sentences, syllables):
+    return 0.39 * words / sentences + 11.8 * syllables / words - 15.59
+
+
+def _flesch_reading_ease(words, sentences, syllables):
+    return 206.835 - 1.015 * words / sentences - 84.6 * syllables / words
+
+
+def format_metrics(summary, worst):
+    """Render a metrics summary and worst entries as prompt/report text."""
+    lines = [
+        f"Entries measured: {summary['entries_with_text']} of {summary['entries']} "
+        f"({summary['words']} words, {summary['distinct_words']} distinct)",
+        f"Flesch Reading Ease: {summary['flesch_reading_ease']}",
+        f"Flesch-Kincaid grade: {summary['flesch_kincaid_grade']} "
+        f"(hardest entry: {summary['max_entry_grade']})",
+        f"Average sentence length: {summary['avg_sentence_length']} words; "
+        f"entries with sentences over {LONG_SENTENCE_WORDS} words: {summary['long_sentence_entries']}",
+        f"Average syllables per word: {summary['avg_syllables_per_word']}; "
+        f"3+ syllable words: {summary['polysyllable_ratio']:.1%}",
+        f"Rare-word ratio: {summary['rare_word_ratio']:.1%}",
+        f"Passive constructions: {summary['passive_constructions']} "
+        f"in {summary['entries_with_passive']} entries"
+    ]
+    
+    if worst:
+        lines.append("")
+        lines.append(f"Hardest {len(worst)} entries (grade, rare words, passives):")
+        for item in worst:
+            lines.append(f"- {item['key']} [grade {item['grade']}, {item['rare_words']} rare, "
+                         f"{item['passives']} passive]: {item['text']}")
+    
+    return "\n".join(lines)
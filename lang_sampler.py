@@ -0,0 +1,210 @@
+"""
+Lang sampler module for choosing which lang entries are worth sending to the AI.
+
+Sampling runs in four steps over the structured entries from lang_tokenizer:
+1. drop formatting-only values (e.g. "§8") and LOCKED system strings
+2. collapse exact and near-duplicate texts, using word/character shingles
+   with a one-permutation MinHash signature and LSH banding to find
+   candidates, confirmed by the exact Jaccard similarity; texts that differ
+   in their numbers ("Step 1" / "Step 2") are never duplicates
+3. group what is left by key namespace (the part before the first '.',
+   e.g. "actionbar", "npc", "chat")
+4. if a token budget is given and the result is over it, give each
+   namespace a share of the budget proportional to its size and keep entries
+   spread evenly through the file within each namespace
+
+The report compares the sample with the naive dump of every raw value.
+"""
+
+import re
+import json
+import zlib
+
+import prompt_packer
+
+
+# One-permutation MinHash: signature bins, split into LSH bands
+MINHASH_BINS = 24
+LSH_BANDS = 6
+
+# Texts at least this similar (Jaccard over shingles) count as duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+NUMBER_RE = re.compile(r'\d+(?:[.,]\d+)*')
+
+
+def sample_lang_entries(structured, token_budget=None, threshold=NEAR_DUPLICATE_THRESHOLD, raw_data=None, model=None):
+    """Pick a deduplicated, namespace-balanced sample of lang entries.
+
+    Args:
+        structured: {key: entry} from lang_tokenizer.tokenize_lang_entries
+        token_budget: Prompt tokens the sample may use (None = no limit)
+        threshold: Jaccard similarity at which two texts are near-duplicates
+        raw_data: Original {key: raw value}, used to measure the naive dump
+            (rebuilt from the structured text if omitted)
+        model: Deployment the tokens are counted for (see prompt_packer.count_tokens)
+
+    Returns:
+        (sample {key: text} in file order, report dict)
+    """
+    formatting = 0
+    locked = 0
+    candidates = {}
+
+    for key, entry in structured.items():
+        if entry.get("formatting_only"):
+            formatting += 1
+        elif entry.get("constraints", {}).get("locked"):
+            locked += 1
+        else:
+            candidates[key] = entry["text"]
+
+    unique, duplicates = _collapse_near_duplicates(candidates, threshold)
+
+    sample, namespaces = _sample_by_namespace(unique, token_budget, model)
+
+    naive = raw_data if raw_data is not None else {k: e["text"] for k, e in structured.items()}
+    naive_tokens = prompt_packer.count_tokens(json.dumps(naive, indent=2, ensure_ascii=False), model)
+    sample_tokens = prompt_packer.count_tokens(json.dumps(sample, indent=2, ensure_ascii=False), model)
+
+    report = {
+        "total_entries": len(structured),
+        "dropped_formatting": formatting,
+        "dropped_locked": locked,
+        "readable_entries": len(candidates),
+        "near_duplicates": duplicates,
+        "unique_entries": len(unique),
+        "sampled_entries": len(sample),
+        "budget_dropped": len(unique) - len(sample),
+        "token_budget": token_budget,
+        "naive_tokens": naive_tokens,
+        "sample_tokens": sample_tokens,
+        "tokens_saved": naive_tokens - sample_tokens,
+        "percent_saved": round(100.0 * (naive_tokens - sample_tokens) / naive_tokens, 1) if naive_tokens else 0.0,
+        "namespaces": namespaces
+    }
+    return sample, report
+
+
+def key_namespace(key):
+    """Namespace of a lang key: everything before the first '.'."""
+    return key.split('.', 1)[0]
+
+
+def _shingles(text):
+    """Word 3-grams for longer texts, character 4-grams for short ones."""
+    normalized = text.lower()
+    words = WORD_RE.findall(normalized)
+    if len(words) >= 5:
+        return {' '.join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+    compact = ' '.join(words) or normalized.strip()
+    if len(compact) <= 4:
+        return {compact}
+    return {compact[i:i + 4] for i in range(len(compact) - 3)}
+
+
+def _signature(shingles):
+    """One-permutation MinHash: each shingle hash falls in one bin; keep the minimum per bin."""
+    signature = [None] * MINHASH_BINS
+    for shingle in shingles:
+        value = zlib.crc32(shingle.encode('utf-8'))
+        slot = value % MINHASH_BINS
+        if signature[slot] is None or value < signature[slot]:
+            signature[slot] = value
+    return signature
+
+
+def _collapse_near_duplicates(entries, threshold):
+    """Keep the first of every group of near-identical texts.
+
+    Returns:
+        ({key: text} of representatives in file order, number of entries collapsed)
+    """
+    rows = MINHASH_BINS // LSH_BANDS
+    buckets = {}
+    exact = {}
+    kept = {}
+    kept_shingles = {}
+    kept_numbers = {}
+    duplicates = 0
+
+    for key, text in entries.items():
+        if text in exact:
+            duplicates += 1
+            continue
+
+        shingles = _shingles(text)
+        numbers = NUMBER_RE.findall(text)
+        signature = _signature(shingles)
+        bands = []
+        for band in range(LSH_BANDS):
+            part = tuple(signature[band * rows:(band + 1) * rows])
+            # A band with no shingles in it says nothing about similarity
+            if any(v is not None for v in part):
+                bands.append((band, part))
+
+        duplicate_of = None
+        for band_key in bands:
+            for other in buckets.get(band_key, ()):
+                # Same wording with other numbers is a different step, score or amount
+                if kept_numbers[other] != numbers:
+                    continue
+                other_shingles = kept_shingles[other]
+                union = len(shingles | other_shingles)
+                if union and len(shingles & other_shingles) / union >= threshold:
+                    duplicate_of = other
+                    break
+            if duplicate_of:
+                break
+
+        exact[text] = key
+        if duplicate_of:
+            duplicates += 1
+            continue
+
+        kept[key] = text
+        kept_shingles[key] = shingles
+        kept_numbers[key] = numbers
+        for band_key in bands:
+            buckets.setdefault(band_key, []).append(key)
+
+    return kept, duplicates
+
+
+def _sample_by_namespace(entries, token_budget, model):
+    """Fit entries into the token budget with a proportional share per key namespace.
+
+    Returns:
+        (sample {key: text} in file order, {namespace: {"entries", "sampled"}})
+    """
+    groups = {}
+    for key, text in entries.items():
+        cost = prompt_packer.count_tokens(key, model) + prompt_packer.count_tokens(text, model) + 4
+        groups.setdefault(key_namespace(key), []).append((key, cost))
+
+    total_cost = sum(cost for items in groups.values() for _, cost in items)
+    selected = set()
+
+    if token_budget is None or total_cost <= token_budget:
+        selected = set(entries)
+    else:
+        for namespace, items in groups.items():
+            group_cost = sum(cost for _, cost in items)
+            share = token_budget * group_cost / total_cost
+            # Spread picks evenly through the namespace rather than taking its head
+            target = max(1, int(len(items) * share / group_cost))
+            stride = len(items) / target
+            spent = 0
+            for i in range(target):
+                key, cost = items[int(i * stride)]
+                if spent and spent + cost > share:
+                    break
+                selected.add(key)
+                spent += cost
+
+    namespaces = {namespace: {"entries": len(items), "sampled": sum(1 for k, _ in items if k in selected)}
+                  for namespace, items in groups.items()}
+    sample = {key: text for key, text in entries.items() if key in selected}
+    return sample, namespaces
@@ -0,0 +1,449 @@
+"""
+Lang scanner module for finding and scoring language files inside Minecraft world archives.
+
+Everything here is a plain module-level function so it can be handed to a
+process pool when several world files are scanned at once.
+"""
+
+import io
+import os
+import sys
+import zipfile
+import contextlib
+
+import lang_store
+from extraction_cache import ExtractionCache
+
+
+# Keywords that indicate NPC dialogue, educational content, or custom content
+NPC_HIGH_VALUE_KEYWORDS = [
+    'npc', 'dialogue', 'dialog', 'quest', 'objective', 'mission',
+    'instruction', 'tutorial', 'hint', 'guide', 'student', 'teacher',
+    'learn', 'lesson', 'activity', 'challenge', 'task', 'step'
+]
+
+NPC_MEDIUM_VALUE_KEYWORDS = [
+    'talk', 'speak', 'say', 'tell', 'ask', 'answer', 'explain',
+    'description', 'info', 'message', 'text', 'story', 'narrative'
+]
+
+PREFERRED_LANGS = ['en_US.lang', 'en_GB.lang']
+
+# Pack archives that templates sometimes embed inside the world archive
+NESTED_ARCHIVE_EXTENSIONS = ('.mcpack', '.mcaddon', '.zip')
+
+# How many archives deep to look, and how many bytes of nested archives
+# may be held in memory per world file
+MAX_NESTED_DEPTH = 3
+MAX_NESTED_BYTES = 256 * 1024 * 1024
+
+# Separates an archive member from the path inside it, e.g. "packs/rp.mcpack!/texts/en_US.lang"
+NESTED_PATH_SEPARATOR = '!/'
+
+
+def iter_lang_entries(lines):
+    """Yield (key, value) pairs from an iterable of raw .lang lines.
+    Accepts str or utf-8 bytes lines; comments and malformed lines are skipped."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='ignore')
+        line = line.strip()
+        if line and not line.startswith('#') and '=' in line:
+            key, value = line.split('=', 1)
+            yield key.strip(), value.strip()
+
+
+def read_lang_member(zip_ref, member_path):
+    """Read and parse a single .lang member of an open archive into a dict."""
+    lang_content = zip_ref.read(member_path).decode('utf-8', errors='ignore')
+    return dict(iter_lang_entries(lang_content.split('\n')))
+
+
+def stream_score_lang_member(zip_ref, member_path, file_path=None):
+    """Score a .lang member line by line from the zip stream without keeping its values.
+    Returns (score, entry_count) identical to parsing the whole file and scoring the dict.
+    file_path is the path scored for pack location (defaults to member_path)."""
+    # Later duplicates override earlier ones, exactly as they would in a dict
+    entry_scores = {}
+    with zip_ref.open(member_path) as member:
+        # Binary iteration splits on b'\n' only, matching the full-read parser
+        for key, value in iter_lang_entries(member):
+            entry_scores[key] = score_lang_entry(key, value)
+    
+    score = score_lang_path(file_path or member_path) + sum(entry_scores.values())
+    score += score_lang_entry_count(len(entry_scores))
+    return score, len(entry_scores)
+
+
+def score_lang_file(lang_data, file_path):
+    """Score a language file based on likelihood of containing NPC dialogue and educational content.
+    Higher scores indicate more relevant content."""
+    score = score_lang_path(file_path)
+    
+    # Analyze content
+    for key, value in lang_data.items():
+        score += score_lang_entry(key, value)
+    
+    # Bonus for larger files with diverse content
+    score += score_lang_entry_count(len(lang_data))
+    
+    return score
+
+
+def score_lang_path(file_path):
+    """Score the archive path of a language file (behavior packs, custom content)."""
+    score = 0
+    path_lower = file_path.lower()
+    
+    if 'behavior_pack' in path_lower or 'bp' in path_lower:
+        score += 50
+    if 'resource_pack' in path_lower or 'rp' in path_lower:
+        score += 30
+    if 'texts' in path_lower:
+        score += 20
+    
+    return score
+
+
+def score_lang_entry(key, value):
+    """Score a single language entry for NPC dialogue and educational content."""
+    score = 0
+    key_lower = key.lower()
+    value_lower = value.lower()
+    
+    # High value indicators
+    for keyword in NPC_HIGH_VALUE_KEYWORDS:
+        if keyword in key_lower or keyword in value_lower:
+            score += 5
+    
+    # Medium value indicators
+    for keyword in NPC_MEDIUM_VALUE_KEYWORDS:
+        if keyword in key_lower or keyword in value_lower:
+            score += 2
+    
+    # Long text values likely indicate dialogue or descriptions
+    if len(value) > 50:
+        score += 3
+    elif len(value) > 100:
+        score += 5
+    
+    # Custom keys (not standard minecraft keys)
+    if not key_lower.startswith(('entity.', 'item.', 'tile.', 'block.')):
+        score += 2
+    
+    # Sentence-like content (has punctuation)
+    if any(p in value for p in ['.', '?', '!']):
+        score += 2
+    
+    return score
+
+
+def score_lang_entry_count(entry_count):
+    """Bonus for larger files with diverse content."""
+    if entry_count > 100:
+        return 20
+    elif entry_count > 50:
+        return 10
+    elif entry_count > 20:
+        return 5
+    return 0
+
+
+def list_lang_members(zip_ref, stack, max_depth=MAX_NESTED_DEPTH, max_bytes=MAX_NESTED_BYTES):
+    """List every .lang member of an archive, including those inside nested pack archives.
+    
+    Nested .mcpack/.mcaddon archives are opened from memory, never extracted
+    to disk. Archives deeper than max_depth, or that would take the nested
+    bytes held past max_bytes, are skipped with a message.
+    
+    Args:
+        zip_ref: Open top-level archive
+        stack: contextlib.ExitStack that keeps the nested archives open
+        max_depth: Deepest level of nesting to descend into
+        max_bytes: Total uncompressed size of nested archives to load
+    
+    Returns:
+        list of (display path, owning ZipFile, member name within it)
+    """
+    members = []
+    remaining = [max_bytes]
+    _collect_lang_members(zip_ref, stack, '', 0, max_depth, remaining, members)
+    return members
+
+
+def _collect_lang_members(zip_ref, stack, prefix, depth, max_depth, remaining, members):
+    """Walk one archive level for list_lang_members."""
+    for info in zip_ref.infolist():
+        name = info.filename
+        if name.endswith('.lang'):
+            members.append((prefix + name, zip_ref, name))
+            continue
+        
+        if not name.lower().endswith(NESTED_ARCHIVE_EXTENSIONS):
+            continue
+        
+        display = prefix + name
+        if depth >= max_depth:
+            print(f"Skipping nested archive {display}: deeper than {max_depth} levels")
+            continue
+        if info.file_size > remaining[0]:
+            print(f"Skipping nested archive {display}: exceeds the nested archive size limit")
+            continue
+        
+        try:
+            nested = stack.enter_context(zipfile.ZipFile(io.BytesIO(zip_ref.read(name))))
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, ValueError) as e:
+            print(f"Skipping nested archive {display}: {e}")
+            continue
+        
+        remaining[0] -= info.file_size
+        _collect_lang_members(nested, stack, display + NESTED_PATH_SEPARATOR, depth + 1,
+                              max_depth, remaining, members)
+
+
+def get_peak_rss_bytes(children=False):
+    """Return the peak resident set size in bytes, or None if unavailable.
+    
+    Args:
+        children: Report the largest finished child process (pool workers)
+            instead of the current process
+    """
+    try:
+        import resource
+        who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+        peak = resource.getrusage(who).ru_maxrss
+        # Linux reports kilobytes, macOS reports bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, ValueError, OSError):
+        return None
+
+
+def scan_world_archive(world_file_path, streaming=True, cache_dir=None,
+                       max_depth=MAX_NESTED_DEPTH, max_bytes=MAX_NESTED_BYTES):
+    """Find the en_US/en_GB language file most likely to contain NPC text in one archive.
+    
+    Args:
+        world_file_path: Path to a .mcworld or .mctemplate file
+        streaming: Score candidates straight from the zip stream and only
+            load the winning file in full
+        cache_dir: Extraction cache directory. An archive whose SHA-256 has
+            been scanned before is answered from the cache, and members whose
+            CRC32 and size are unchanged are not rescored.
+        max_depth: How deep to look inside embedded .mcpack/.mcaddon archives
+        max_bytes: Total size of embedded archives that may be held in memory
+    
+    Returns:
+        dict with "success" and either "error" or the selected file, its
+        score, the parsed entries and every candidate considered
+    """
+    archive = os.path.basename(world_file_path)
+    cache = None
+    digest = None
+    
+    if cache_dir:
+        try:
+            cache = ExtractionCache(cache_dir)
+            digest = cache.archive_digest(world_file_path)
+            cached = cache.get_archive(digest)
+            # Different nesting limits can select a different file
+            if cached and cached.get("nested_limits") == [max_depth, max_bytes]:
+                best_lang = cache.get_lang_data(cached["selected_crc"], cached["selected_size"])
+                if best_lang is not None:
+                    # The same content may have been uploaded under another name
+                    return dict(cached, archive=archive, data=best_lang,
+                                cache={"archive_hit": True, "member_hits": 0, "members_scored": 0})
+        except (OSError, KeyError, TypeError) as e:
+            print(f"Extraction cache unavailable ({e}), scanning without it")
+            cache = None
+    
+    try:
+        with zipfile.ZipFile(world_file_path, 'r') as zip_ref, contextlib.ExitStack() as stack:
+            # Search for ALL .lang files in the entire archive structure, embedded packs included
+            lang_files = list_lang_members(zip_ref, stack, max_depth, max_bytes)
+            
+            if not lang_files:
+                return {"success": False, "archive": archive,
+                        "error": "No .lang files found in world archive"}
+            
+            # Filter for en_US and en_GB only
+            us_gb_files = [m for m in lang_files
+                           if any(m[0].endswith(pref_lang) for pref_lang in PREFERRED_LANGS)]
+            
+            if not us_gb_files:
+                return {"success": False, "archive": archive,
+                        "error": "No en_US or en_GB language files found"}
+            
+            # Analyze each lang file to find the one with most NPC/dialogue content
+            best_file = None
+            best_member = None
+            best_score = 0
+            best_lang = None
+            candidates = []
+            member_hits = 0
+            
+            for lang_file_path, owner, member_name in us_gb_files:
+                try:
+                    info = owner.getinfo(member_name)
+                    cached_member = cache.get_member(lang_file_path, info.CRC, info.file_size) if cache else None
+                    lang_data = None
+                    
+                    if cached_member:
+                        score, entry_count = cached_member["score"], cached_member["entries"]
+                        member_hits += 1
+                    elif streaming:
+                        # Only the score and entry count survive this loop
+                        score, entry_count = stream_score_lang_member(owner, member_name, lang_file_path)
+                    else:
+                        lang_data = read_lang_member(owner, member_name)
+                        score = score_lang_file(lang_data, lang_file_path)
+                        entry_count = len(lang_data)
+                    
+                    if cache and not cached_member:
+                        cache.put_member(lang_file_path, info.CRC, info.file_size, score, entry_count)
+                    
+                    candidates.append({
+                        'path': lang_file_path,
+                        'score': score,
+                        'entries': entry_count
+                    })
+                    
+                    if score > best_score:
+                        best_score = score
+                        best_file = lang_file_path
+                        best_member = (owner, member_name)
+                        best_lang = lang_data
+                
+                except Exception as e:
+                    print(f"Error reading {lang_file_path}: {e}")
+                    continue
+            
+            if not best_file:
+                return {"success": False, "archive": archive,
+                        "error": "Could not parse any language files"}
+            
+            # Re-read the winner unless it is already in memory or in the cache;
+            # it is the only candidate ever held in full
+            best_owner, best_name = best_member
+            best_info = best_owner.getinfo(best_name)
+            if best_lang is None and cache:
+                best_lang = cache.get_lang_data(best_info.CRC, best_info.file_size)
+            if best_lang is None:
+                best_lang = read_lang_member(best_owner, best_name)
+                if cache:
+                    cache.put_lang_data(best_info.CRC, best_info.file_size, best_lang)
+            
+            result = {
+                "success": True,
+                "archive": archive,
+                "selected_file": best_file,
+                "selected_crc": best_info.CRC,
+                "selected_size": best_info.file_size,
+                "sha256": digest,
+                "nested_limits": [max_depth, max_bytes],
+                "score": best_score,
+                "candidates": candidates,
+                "data": best_lang
+            }
+            
+            if cache:
+                cache.put_archive(digest, result)
+                result["cache"] = {
+                    "archive_hit": False,
+                    "member_hits": member_hits,
+                    "members_scored": len(candidates) - member_hits
+                }
+            
+            return result
+    
+    except zipfile.BadZipFile:
+        return {"success": False, "archive": archive, "error": "Invalid or corrupted world file"}
+    except Exception as e:
+        return {"success": False, "archive": archive, "error": f"Error extracting lang files: {str(e)}"}
+
+
+def write_archive_locale_store(store_path, archives, max_depth=MAX_NESTED_DEPTH, max_bytes=MAX_NESTED_BYTES):
+    """Stream every locale of several archives into a lang store file.
+    
+    Members are read line by line into a lang_store.LocaleSpool, so values
+    go to disk rather than into per-locale dicts. Archives are applied in the
+    order given (highest score first) and, within an archive, files in the
+    same folder as its selected file first; the first value of a key wins.
+    
+    Args:
+        store_path: Destination lang store file
+        archives: (world file path, display path of its selected language file)
+    
+    Returns:
+        Number of keys in the store
+    """
+    with lang_store.LocaleSpool(os.path.dirname(os.path.abspath(store_path))) as spool:
+        for world_file_path, selected_file in archives:
+            selected_dir = selected_file.rsplit('/', 1)[0]
+            try:
+                with zipfile.ZipFile(world_file_path, 'r') as zip_ref, contextlib.ExitStack() as stack:
+                    lang_files = list_lang_members(zip_ref, stack, max_depth, max_bytes)
+                    # sorted() is stable, so archive order is kept within each group
+                    for lang_file_path, owner, member_name in sorted(
+                            lang_files, key=lambda m: m[0].rsplit('/', 1)[0] != selected_dir):
+                        locale = lang_file_path.rsplit('/', 1)[-1][:-len('.lang')]
+                        try:
+                            with owner.open(member_name) as member:
+                                spool.add(locale, iter_lang_entries(member))
+                        except Exception as e:
+                            print(f"Error reading {lang_file_path}: {e}")
+            except (OSError, zipfile.BadZipFile) as e:
+                print(f"Error reading locales of {os.path.basename(world_file_path)}: {e}")
+        
+        return spool.write(store_path)
+
+
+def scan_world_archives(world_file_paths, streaming=True, max_workers=None, cache_dir=None):
+    """Scan several world archives, fanning them out to a process pool when there is more than one.
+    
+    Results come back in the same order as world_file_paths. If a process pool
+    cannot be started (restricted environments, frozen apps without
+    multiprocessing support) the archives are scanned serially instead.
+    """
+    if len(world_file_paths) <= 1:
+        return [scan_world_archive(path, streaming, cache_dir) for path in world_file_paths]
+    
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(world_file_paths)))
+    
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            count = len(world_file_paths)
+            return list(pool.map(scan_world_archive, world_file_paths,
+                                 [streaming] * count, [cache_dir] * count,
+                                 [MAX_NESTED_DEPTH] * count, [MAX_NESTED_BYTES] * count))
+    except (ImportError, OSError, NotImplementedError, BrokenProcessPool) as e:
+        print(f"Process pool unavailable ({e}), scanning archives serially")
+        return [scan_world_archive(path, streaming, cache_dir) for path in world_file_paths]
+
+
+def merge_archive_results(results):
+    """Merge the best language file of each archive into one lang store.
+    
+    Archives are applied from highest to lowest score, so the archive most
+    likely to hold NPC text wins when the same key appears in several.
+    
+    Returns:
+        (merged entries, key -> archive filename)
+    """
+    merged = {}
+    sources = {}
+    
+    ranked = sorted((r for r in results if r.get("success")),
+                    key=lambda r: r["score"], reverse=True)
+    
+    for result in ranked:
+        for key, value in result["data"].items():
+            if key not in merged:
+                merged[key] = value
+                sources[key] = result["archive"]
+    
+    return merged, sources
@@ -0,0 +1,319 @@
+"""
+Lang store module for keeping every locale of a world in one compact, memory-mapped file.
+
+Layout (all integers little-endian):
+- header: magic, version, key count, locale count, hash slot count and the
+  positions of the key offsets, key blob, hash table and locale directory
+- key table: the sorted keys as one utf-8 blob plus (key count + 1) u32 offsets
+- hash table: u32 slots holding key index + 1 (0 = empty), keyed by CRC32
+  with linear probing, so a key is found without scanning or bisecting
+- per locale: one presence byte per key, (key count + 1) u32 value offsets
+  and one utf-8 value blob
+
+Every locale shares the same key table, so a key costs its bytes once no
+matter how many locales carry it.
+"""
+
+import os
+import mmap
+import zlib
+import struct
+import tempfile
+
+
+LANG_STORE_MAGIC = b'ECLS'
+LANG_STORE_VERSION = 1
+
+# magic, version, key count, locale count, slot count,
+# key offsets pos, key blob pos, hash table pos, locale directory pos
+_HEADER = struct.Struct('<4sIIII QQQQ')
+# locale name length, presence pos, value offsets pos, value blob pos
+_LOCALE_ENTRY = struct.Struct('<H QQQ')
+_U32 = struct.Struct('<I')
+
+
+def _slot_count(key_count):
+    """Hash table size: a power of two at least twice the key count."""
+    slots = 8
+    while slots < key_count * 2:
+        slots *= 2
+    return slots
+
+
+def write_lang_store(store_path, locales):
+    """Write a lang store file.
+    
+    Args:
+        store_path: Destination file (replaced atomically)
+        locales: dict of locale name (e.g. "en_US") -> {key: value}
+    
+    Returns:
+        Number of keys in the store
+    """
+    keys = sorted(set().union(*locales.values())) if locales else []
+    
+    def raw_value(locale, key):
+        value = locales[locale].get(key)
+        return value.encode('utf-8') if value is not None else None
+    
+    return _write_store(store_path, keys, sorted(locales), raw_value)
+
+
+def _write_store(store_path, keys, locale_names, raw_value):
+    """Lay out and write a store; raw_value(locale, key) returns utf-8 bytes or None.
+    
+    Values are fetched twice per locale (sizes, then bytes) so no value blob
+    is ever held in memory.
+    """
+    encoded_keys = [key.encode('utf-8') for key in keys]
+    key_count = len(keys)
+    slots = _slot_count(key_count)
+    
+    # Key table
+    key_offsets = [0]
+    for raw in encoded_keys:
+        key_offsets.append(key_offsets[-1] + len(raw))
+    key_blob = b''.join(encoded_keys)
+    
+    # Hash table
+    table = [0] * slots
+    mask = slots - 1
+    for index, raw in enumerate(encoded_keys):
+        slot = zlib.crc32(raw) & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = index + 1
+    
+    # Per-locale presence and value offsets; the blobs are written afterwards
+    columns = []
+    for locale in locale_names:
+        presence = bytearray(key_count)
+        offsets = [0]
+        for index, key in enumerate(keys):
+            raw = raw_value(locale, key)
+            if raw is not None:
+                presence[index] = 1
+                offsets.append(offsets[-1] + len(raw))
+            else:
+                offsets.append(offsets[-1])
+        columns.append((locale, locale.encode('utf-8'), bytes(presence),
+                        struct.pack(f'<{key_count + 1}I', *offsets), offsets[-1]))
+    
+    # Lay the sections out after the header and locale directory
+    directory_size = sum(_LOCALE_ENTRY.size + len(name) for _, name, _, _, _ in columns)
+    locale_dir_pos = _HEADER.size
+    key_offsets_pos = locale_dir_pos + directory_size
+    key_blob_pos = key_offsets_pos + 4 * (key_count + 1)
+    hash_pos = key_blob_pos + len(key_blob)
+    position = hash_pos + 4 * slots
+    
+    directory = []
+    for _, name, presence, offsets, blob_size in columns:
+        directory.append(_LOCALE_ENTRY.pack(len(name), position, position + len(presence),
+                                            position + len(presence) + len(offsets)) + name)
+        position += len(presence) + len(offsets) + blob_size
+    
+    header = _HEADER.pack(LANG_STORE_MAGIC, LANG_STORE_VERSION, key_count, len(columns), slots,
+                          key_offsets_pos, key_blob_pos, hash_pos, locale_dir_pos)
+    
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(store_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.writelines(directory)
+            f.write(struct.pack(f'<{key_count + 1}I', *key_offsets))
+            f.write(key_blob)
+            f.write(struct.pack(f'<{slots}I', *table))
+            for locale, _, presence, offsets, _ in columns:
+                f.write(presence)
+                f.write(offsets)
+                for key in keys:
+                    raw = raw_value(locale, key)
+                    if raw:
+                        f.write(raw)
+        os.replace(tmp_path, store_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    
+    return key_count
+
+
+class LocaleSpool:
+    """Locale values streamed to a temporary file, then written out as a lang store.
+    
+    Only the keys and the position of each value stay in memory, so the
+    locales of a world never have to be loaded side by side. Within one
+    add() call a later duplicate key overrides an earlier one (as in a parsed
+    .lang file); across calls the first value of a key wins.
+    """
+    
+    def __init__(self, directory):
+        fd, self.spool_path = tempfile.mkstemp(dir=directory, suffix=".spool")
+        self._file = os.fdopen(fd, 'w+b')
+        self._size = 0
+        # locale -> {key: (offset, length)}
+        self._locales = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def add(self, locale, entries):
+        """Append the (key, value) pairs of one .lang file of a locale."""
+        positions = self._locales.setdefault(locale, {})
+        added = set()
+        for key, value in entries:
+            if key in positions and key not in added:
+                continue
+            raw = value.encode('utf-8')
+            self._file.write(raw)
+            positions[key] = (self._size, len(raw))
+            self._size += len(raw)
+            added.add(key)
+    
+    def write(self, store_path):
+        """Write the collected locales to a lang store file; returns its key count."""
+        self._file.flush()
+        keys = sorted(set().union(*self._locales.values())) if self._locales else []
+        if not self._size:
+            return _write_store(store_path, keys, sorted(self._locales),
+                                lambda locale, key: b'' if key in self._locales[locale] else None)
+        
+        with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as spool:
+            def raw_value(locale, key):
+                position = self._locales[locale].get(key)
+                if position is None:
+                    return None
+                offset, length = position
+                return spool[offset:offset + length]
+            
+            return _write_store(store_path, keys, sorted(self._locales), raw_value)
+    
+    def close(self):
+        """Delete the spool file."""
+        self._file.close()
+        if os.path.exists(self.spool_path):
+            os.remove(self.spool_path)
+
+
+class LangStore:
+    """Read-only, memory-mapped view of a lang store file."""
+    
+    def __init__(self, store_path):
+        with open(store_path, 'rb') as f:
+            # mmap cannot map an empty file; a store always has a header
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        try:
+            (magic, version, self._key_count, locale_count, self._slots, self._key_offsets_pos,
+             self._key_blob_pos, self._hash_pos, position) = _HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            self._mm.close()
+            raise ValueError(f"Not a lang store: {store_path}")
+        
+        if magic != LANG_STORE_MAGIC or version != LANG_STORE_VERSION:
+            self._mm.close()
+            raise ValueError(f"Unsupported lang store format: {store_path}")
+        
+        # locale -> (presence pos, value offsets pos, value blob pos)
+        self._locales = {}
+        for _ in range(locale_count):
+            name_length, presence_pos, offsets_pos, blob_pos = _LOCALE_ENTRY.unpack_from(self._mm, position)
+            position += _LOCALE_ENTRY.size
+            name = self._mm[position:position + name_length].decode('utf-8')
+            position += name_length
+            self._locales[name] = (presence_pos, offsets_pos, blob_pos)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __len__(self):
+        return self._key_count
+    
+    def __contains__(self, key):
+        return self._find(key) >= 0
+    
+    def close(self):
+        """Unmap the store file."""
+        self._mm.close()
+    
+    @property
+    def locales(self):
+        """Locale names in the store, sorted."""
+        return list(self._locales)
+    
+    def keys(self):
+        """Yield every key in sorted order."""
+        for index in range(self._key_count):
+            yield self._key_at(index)
+    
+    def get(self, key, locale="en_US", default=None):
+        """Return the value of key in locale, or default if either is missing."""
+        columns = self._locales.get(locale)
+        if columns is None:
+            return default
+        
+        index = self._find(key)
+        if index < 0:
+            return default
+        return self._value_at(columns, index, default)
+    
+    def get_all(self, key):
+        """Return {locale: value} for every locale that has key."""
+        index = self._find(key)
+        if index < 0:
+            return {}
+        
+        values = {}
+        for locale, columns in self._locales.items():
+            value = self._value_at(columns, index, None)
+            if value is not None:
+                values[locale] = value
+        return values
+    
+    def to_dict(self, locale="en_US"):
+        """Decode one locale into a plain {key: value} dict."""
+        columns = self._locales.get(locale)
+        if columns is None:
+            return {}
+        
+        entries = {}
+        for index in range(self._key_count):
+            value = self._value_at(columns, index, None)
+            if value is not None:
+                entries[self._key_at(index)] = value
+        return entries
+    
+    def _find(self, key):
+        """Return the index of key via the hash table, or -1."""
+        raw = key.encode('utf-8')
+        mask = self._slots - 1
+        slot = zlib.crc32(raw) & mask
+        while True:
+            entry = _U32.unpack_from(self._mm, self._hash_pos + 4 * slot)[0]
+            if not entry:
+                return -1
+            if self._key_bytes_at(entry - 1) == raw:
+                return entry - 1
+            slot = (slot + 1) & mask
+    
+    def _key_bytes_at(self, index):
+        start, end = struct.unpack_from('<II', self._mm, self._key_offsets_pos + 4 * index)
+        return self._mm[self._key_blob_pos + start:self._key_blob_pos + end]
+    
+    def _key_at(self, index):
+        return self._key_bytes_at(index).decode('utf-8')
+    
+    def _value_at(self, columns, index, default):
+        presence_pos, offsets_pos, blob_pos = columns
+        if not self._mm[presence_pos + index]:
+            return default
+        start, end = struct.unpack_from('<II', self._mm, offsets_pos + 4 * index)
+        return self._mm[blob_pos + start:blob_pos + end].decode('utf-8')
@@ -0,0 +1,156 @@
+"""
+Lang tokenizer module for splitting .lang values into text, annotations and formatting.
+
+Minecraft Education lang values carry translator annotations after a tab and
+'#', for example:
+
+    book.03=§lCrafting Table:§r%1- Planks	#	###{StrContains="§l"}{StrContains="%1"}
+    sidebar.wood.1a=Collect	#	###(Less than 5 words)
+    action.interact.none=§r	#	###{LOCKED}
+
+Each value is split into:
+- text: the player-facing string with § formatting codes removed
+- comment: any free-form translator note left after the constraints
+- constraints: locked, max_words and str_contains requirements
+- placeholders: %1, %s, :_input_key.use: style icons and ~LINEBREAK~ markers
+
+Only the text needs to reach the AI, so prompts built from the structured
+form skip the annotation and formatting noise.
+"""
+
+import re
+import json
+
+import prompt_packer
+
+
+# Start of an inline translator comment
+COMMENT_MARKER = '\t#'
+
+# Section-sign formatting codes (colours, bold, reset, ...)
+FORMATTING_CODE_RE = re.compile(r'§[0-9a-zA-Z]')
+
+PLACEHOLDER_RE = re.compile(r'%(?:\d+\$)?[sd]|%\d+|:[A-Za-z_][\w.]*:|~LINEBREAK~')
+
+LOCKED_RE = re.compile(r'\{LOCKED\}')
+WORD_LIMIT_RE = re.compile(r'\(Less than (\d+) words?\)', re.IGNORECASE)
+STR_CONTAINS_RE = re.compile(r'\{StrContains="([^"]*)"\}')
+
+# Approximate BPE pieces: words, numbers and single symbols
+TOKEN_PIECE_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def tokenize_lang_value(value):
+    """Split one raw lang value into structured fields.
+    
+    Returns:
+        dict with "text" always present and "comment", "constraints",
+        "placeholders" and "formatting_only" only when they apply
+    """
+    split = value.find(COMMENT_MARKER)
+    if split >= 0:
+        raw_text = value[:split]
+        comment = value[split + len(COMMENT_MARKER):]
+    else:
+        raw_text = value
+        comment = ''
+    
+    text = FORMATTING_CODE_RE.sub('', raw_text).strip() if '§' in raw_text else raw_text.strip()
+    entry = {"text": text}
+    
+    if comment:
+        constraints = {}
+        note = comment
+        if '{LOCKED}' in note:
+            constraints["locked"] = True
+            note = LOCKED_RE.sub('', note)
+        if '(' in note:
+            word_limit = WORD_LIMIT_RE.search(note)
+            if word_limit:
+                constraints["max_words"] = int(word_limit.group(1))
+                note = WORD_LIMIT_RE.sub('', note)
+        if '{StrContains' in note:
+            constraints["str_contains"] = STR_CONTAINS_RE.findall(note)
+            note = STR_CONTAINS_RE.sub('', note)
+        if constraints:
+            entry["constraints"] = constraints
+        
+        note = note.strip().lstrip('#').strip()
+        if note:
+            entry["comment"] = note
+    
+    placeholders = PLACEHOLDER_RE.findall(text) if ('%' in text or ':' in text or '~' in text) else []
+    if placeholders:
+        entry["placeholders"] = placeholders
+    
+    # Nothing for a reader once codes and placeholders are gone
+    readable = PLACEHOLDER_RE.sub('', text) if placeholders else text
+    if not any(c.isalnum() for c in readable):
+        entry["formatting_only"] = True
+    
+    return entry
+
+
+def tokenize_lang_entries(lang_data):
+    """Tokenize every value of a {key: raw value} dict into {key: structured entry}."""
+    return {key: tokenize_lang_value(value) for key, value in lang_data.items()}
+
+
+def clean_lang_entries(structured, include_formatting_only=False):
+    """Return {key: text} from structured entries, for use in prompts.
+    Entries with no readable text are left out unless include_formatting_only is set."""
+    return {key: entry["text"] for key, entry in structured.items()
+            if include_formatting_only or not entry.get("formatting_only")}
+
+
+def estimate_tokens(text):
+    """Rough prompt token count: one per word, number or symbol, plus one per
+    six extra letters in long words (close to BPE counts for English).
+    
+    prompt_packer.count_tokens falls back to this when tiktoken is not
+    available; budgets should count with that instead."""
+    return sum(1 + (len(piece) - 1) // 6 for piece in TOKEN_PIECE_RE.findall(text))
+
+
+def prompt_token_savings(lang_data, structured, model=None):
+    """Compare the prompt cost of raw lang values with the cleaned text.
+    
+    Both sides are measured as the JSON a prompt would embed.
+    
+    Returns:
+        dict with raw_tokens, clean_tokens, tokens_saved and percent_saved
+    """
+    raw_tokens = prompt_packer.count_tokens(json.dumps(lang_data, indent=2, ensure_ascii=False), model)
+    clean_tokens = prompt_packer.count_tokens(json.dumps(clean_lang_entries(structured), indent=2, ensure_ascii=False),
+                                              model)
+    saved = raw_tokens - clean_tokens
+    
+    return {
+        "raw_tokens": raw_tokens,
+        "clean_tokens": clean_tokens,
+        "tokens_saved": saved,
+        "percent_saved": round(100.0 * saved / raw_tokens, 1) if raw_tokens else 0.0
+    }
+
+
+def chunk_lang_entries(entries, max_tokens, model=None):
+    """Split {key: text} into consecutive dicts of at most max_tokens tokens each
+    (counted as prompt_packer does for model). An entry larger than max_tokens
+    gets a chunk of its own."""
+    chunks = []
+    current = {}
+    current_tokens = 0
+    
+    for key, text in entries.items():
+        # Key, value, quotes and separators as they appear in the JSON prompt
+        tokens = prompt_packer.count_tokens(key, model) + prompt_packer.count_tokens(text, model) + 4
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current = {}
+            current_tokens = 0
+        current[key] = text
+        current_tokens += tokens
+    
+    if current:
+        chunks.append(current)
+    return chunks
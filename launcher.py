@@ -6,6 +6,7 @@ Launch the application in CLI or GUI mode.
 
 import sys
 import os
+import multiprocessing
 
 
 def check_gui_available():
@@ -64,4 +65,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for process pools in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
@@ -6,8 +6,10 @@ A CLI application for managing Minecraft Education game information with Azure O
 
 import os
 import sys
+import multiprocessing
 from game_manager import GameManager
 from settings import Settings
+from downloads_manifest import describe_world, format_size
 
 
 def main():
@@ -83,18 +85,26 @@ class EduContentTools:
             print("  sl. Create School Leadership Information Sheet")
             print("  cs. Create Curriculum Standards Mapping")
             print("  tc. Create Text Complexity Analysis")
+            print("  all. Create All of the Above")
             
             print("\nEXPORT:")
             print("  e. Export All Creations to Folder")
         
         print("\nOTHER:")
         print("  s. Settings (Azure OpenAI API)")
+        print("  f. Search All Games")
         if self.current_game:
             print("  l. List All Games")
         print("  x. Delete Game Folder")
         print("  0. Exit")
         print("-" * 70)
     
+    def print_world_choices(self, world_infos):
+        """Print a numbered list of world files with their peeked metadata."""
+        for i, info in enumerate(world_infos, 1):
+            print(f"{i}. {info['filename']}")
+            print(f"     {describe_world(info)}")
+    
     def wait_for_key(self):
         """Wait for user to press Enter."""
         input("\nPress Enter to continue...")
@@ -182,12 +192,11 @@ class EduContentTools:
             # Prompt to upload world file
             upload = input("\nWould you like to upload a world file now? (y/n): ").strip().lower()
             if upload == 'y':
-                world_files = self.game_manager.list_world_files_in_downloads()
+                world_infos = self.game_manager.list_world_files_in_downloads_with_info()
+                world_files = [info["path"] for info in world_infos]
                 if world_files:
                     print("\nAvailable world files in Downloads:")
-                    for i, file in enumerate(world_files, 1):
-                        filename = file.split('/')[-1]
-                        print(f"{i}. {filename}")
+                    self.print_world_choices(world_infos)
                     
                     try:
                         selection = int(input("\nSelect file number (0 to skip): ").strip())
@@ -259,12 +268,11 @@ class EduContentTools:
         print(f"    UPLOAD WORLD FILE - {self.current_game}")
         print("=" * 70)
         
-        world_files = self.game_manager.list_world_files_in_downloads()
+        world_infos = self.game_manager.list_world_files_in_downloads_with_info()
+        world_files = [info["path"] for info in world_infos]
         if world_files:
             print("\nAvailable world files in Downloads:")
-            for i, file in enumerate(world_files, 1):
-                filename = file.split('/')[-1]
-                print(f"{i}. {filename}")
+            self.print_world_choices(world_infos)
             
             try:
                 selection = int(input("\nSelect file number (0 to cancel): ").strip())
@@ -328,11 +336,11 @@ class EduContentTools:
                     print(f"\n[OK] Game folder '{game_name}' created successfully!")
                     
                     # Now upload world file
-                    world_files = self.game_manager.list_world_files_in_downloads()
+                    world_infos = self.game_manager.list_world_files_in_downloads_with_info()
+                    world_files = [info["path"] for info in world_infos]
                     if world_files:
                         print("\nAvailable world files in Downloads:")
-                        for i, file in enumerate(world_files, 1):
-                            print(f"{i}. {file}")
+                        self.print_world_choices(world_infos)
                         
                         try:
                             selection = int(input("\nSelect file number (0 to skip): ").strip())
@@ -382,11 +390,11 @@ class EduContentTools:
                 self.wait_for_key()
                 return
             
-            world_files = self.game_manager.list_world_files_in_downloads()
+            world_infos = self.game_manager.list_world_files_in_downloads_with_info()
+            world_files = [info["path"] for info in world_infos]
             if world_files:
                 print("\nAvailable world files in Downloads:")
-                for i, file in enumerate(world_files, 1):
-                    print(f"{i}. {file}")
+                self.print_world_choices(world_infos)
                 
                 try:
                     selection = int(input("\nSelect file number (0 to cancel): ").strip())
@@ -1025,6 +1033,34 @@ class EduContentTools:
             print(f"Total entries: {result['entry_count']}")
             print(f"NPC Content Score: {result.get('score', 0)}")
             print(f"Analyzed {result.get('selected_from', 1)} candidate file(s)")
+            if len(result.get('archives', [])) > 1:
+                print(f"Merged {len(result['archives'])} world files: {', '.join(result['archives'])}")
+            for archive, error in result.get('failed_archives', {}).items():
+                print(f"[WARNING] Skipped {archive}: {error}")
+            if result.get('scan'):
+                scan = result['scan']
+                print(f"Scan: {scan['scan_mode']} in {scan['elapsed_seconds']:.2f}s")
+                if 'archive_cache_hits' in scan:
+                    print(f"Cache: {scan['archive_cache_hits']} world file(s) unchanged, "
+                          f"{scan['members_scored']} lang file(s) rescanned")
+            if result.get('locale_store'):
+                store = result['locale_store']
+                print(f"Locale store: {store['keys']} keys in {len(store['locales'])} locale(s) "
+                      f"({', '.join(store['locales'])})")
+            if result.get('tokenizer'):
+                tokens = result['tokenizer']
+                print(f"Prompt tokens saved by stripping annotations: ~{tokens['tokens_saved']} "
+                      f"({tokens['percent_saved']}% of {tokens['raw_tokens']})")
+            if result.get('index'):
+                index = result['index']
+                namespaces = ", ".join(f"{name} ({count})" for name, count in list(index['top_namespaces'].items())[:5])
+                print(f"Key index: {index['namespaces']} namespaces ({namespaces}); "
+                      f"{index['conversations']} conversations with {index['dialogue_lines']} dialogue lines, "
+                      f"{index['sequences']} numbered sequences")
+            delta = result.get('delta')
+            if delta:
+                print(f"Changes since the last {delta['since']}: {delta['added']} added, "
+                      f"{delta['removed']} removed, {delta['changed']} changed")
             
             if result['preview']:
                 print("\n Preview (first 10 entries):")
@@ -1039,13 +1075,30 @@ class EduContentTools:
             if self.settings.is_configured():
                 analyze = input("\nAnalyze language file with Azure OpenAI? (y/n): ").strip().lower()
                 if analyze == 'y':
+                    delta_only = False
+                    if delta and info.get("lang_analysis"):
+                        delta_only = input("Only send the changed entries to update the existing analysis? (y/n): ").strip().lower() == 'y'
                     print("\n[AI] Analyzing language file...")
-                    analysis = self.game_manager.analyze_lang_file_with_ai(self.current_game)
+                    analysis = self.game_manager.analyze_lang_file_with_ai(self.current_game, delta_only=delta_only)
                     if analysis:
                         print("\n ANALYSIS:")
                         print("-" * 60)
                         print(analysis)
                         print("-" * 60)
+                        lang_info = (self.game_manager.load_game_info(self.current_game) or {}).get("lang_analysis", {})
+                        sampling = lang_info.get("sampling")
+                        if sampling:
+                            print(f"Sent {sampling['sampled_entries']} of {sampling['total_entries']} entries "
+                                  f"({sampling['dropped_formatting'] + sampling['dropped_locked']} formatting/locked, "
+                                  f"{sampling['near_duplicates']} near-duplicates"
+                                  + (f", {sampling['budget_dropped']} over the token budget"
+                                     if sampling.get('budget_dropped') else "")
+                                  + f" left out): ~{sampling['tokens_saved']} tokens saved ({sampling['percent_saved']}%) "
+                                  f"vs sending every raw value")
+                        coverage = lang_info.get("coverage")
+                        if coverage and "readable_entries" in coverage:
+                            print(f"Coverage: {coverage['entries_analyzed']} of {coverage['readable_entries']} "
+                                  f"readable entries analyzed ({coverage['percent']}%)")
                         print("\n[OK] Analysis saved to game folder!")
         else:
             error_msg = result.get("error", "Unknown error") if result else "Failed to extract language files"
@@ -1095,6 +1148,10 @@ class EduContentTools:
                     print(f"  Type: {doc['type']} | Uploaded: {doc['uploaded'][:10]}")
                     if doc.get('ai_analyzed'):
                         print(f"  AI Analysis: [OK]")
+                    similar = doc.get('similar_to')
+                    if similar:
+                        reused = " (analysis reused)" if similar.get('near_duplicate') else ""
+                        print(f"  Similar to: {similar['filename']} ({similar['similarity']:.1%}){reused}")
             
             if "lang_analysis" in info:
                 print("\n[AI] LANGUAGE FILE AI ANALYSIS:")
@@ -1140,6 +1197,35 @@ class EduContentTools:
         
         self.wait_for_key()
     
+    def search_games(self):
+        """Search lang entries, analyses, game info and creations across all games."""
+        self.clear_screen()
+        print("=" * 70)
+        print("    SEARCH ALL GAMES")
+        print("=" * 70)
+        
+        print("\nUpdating search index...")
+        stats = self.game_manager.update_search_index()
+        print(f"[OK] {stats['documents']} entries from {stats['files']} files "
+              f"({stats['files_indexed']} re-indexed, {stats['files_removed']} removed)")
+        
+        while True:
+            query = input("\nSearch for (Enter to finish): ").strip()
+            if not query:
+                return
+            
+            results = self.game_manager.search_games(query, limit=15)
+            if not results:
+                print("\nNo matches found.")
+                continue
+            
+            print(f"\n{len(results)} best match(es):")
+            print("-" * 70)
+            for i, result in enumerate(results, 1):
+                print(f"{i}. {result['game']} - {result['kind']}: {result['label'] or os.path.basename(result['path'])}")
+                print(f"     {result['snippet']}")
+            print("-" * 70)
+    
     def list_all_games(self):
         """List all games with detailed status."""
         self.clear_screen()
@@ -1203,7 +1289,8 @@ class EduContentTools:
         print("\nSupported formats: PDF, Word (.docx), PowerPoint (.pptx)")
         print("\nSearching Downloads folder...\n")
         
-        documents = self.game_manager.list_documents_in_downloads()
+        document_infos = self.game_manager.list_documents_in_downloads_with_info()
+        documents = [info["path"] for info in document_infos]
         
         if not documents:
             print("\n[ERROR] No supported documents found in Downloads folder!")
@@ -1211,12 +1298,17 @@ class EduContentTools:
             return
         
         print("Available documents:")
-        for i, doc_path in enumerate(documents, 1):
-            filename = doc_path.split('/')[-1]
-            print(f"{i}. {filename}")
+        for i, doc_info in enumerate(document_infos, 1):
+            print(f"{i}. {doc_info['filename']} ({format_size(doc_info['size'])})")
+        
+        print("\nb. Batch ingest a folder or pattern (upload, extract and analyze)")
         
         try:
-            selection = int(input("\nSelect document number (0 to cancel): ").strip())
+            choice = input("\nSelect document number, or b for batch (0 to cancel): ").strip()
+            if choice.lower() == 'b':
+                self.batch_ingest_documents()
+                return
+            selection = int(choice)
             if selection == 0:
                 return
             elif 1 <= selection <= len(documents):
@@ -1236,6 +1328,11 @@ class EduContentTools:
                         
                         if analysis:
                             print("[OK] Document analysis complete!")
+                            info = self.game_manager.load_game_info(self.current_game) or {}
+                            coverage = (info.get("document_analysis") or {}).get(filename, {}).get("coverage")
+                            if coverage:
+                                print(f"Coverage: {coverage['words_analyzed']} of {coverage['total_words']} words "
+                                      f"({coverage['percent']}%)")
                             print("\n DOCUMENT ANALYSIS (Preview):")
                             print("-" * 70)
                             # Show first 300 characters of analysis
@@ -1257,6 +1354,40 @@ class EduContentTools:
         
         self.wait_for_key()
     
+    def batch_ingest_documents(self):
+        """Upload, extract and analyze a folder or glob of documents in one resumable batch."""
+        print("\nEnter a folder, a pattern (e.g. ~/Packs/*.pdf) or a document path.")
+        print("An interrupted batch resumes where it stopped when run again.")
+        source = input("Source (blank for Downloads): ").strip() or os.path.join(os.path.expanduser("~"), "Downloads")
+        
+        if not self.settings.is_configured():
+            print("\n⚠ Azure OpenAI not configured. Documents will be uploaded and extracted but not analyzed.")
+        
+        print()
+        result = self.game_manager.ingest_documents(self.current_game, source)
+        if not result:
+            print("\n[ERROR] No supported documents found!")
+            self.wait_for_key()
+            return
+        
+        print("\n" + "-" * 70)
+        print(f"Batch complete: {result['documents']} document(s) in {result['seconds']}s")
+        for stage in result["stages"]:
+            print(f"  {stage:<8} {result['completed'][stage]}/{result['documents']}")
+        if result["resumed"]:
+            print(f"  {result['resumed']} stage(s) already done in an earlier run were skipped")
+        for failure in result["failed"]:
+            print(f"  [ERROR] {failure['filename']} ({failure['stage']}): {failure['error']}")
+        self.print_ai_connection_stats()
+        self.wait_for_key()
+    
+    def print_ai_connection_stats(self):
+        """Show how many AI requests reused a pooled HTTP connection this session."""
+        stats = self.game_manager.ai_connection_stats()
+        if stats["requests"]:
+            print(f"AI requests this session: {stats['requests']} over {stats['new_connections']} connection(s), "
+                  f"{stats['reuse_percent']}% reused")
+    
     def export_game_info(self):
         """Export game information to markdown."""
         if not self.current_game:
@@ -2008,12 +2139,12 @@ class EduContentTools:
         print(f"    CREATE TEXT COMPLEXITY ANALYSIS - {self.current_game}")
         print("=" * 70)
         
-        # Check if language file analysis exists
+        # Check if an extracted language file exists
         info = self.game_manager.load_game_info(self.current_game)
         metadata = self.game_manager._load_metadata(self.current_game)
         
-        if not info or not info.get("lang_analysis"):
-            print("\n[ERROR] No language file analysis found!")
+        if not metadata or not metadata.get("lang_file"):
+            print("\n[ERROR] No extracted language file found!")
             print("   Please upload a world file and extract language files first.")
             print("   Use option 3 to upload a world file, then option 7 to extract.")
             self.wait_for_key()
@@ -2024,14 +2155,13 @@ class EduContentTools:
         # Show what information is available
         print(" Using the following information:")
         print("-" * 70)
-        print("[OK] Language File Analysis (NPC dialogue & in-game text)")
+        print("[OK] Readability metrics measured over every NPC dialogue & in-game text entry")
         if info and info.get("context"):
             print("[OK] Game Context")
         if info and info.get("objectives"):
             obj_count = len(info["objectives"]) if isinstance(info["objectives"], list) else 1
             print(f"[OK] Learning Objectives ({obj_count} objectives)")
-        if metadata and metadata.get("lang_file"):
-            print(f"[OK] Language File: {metadata['lang_file']['filename']}")
+        print(f"[OK] Language File: {metadata['lang_file']['filename']}")
         print("-" * 70)
         print("\n⏳ Processing...\n")
         
@@ -2058,6 +2188,60 @@ class EduContentTools:
         
         self.wait_for_key()
     
+    def create_all_resources(self):
+        """Create every resource type at once, generated concurrently."""
+        if not self.settings.is_configured():
+            print("\n[ERROR] Azure OpenAI must be configured to use creation features!")
+            self.wait_for_key()
+            return
+        
+        self.clear_screen()
+        print("=" * 70)
+        print(f"    CREATE ALL RESOURCES - {self.current_game}")
+        print("=" * 70)
+        
+        print("\nThe curriculum standards mapping needs a country and standards.")
+        country = input("Country/region (Enter to skip the mapping): ").strip()
+        standards = ""
+        if country:
+            standards = input("Standards (e.g. Common Core State Standards): ").strip()
+            if not standards:
+                print("No standards given - the curriculum mapping will be skipped.")
+        
+        print("\n⏳ Generating all resources concurrently...\n")
+        
+        def show_progress(key, label, status, result):
+            if status == "started":
+                print(f"  ... {label}")
+            elif status == "done":
+                print(f"  [OK] {label} ({result['seconds']}s)")
+            elif status == "failed":
+                print(f"  [ERROR] {label} failed ({result['seconds']}s)")
+            else:
+                print(f"  [SKIP] {label}")
+        
+        summary = self.game_manager.create_all(self.current_game, country or None, standards or None,
+                                               progress=show_progress)
+        if summary is None:
+            print("\n[ERROR] Failed to create resources.")
+            self.wait_for_key()
+            return
+        
+        created = [r for r in summary["results"] if r["status"] == "done"]
+        failed = [r for r in summary["results"] if r["status"] == "failed"]
+        print("\n" + "-" * 70)
+        print(f"Created {len(created)} resource(s) in {summary['seconds']}s "
+              f"(slowest single resource: {summary['slowest_seconds']}s)")
+        for result in created:
+            # The quiz is saved as two files, the quiz and its answers
+            files = result["file"].values() if isinstance(result["file"], dict) else [result["file"]]
+            print(f"  {result['label']}: {', '.join(files)}")
+        if failed:
+            print(f"\n[ERROR] Failed: {', '.join(r['label'] for r in failed)}")
+        self.print_ai_connection_stats()
+        
+        self.wait_for_key()
+    
     def settings_menu(self):
         """Settings menu for Azure OpenAI API configuration."""
         while True:
@@ -2120,6 +2304,7 @@ class EduContentTools:
                     print("\n Testing connection...")
                     if self.game_manager.test_azure_connection():
                         print("[OK] Connection successful!")
+                        self.print_ai_connection_stats()
                     else:
                         print("[ERROR] Connection failed!")
                 else:
@@ -2242,8 +2427,16 @@ class EduContentTools:
                 else:
                     print("\n[ERROR] Please load a game first!")
                     self.wait_for_key()
+            elif choice == "all":
+                if self.current_game:
+                    self.create_all_resources()
+                else:
+                    print("\n[ERROR] Please load a game first!")
+                    self.wait_for_key()
             elif choice == "s" or choice == "settings":
                 self.settings_menu()
+            elif choice == "f" or choice == "find" or choice == "search":
+                self.search_games()
             elif choice == "l" or choice == "list":
                 self.list_all_games()
             elif choice == "x" or choice == "delete":
@@ -2259,4 +2452,6 @@ class EduContentTools:
 
 
 if __name__ == "__main__":
+    # Required for process pools in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,197 @@
+"""
+OOXML extractor module for streaming text out of Word (.docx) and PowerPoint (.pptx) files.
+
+The XML parts are read straight from the zip and parsed incrementally with
+ElementTree.iterparse, clearing every block once its text is taken, so
+memory stays flat however large the document or deck is. No object model
+is built. Text comes out in reading order:
+- Word: word/document.xml, paragraphs and tables (one line per row, cells
+  separated by " | "), text boxes included
+- PowerPoint: slides in presentation order (ppt/slides/*.xml), every shape
+  including grouped shapes and tables, then each slide's speaker notes
+  (ppt/notesSlides/*.xml)
+"""
+
+import re
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+NOTES_SLIDE_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/notesSlide"
+
+# Tags of one dialect: paragraph, text run, tab, line breaks, table, row, cell
+WORD_TAGS = {"p": W + "p", "t": W + "t", "tab": W + "tab", "br": (W + "br", W + "cr"),
+             "tbl": W + "tbl", "tr": W + "tr", "tc": W + "tc"}
+DRAWING_TAGS = {"p": A + "p", "t": A + "t", "tab": A + "tab", "br": (A + "br",),
+                "tbl": A + "tbl", "tr": A + "tr", "tc": A + "tc"}
+
+# Placeholders that only repeat slide furniture
+SLIDE_SKIPPED_PLACEHOLDERS = ("sldNum", "dt", "ftr", "hdr")
+# On a notes page only the notes body is wanted, not the slide image or number
+NOTES_KEPT_PLACEHOLDERS = ("body", None)
+
+# Raised for a zip that is not a Word/PowerPoint package or has a damaged part
+OOXML_ERRORS = (KeyError, zipfile.BadZipFile, ET.ParseError)
+
+CELL_SEPARATOR = " | "
+SLIDE_NUMBER_RE = re.compile(r'(\d+)\.xml$')
+
+
+def extract_docx_text(file_path):
+    """Text of a .docx file, paragraphs and table rows one per line."""
+    with zipfile.ZipFile(file_path) as zip_ref:
+        with zip_ref.open("word/document.xml") as stream:
+            return "\n".join(block for block, _ in iter_blocks(stream, WORD_TAGS, W + "body"))
+
+
+def extract_pptx_text(file_path):
+    """Text of a .pptx file: per slide a "Slide N" line, the slide's text and its notes."""
+    parts = []
+    with zipfile.ZipFile(file_path) as zip_ref:
+        for number, slide_path in enumerate(_slide_paths(zip_ref), 1):
+            with zip_ref.open(slide_path) as stream:
+                lines = [block for block, placeholder in iter_blocks(stream, DRAWING_TAGS, P + "spTree")
+                         if placeholder not in SLIDE_SKIPPED_PLACEHOLDERS]
+            
+            notes_path = _related_part(zip_ref, slide_path, NOTES_SLIDE_TYPE)
+            notes = []
+            if notes_path:
+                with zip_ref.open(notes_path) as stream:
+                    notes = [block for block, placeholder in iter_blocks(stream, DRAWING_TAGS, P + "spTree")
+                             if placeholder in NOTES_KEPT_PLACEHOLDERS]
+            
+            parts.append(f"Slide {number}")
+            parts.extend(lines)
+            if notes:
+                parts.append("Notes: " + "\n".join(notes))
+            parts.append("")
+    return "\n".join(parts).strip()
+
+
+def iter_blocks(stream, tags, container):
+    """Stream the text blocks of one OOXML part in document order.
+
+    Args:
+        stream: Binary file object of the XML part
+        tags: WORD_TAGS or DRAWING_TAGS
+        container: Tag whose finished children are cleared as parsing goes
+
+    Yields:
+        (text, placeholder type of the enclosing slide shape or None) for
+        every non-empty paragraph outside tables and every table row
+    """
+    p_tag, t_tag, tab_tag, br_tags = tags["p"], tags["t"], tags["tab"], tags["br"]
+    tbl_tag, tr_tag, tc_tag = tags["tbl"], tags["tr"], tags["tc"]
+    shape_tags = (P + "sp", P + "graphicFrame")
+    block_tags = (p_tag, tbl_tag, P + "sp", P + "grpSp", P + "graphicFrame")
+    ph_tag = P + "ph"
+    
+    paragraphs = []   # stack of run lists; text boxes nest paragraphs
+    tables = []       # stack of tables, each a list of rows of cells of paragraph texts
+    placeholder = None
+    roots = []
+    
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == p_tag:
+                paragraphs.append([])
+            elif tag == tbl_tag:
+                tables.append([])
+            elif tag == tr_tag and tables:
+                tables[-1].append([])
+            elif tag == tc_tag and tables and tables[-1]:
+                tables[-1][-1].append([])
+            elif tag in shape_tags:
+                placeholder = None
+            elif tag == ph_tag:
+                placeholder = elem.get("type")
+            elif tag == container:
+                roots.append(elem)
+            continue
+        
+        if tag == t_tag:
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tag == tab_tag:
+            if paragraphs:
+                paragraphs[-1].append("\t")
+        elif tag in br_tags:
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag == p_tag:
+            text = "".join(paragraphs.pop()).strip()
+            if not text:
+                pass
+            elif paragraphs:
+                # Paragraph inside a text box: part of the enclosing paragraph
+                paragraphs[-1].append(" " + text)
+            elif tables and tables[-1] and tables[-1][-1]:
+                tables[-1][-1][-1].append(text)
+            else:
+                yield text, placeholder
+        elif tag == tbl_tag and tables:
+            rows = [CELL_SEPARATOR.join(" ".join(cell) for cell in row) for row in tables.pop()]
+            rows = [row for row in rows if row.strip(CELL_SEPARATOR.strip() + " ")]
+            if tables and tables[-1] and tables[-1][-1]:
+                # Nested table: flattened into the enclosing cell
+                tables[-1][-1][-1].extend(rows)
+            else:
+                for row in rows:
+                    yield row, placeholder
+        
+        # Drop finished top-level blocks so memory stays flat
+        if roots and not paragraphs and not tables and tag in block_tags:
+            roots[-1].clear()
+
+
+def _slide_paths(zip_ref):
+    """Slide parts in presentation order (falling back to their file numbering)."""
+    names = set(zip_ref.namelist())
+    try:
+        targets = _relationship_targets(zip_ref, "ppt/presentation.xml")
+        order = []
+        with zip_ref.open("ppt/presentation.xml") as stream:
+            for _, elem in ET.iterparse(stream):
+                if elem.tag == P + "sldId":
+                    path = targets.get(elem.get(R + "id"))
+                    if path in names:
+                        order.append(path)
+        if order:
+            return order
+    except (KeyError, ET.ParseError):
+        pass
+    
+    slides = [n for n in names if n.startswith("ppt/slides/slide") and n.endswith(".xml")]
+    return sorted(slides, key=lambda n: int(SLIDE_NUMBER_RE.search(n).group(1)) if SLIDE_NUMBER_RE.search(n) else 0)
+
+
+def _relationship_targets(zip_ref, part_path):
+    """{relationship id: target part path} of a part, resolved against its folder."""
+    folder, name = posixpath.split(part_path)
+    targets = {}
+    with zip_ref.open(posixpath.join(folder, "_rels", name + ".rels")) as stream:
+        for _, elem in ET.iterparse(stream):
+            if elem.tag == REL + "Relationship" and elem.get("TargetMode") != "External":
+                targets[elem.get("Id")] = posixpath.normpath(posixpath.join(folder, elem.get("Target", "")))
+    return targets
+
+
+def _related_part(zip_ref, part_path, relationship_type):
+    """Path of the first part related to part_path by relationship_type, or None."""
+    folder, name = posixpath.split(part_path)
+    try:
+        with zip_ref.open(posixpath.join(folder, "_rels", name + ".rels")) as stream:
+            for _, elem in ET.iterparse(stream):
+                if elem.tag == REL + "Relationship" and elem.get("Type") == relationship_type:
+                    return posixpath.normpath(posixpath.join(folder, elem.get("Target", "")))
+    except KeyError:
+        pass
+    return None
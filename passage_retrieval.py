@@ -0,0 +1,114 @@
+"""
+Passage retrieval module for giving each create_* prompt only the material it needs.
+
+Instead of every document analysis and the full lang analysis, each prompt
+section of a creation gets the passages that rank highest (BM25, via
+search_index) for a query written for that creation and section, up to a
+top-k and a token budget. A parent guide asks the documents about home
+connections and safety; a quiz asks them about concepts and assessment.
+
+Prompt sections and what feeds them:
+- lang_analysis: sections of the lang analysis and runs of lang entries
+- document_analysis: sections of the document analyses and passages of the
+  extracted document text
+"""
+
+import prompt_packer
+import search_index
+
+
+# Passages per prompt section, and their token budget
+# (overridable with the "retrieval_top_k" and "retrieval_tokens" settings)
+RETRIEVAL_TOP_K = 12
+RETRIEVAL_SECTION_TOKENS = 1500
+
+SECTION_KINDS = {
+    "lang_analysis": (search_index.KIND_LANG_ANALYSIS, search_index.KIND_LANG_PASSAGES),
+    "document_analysis": (search_index.KIND_DOCUMENTS, search_index.KIND_DOCUMENT_TEXT)
+}
+
+# What each creation looks for in the lang material and in the documents.
+# Terms are matched as written (no stemming), so common variants are listed.
+CREATION_QUERIES = {
+    "student_guide": {
+        "lang_analysis": "welcome introduction objective objectives quest task tasks goal instructions controls "
+                         "tutorial hint hints tip tips help npc dialogue challenge",
+        "document_analysis": "student students learn learning activity activities gameplay instructions "
+                             "walkthrough controls getting started objectives concepts challenge challenges "
+                             "tips reflection questions"
+    },
+    "student_workbook": {
+        "lang_analysis": "quest task tasks objective challenge puzzle question questions answer build collect "
+                         "explore npc dialogue instructions",
+        "document_analysis": "student students activity activities worksheet exercise exercises task tasks "
+                             "challenge question questions reflection vocabulary concepts hands-on extension "
+                             "assessment"
+    },
+    "student_quiz": {
+        "lang_analysis": "fact facts concept concepts explain definition question questions answer learn "
+                         "learning science data npc dialogue",
+        "document_analysis": "learn learning objectives key concept concepts vocabulary definition definitions "
+                             "assessment assess question questions quiz rubric knowledge understanding"
+    },
+    "parent_guide": {
+        "lang_analysis": "welcome introduction story goal learn learning npc dialogue",
+        "document_analysis": "parent parents family families home overview age grade skills learn learning "
+                             "safety screen time discussion conversation benefits support children"
+    },
+    "teacher_guide": {
+        "lang_analysis": "objective objectives quest task tasks instructions tutorial npc dialogue hint challenge",
+        "document_analysis": "teacher teachers educator facilitator lesson lessons plan implementation "
+                             "preparation timing time duration minutes prerequisites assessment rubric "
+                             "standards differentiation extension classroom management setup"
+    },
+    "leadership_sheet": {
+        "lang_analysis": "story goal learn learning objective",
+        "document_analysis": "overview outcomes impact skills standards curriculum alignment implementation "
+                             "time requirements resources cost benefits school leaders leadership evidence"
+    },
+    "curriculum_mapping": {
+        "lang_analysis": "concept concepts learn learning science math data explain objective",
+        "document_analysis": "standard standards curriculum alignment aligned learn learning objectives "
+                             "outcomes subject grade level assessment competencies skills framework"
+    },
+    "text_complexity": {
+        "lang_analysis": "npc dialogue instructions tutorial hint tips vocabulary explain definition story",
+        "document_analysis": "age ages grade level reading literacy vocabulary language learners ell esl "
+                             "accessibility differentiation scaffolding support readability audience"
+    }
+}
+
+
+def build_query(purpose, section, extra=""):
+    """Query for one prompt section of a creation, with extra terms (e.g. its learning objectives)."""
+    return f"{CREATION_QUERIES[purpose][section]} {extra}".strip()
+
+
+def retrieve_section(index, game_name, purpose, section, extra="", top_k=RETRIEVAL_TOP_K,
+                     token_budget=RETRIEVAL_SECTION_TOKENS, model=None):
+    """The best passages for one prompt section, within top_k and token_budget.
+
+    Passages are taken in score order; one that would overrun the budget is
+    skipped in favour of smaller ones further down. Tokens are counted for
+    model the way prompt_packer counts them, so the packer does not trim
+    the section again.
+
+    Returns:
+        (text with each passage under a "From <label>:" line, or "" if nothing
+        matched; dict with passages, tokens and candidates)
+    """
+    results = index.search(build_query(purpose, section, extra), limit=top_k * 3,
+                           game=game_name, kinds=SECTION_KINDS[section])
+    chosen = []
+    tokens = 0
+    for result in results:
+        passage = f"From {result['label']}:\n{result['text']}"
+        passage_tokens = prompt_packer.count_tokens(passage, model)
+        if tokens + passage_tokens > token_budget:
+            continue
+        chosen.append(passage)
+        tokens += passage_tokens
+        if len(chosen) >= top_k:
+            break
+    
+    return "\n\n".join(chosen), {"passages": len(chosen), "tokens": tokens, "candidates": len(results)}
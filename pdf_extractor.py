@@ -0,0 +1,230 @@
+"""
+PDF extractor module for page-level text extraction with a persistent page cache.
+
+Large PDFs (200-page educator guides) are split into page ranges that are
+extracted in a process pool, one PdfReader per worker. The pool is shared by
+the whole process and created on first use, so extractions running in
+several threads at once (batch ingest, the GUI) never start more than
+POOL_MAX_WORKERS processes between them. Its workers are spawned rather than
+forked, as forking a multi-threaded process can deadlock the child. The text of every
+page is cached by the file's SHA-256 and the page index, so re-analysis, or
+analysis of another page range, never parses a page twice.
+
+Everything handed to the pool is a plain module-level function, as in
+lang_scanner.
+"""
+
+import os
+import json
+import tempfile
+import threading
+
+from extraction_cache import ExtractionCache
+
+
+PAGE_CACHE_VERSION = 1
+
+# Fewer missing pages than this are extracted in-process; starting a pool costs more
+PARALLEL_MIN_PAGES = 16
+
+# Page ranges handed out per worker, so a slow range does not hold up the rest
+BATCHES_PER_WORKER = 2
+
+# Worker processes of the shared pool, however many extractions run at once
+POOL_MAX_WORKERS = os.cpu_count() or 1
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PageCache:
+    """Cached page texts and page counts of PDF files, by content hash."""
+    
+    def __init__(self, cache_dir):
+        self.extraction_cache = ExtractionCache(cache_dir)
+        self.cache_dir = os.path.join(cache_dir, f"pdf_pages_v{PAGE_CACHE_VERSION}")
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def digest(self, file_path):
+        """SHA-256 of a file, remembered against its size and mtime."""
+        return self.extraction_cache.archive_digest(file_path)
+    
+    def get_page_count(self, digest):
+        record = self._read_json(os.path.join(self.cache_dir, digest, "pages.json"))
+        return record.get("pages") if record else None
+    
+    def put_page_count(self, digest, pages):
+        self._write(os.path.join(self.cache_dir, digest, "pages.json"), json.dumps({"pages": pages}))
+    
+    def get_page(self, digest, index):
+        """Cached text of one page, or None."""
+        try:
+            with open(os.path.join(self.cache_dir, digest, f"{index}.txt"), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def put_page(self, digest, index, text):
+        self._write(os.path.join(self.cache_dir, digest, f"{index}.txt"), text)
+    
+    def _read_json(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _write(self, path, text):
+        """Write a record atomically, so a reader never sees a partial page."""
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing PDF page cache: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def extract_pdf_pages(file_path, pages=None, cache_dir=None, max_workers=None, stats=None):
+    """Extract the text of PDF pages, from the page cache where possible.
+
+    Args:
+        file_path: PDF file
+        pages: Page indexes to extract (0-based, e.g. range(10, 20)); None = all
+        cache_dir: Page cache directory (None = no caching)
+        max_workers: Processes for uncached pages (None = the whole shared pool;
+            never more than POOL_MAX_WORKERS)
+        stats: Optional dict filled with pages, cached_pages, extracted_pages and workers
+
+    Returns:
+        list of page texts in the order of pages
+    """
+    cache = None
+    digest = None
+    if cache_dir:
+        try:
+            cache = PageCache(cache_dir)
+            digest = cache.digest(file_path)
+        except OSError as e:
+            print(f"PDF page cache unavailable ({e}), extracting without it")
+            cache = None
+    
+    page_count = cache.get_page_count(digest) if cache else None
+    if page_count is None:
+        page_count = count_pdf_pages(file_path)
+        if cache:
+            cache.put_page_count(digest, page_count)
+    
+    wanted = [i for i in (range(page_count) if pages is None else pages) if 0 <= i < page_count]
+    texts = {}
+    if cache:
+        for index in wanted:
+            text = cache.get_page(digest, index)
+            if text is not None:
+                texts[index] = text
+    
+    missing = [i for i in wanted if i not in texts]
+    workers = 0
+    if missing:
+        extracted, workers = _extract_pages(file_path, missing, max_workers)
+        for index, text in extracted:
+            texts[index] = text
+            if cache:
+                cache.put_page(digest, index, text)
+    
+    if stats is not None:
+        stats.update({
+            "pages": page_count,
+            "requested_pages": len(wanted),
+            "cached_pages": len(wanted) - len(missing),
+            "extracted_pages": len(missing),
+            "workers": workers
+        })
+    return [texts[i] for i in wanted]
+
+
+def count_pdf_pages(file_path):
+    """Number of pages in a PDF."""
+    import PyPDF2
+    with open(file_path, 'rb') as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def extract_page_batch(file_path, indexes):
+    """Extract some pages of a PDF with a single reader.
+
+    Returns:
+        list of (page index, text)
+    """
+    import PyPDF2
+    with open(file_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        return [(index, reader.pages[index].extract_text() or "") for index in indexes]
+
+
+def _extract_pages(file_path, indexes, max_workers):
+    """Extract pages, fanning contiguous ranges out to a process pool for large requests.
+
+    Returns:
+        (list of (page index, text), worker processes used; 0 when in-process)
+    """
+    max_workers = POOL_MAX_WORKERS if max_workers is None else min(max_workers, POOL_MAX_WORKERS)
+    if len(indexes) < PARALLEL_MIN_PAGES or max_workers <= 1:
+        return extract_page_batch(file_path, indexes), 0
+    
+    batch_count = min(len(indexes), max_workers * BATCHES_PER_WORKER)
+    size = -(-len(indexes) // batch_count)
+    batches = [indexes[i:i + size] for i in range(0, len(indexes), size)]
+    workers = min(max_workers, len(batches))
+    
+    try:
+        from concurrent.futures import wait, FIRST_COMPLETED
+        from concurrent.futures.process import BrokenProcessPool
+        
+        pool = _shared_pool()
+        # At most `workers` batches in the pool at a time, so max_workers really
+        # limits the processes this extraction keeps busy
+        results = {}
+        pending = {}
+        for position, batch in enumerate(batches):
+            pending[pool.submit(extract_page_batch, file_path, batch)] = position
+            if len(pending) < workers:
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+        for future in list(pending):
+            results[pending.pop(future)] = future.result()
+        return [item for position in range(len(batches)) for item in results[position]], workers
+    except (ImportError, OSError, NotImplementedError, RuntimeError, BrokenProcessPool) as e:
+        print(f"Process pool unavailable ({e}), extracting PDF pages serially")
+        if isinstance(e, BrokenProcessPool):
+            shutdown_pool()
+        return extract_page_batch(file_path, indexes), 0
+
+
+def _shared_pool():
+    """The process-wide extraction pool, started with the spawn method on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            
+            _pool = ProcessPoolExecutor(max_workers=POOL_MAX_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the shared pool's workers; the next large extraction starts a new pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
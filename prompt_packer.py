@@ -0,0 +1,282 @@
+"""
+Prompt packer module for fitting source material into a model's context window.
+
+A prompt is made of fixed instructions plus a number of sections (game
+context, gameplay, lang analysis, documents, ...). The packer:
+- counts tokens locally with tiktoken, falling back to the lang_tokenizer
+  estimate when tiktoken or its encoding files are unavailable
+- works out the budget left for sections from the deployment's context
+  window, the request's max_tokens and the fixed instructions
+- shares that budget fairly: sections smaller than an equal share keep
+  everything and their unused share goes to the larger ones
+- trims over-budget sections at paragraph boundaries (then lines, then
+  words for a single oversized paragraph) and reports what was dropped
+
+The context window comes from the "context_window" setting, or is guessed
+from the deployment name.
+"""
+
+import re
+
+import lang_tokenizer
+
+
+# Known context windows by model family, matched on whole name tokens
+# (split at "-", "_", ".", spaces and where a digit follows a letter) of the
+# deployment name; families with more tokens are tried first, so "gpt-4.1"
+# wins over "gpt-4"
+MODEL_CONTEXT_WINDOWS = (
+    ("gpt-4.1", 1000000),
+    ("gpt-4o", 128000),
+    ("gpt-4-turbo", 128000),
+    ("gpt-4-1106-preview", 128000),
+    ("gpt-4-0125-preview", 128000),
+    ("gpt-4-vision-preview", 128000),
+    ("gpt-4-32k", 32768),
+    ("gpt-4", 8192),
+    ("gpt-35-turbo-16k", 16384),
+    ("gpt-35-turbo", 16384),
+    ("gpt-3.5-turbo", 16384),
+    ("gpt-5", 272000),
+    ("o1", 128000),
+    ("o3", 200000),
+    ("o4", 200000),
+)
+DEFAULT_CONTEXT_WINDOW = 32768
+
+# Per-message chat formatting overhead and a margin for tokenizer differences
+MESSAGE_OVERHEAD_TOKENS = 8
+SAFETY_MARGIN_TOKENS = 256
+
+PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+NAME_TOKEN_SEPARATOR_RE = re.compile(r'[-_.\s]+|(?<=[a-z])(?=[0-9])')
+
+# Stands for a section in a prompt template (see section_marker)
+SECTION_MARKER_RE = re.compile('\x00([^\x00]*)\x00')
+
+_encodings = {}
+
+
+def count_tokens(text, model=None):
+    """Count prompt tokens with tiktoken for the model, or estimate them without it."""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return lang_tokenizer.estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _get_encoding(model):
+    """tiktoken encoding for a model name (cached), or None if unavailable."""
+    if model in _encodings:
+        return _encodings[model]
+    
+    encoding = None
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model or "")
+        except KeyError:
+            # Azure deployment names are free-form; newer families use o200k
+            name = (model or "").lower()
+            base = "o200k_base" if any(tag in name for tag in ("4o", "4.1", "gpt-5", "o1", "o3", "o4")) else "cl100k_base"
+            encoding = tiktoken.get_encoding(base)
+    except Exception:
+        # Not installed, or the encoding file cannot be fetched offline
+        encoding = None
+    
+    _encodings[model] = encoding
+    return encoding
+
+
+def context_window_for(deployment, configured=None):
+    """Context window in tokens: the configured value, else a guess from the deployment name."""
+    if configured:
+        try:
+            return int(configured)
+        except (TypeError, ValueError):
+            pass
+    
+    # Deployment names vary in punctuation ("gpt-4o", "gpt4o-prod", "GPT_4.1"); a
+    # family matches as a run of whole tokens, never inside a longer version number
+    tokens = _name_tokens(deployment or "")
+    for family_tokens, window in sorted(((_name_tokens(family), window) for family, window in MODEL_CONTEXT_WINDOWS),
+                                        key=lambda entry: len(entry[0]), reverse=True):
+        length = len(family_tokens)
+        if any(tokens[i:i + length] == family_tokens for i in range(len(tokens) - length + 1)):
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def _name_tokens(name):
+    return [token for token in NAME_TOKEN_SEPARATOR_RE.split(name.lower()) if token]
+
+
+def section_marker(name):
+    """Placeholder for a section in a prompt template, filled in by PromptPacker.fit_prompt."""
+    return f"\x00{name}\x00"
+
+
+def mark_sections(sections):
+    """{name: marker} for the non-empty sections; empty ones keep their text, so a
+    template can still fall back to e.g. 'Not available' for them."""
+    return {name: section_marker(name) if text else text for name, text in sections.items()}
+
+
+class PromptPacker:
+    """Fits prompt sections into the token budget of one chat request."""
+    
+    def __init__(self, context_window, max_tokens, model=None, verbose=True):
+        self.context_window = context_window
+        self.max_tokens = max_tokens
+        self.model = model
+        self.verbose = verbose
+        self.dropped = []
+    
+    @classmethod
+    def from_settings(cls, settings, max_tokens):
+        """Packer for the configured Azure OpenAI deployment."""
+        deployment = settings.get_azure_config().get('deployment')
+        window = context_window_for(deployment, settings.get_value('context_window'))
+        return cls(window, max_tokens, model=deployment)
+    
+    def count(self, text):
+        return count_tokens(text, self.model)
+    
+    def section_budget(self, fixed_text=""):
+        """Tokens left for sections once the reply, the fixed text and overheads are reserved."""
+        reserved = self.max_tokens + self.count(fixed_text) + 2 * MESSAGE_OVERHEAD_TOKENS + SAFETY_MARGIN_TOKENS
+        return max(0, self.context_window - reserved)
+    
+    def fit(self, sections, fixed_text=""):
+        """Trim sections so that they and fixed_text fit the request.
+        
+        Args:
+            sections: {name: text}, in prompt order
+            fixed_text: Everything else in the request (instructions, system message)
+        
+        Returns:
+            {name: text} with over-budget sections trimmed; what was trimmed is
+            recorded in self.dropped (and printed when verbose)
+        """
+        sizes = {name: self.count(text or "") for name, text in sections.items()}
+        budgets = allocate_budget(sizes, self.section_budget(fixed_text))
+        
+        fitted = {}
+        for name, text in sections.items():
+            if sizes[name] <= budgets[name]:
+                fitted[name] = text
+                continue
+            
+            trimmed, kept_units, total_units = self._trim(text, budgets[name])
+            fitted[name] = trimmed
+            
+            record = {
+                "section": name,
+                "tokens": sizes[name],
+                "budget": budgets[name],
+                "kept_tokens": self.count(trimmed),
+                "kept_paragraphs": kept_units,
+                "total_paragraphs": total_units
+            }
+            self.dropped.append(record)
+            if self.verbose:
+                print(f"Prompt packing: trimmed '{name}' from {record['tokens']} to {record['kept_tokens']} tokens "
+                      f"(kept {kept_units} of {total_units} paragraphs in full)")
+        
+        return fitted
+    
+    def fit_prompt(self, template, sections, system=""):
+        """Build a prompt from a template, trimming its sections to fit.
+        
+        Args:
+            template: The user prompt with a section_marker(name) where each
+                section goes (see mark_sections)
+            sections: {name: text} of the variable parts of the prompt
+            system: System message sent with the prompt
+        
+        Returns:
+            The prompt with each marker replaced by its section, trimmed if
+            the whole request would not fit
+        """
+        present = {name: sections.get(name) or "" for name in SECTION_MARKER_RE.findall(template)}
+        fixed = SECTION_MARKER_RE.sub("", template)
+        fitted = present
+        if self.count(fixed) + sum(map(self.count, present.values())) + self.count(system) > self.section_budget():
+            fitted = self.fit(present, fixed + system)
+        # Rebuilt from the template's parts, so section text is never searched for
+        return SECTION_MARKER_RE.sub(lambda match: fitted[match.group(1)], template)
+    
+    def _trim(self, text, budget):
+        """Keep the leading paragraphs of text that fit in budget.
+        
+        Returns:
+            (trimmed text with a truncation note, paragraphs kept, paragraphs in total)
+        """
+        paragraphs = [p for p in PARAGRAPH_BREAK_RE.split(text) if p.strip()]
+        note = "\n\n[... remaining text omitted to fit the model's context window; {} of {} paragraphs kept in full]"
+        budget -= self.count(note.format(len(paragraphs), len(paragraphs)))
+        
+        kept = []
+        used = 0
+        for paragraph in paragraphs:
+            # Paragraphs are joined by a blank line, about one more token each
+            cost = self.count(paragraph) + 1
+            if used + cost > budget:
+                break
+            kept.append(paragraph)
+            used += cost
+        
+        if not kept and paragraphs and budget > 0:
+            # A single paragraph larger than the whole budget: keep the start of it,
+            # cut at a line or word
+            partial = self._trim_paragraph(paragraphs[0], budget)
+            return partial + note.format(0, len(paragraphs)), 0, len(paragraphs)
+        
+        trimmed = "\n\n".join(kept) + note.format(len(kept), len(paragraphs))
+        return trimmed, len(kept), len(paragraphs)
+    
+    def _trim_paragraph(self, paragraph, budget):
+        """Longest prefix of a paragraph within budget, ending at a line, else a word."""
+        for separator in ("\n", " "):
+            pieces = paragraph.split(separator)
+            low, high = 0, len(pieces)
+            # Binary search on the number of pieces kept
+            while low < high:
+                middle = (low + high + 1) // 2
+                if self.count(separator.join(pieces[:middle])) <= budget:
+                    low = middle
+                else:
+                    high = middle - 1
+            if low:
+                return separator.join(pieces[:low])
+        return ""
+
+
+def allocate_budget(sizes, total_budget):
+    """Share total_budget between sections by max-min fairness.
+    
+    Sections needing less than an equal share get exactly what they need and
+    the remainder is split again among the rest.
+    
+    Returns:
+        {name: token budget}
+    """
+    budgets = {}
+    remaining = dict(sizes)
+    budget_left = total_budget
+    
+    while remaining:
+        share = budget_left // len(remaining)
+        small = {name: size for name, size in remaining.items() if size <= share}
+        if not small:
+            for name in remaining:
+                budgets[name] = share
+            break
+        for name, size in small.items():
+            budgets[name] = size
+            budget_left -= size
+            del remaining[name]
+    
+    return budgets
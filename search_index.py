@@ -0,0 +1,351 @@
+"""
+Search index module for full-text search across every game's artifacts.
+
+An inverted index (term -> {document: term frequency}) over:
+- lang entries, one document per key, in their clean text
+- document analyses (document_analysis.json), one document per section
+- context, gameplay and objectives
+- creations (creations/*.md), one document per Markdown section
+
+Results are ranked with BM25 and come with a snippet around the first
+matching term. The index is saved as JSON and maintained incrementally:
+every file is remembered by size and mtime, and only new, changed or
+deleted files are re-read and their documents replaced.
+
+The same index also serves passage retrieval for prompts (see
+passage_retrieval): there, documents are passages of about PASSAGE_TOKENS
+of extracted document text or consecutive lang entries, plus the sections
+of the document and lang analyses.
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import tempfile
+
+import lang_tokenizer
+import document_chunker
+
+
+INDEX_VERSION = 2
+
+# Kinds of indexed file, as passed to SearchIndex.update
+KIND_LANG = "lang"
+KIND_DOCUMENTS = "documents"
+KIND_INFO = "info"
+KIND_CREATION = "creation"
+# Passage kinds, for retrieval into prompts rather than search
+KIND_DOCUMENT_TEXT = "document_text"
+KIND_LANG_PASSAGES = "lang_passages"
+KIND_LANG_ANALYSIS = "lang_analysis"
+
+# Tokens per passage of document text or lang entries (prompt_packer.count_tokens)
+PASSAGE_TOKENS = 250
+
+TERM_RE = re.compile(r"[a-z0-9]+")
+HEADING_RE = re.compile(r'^#{1,6}\s+(.+?)\s*#*\s*$', re.MULTILINE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SNIPPET_CHARS = 160
+
+
+class SearchIndex:
+    """Persistent inverted index over the artifacts of a games folder."""
+    
+    def __init__(self, index_file, games_dir):
+        self.index_file = index_file
+        self.games_dir = os.path.abspath(games_dir)
+        # {relative path: {"kind", "size", "mtime_ns", "docs": [doc ids]}}
+        self.files = {}
+        # {doc id: {"game", "path", "kind", "label", "text", "length"}}
+        self.docs = {}
+        # {term: {doc id: term frequency}}
+        self.postings = {}
+        self.total_length = 0
+        self.next_id = 0
+        self._load()
+    
+    def __len__(self):
+        return len(self.docs)
+    
+    def update(self, sources):
+        """Bring the index up to date with the given files.
+
+        Args:
+            sources: {path relative to the games folder: kind}; files indexed
+                earlier but missing from sources are dropped
+
+        Returns:
+            dict with files, files_indexed, files_removed, documents and terms
+        """
+        indexed = 0
+        removed = 0
+        
+        for path in [p for p in self.files if p not in sources]:
+            self._remove_file(path)
+            removed += 1
+        
+        for path, kind in sources.items():
+            full_path = os.path.join(self.games_dir, path)
+            try:
+                stat = os.stat(full_path)
+            except OSError:
+                if path in self.files:
+                    self._remove_file(path)
+                    removed += 1
+                continue
+            
+            cached = self.files.get(path)
+            if (cached and cached["kind"] == kind and cached["size"] == stat.st_size
+                    and cached["mtime_ns"] == stat.st_mtime_ns):
+                continue
+            
+            if cached:
+                self._remove_file(path)
+            game = path.replace('\\', '/').split('/', 1)[0]
+            doc_ids = [self._add_document(game, path, kind, label, text)
+                       for label, text in extract_documents(full_path, kind)]
+            self.files[path] = {"kind": kind, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "docs": doc_ids}
+            indexed += 1
+        
+        if indexed or removed:
+            self._save()
+        
+        return {
+            "files": len(self.files),
+            "files_indexed": indexed,
+            "files_removed": removed,
+            "documents": len(self.docs),
+            "terms": len(self.postings)
+        }
+    
+    def search(self, query, limit=20, game=None, kinds=None):
+        """Rank documents for a query with BM25.
+
+        Args:
+            query: Free text; every term counts, documents matching more terms rank higher
+            limit: Most results returned
+            game: Only search this game
+            kinds: Only search these kinds of file
+
+        Returns:
+            list of {"game", "path", "kind", "label", "score", "snippet"}, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.docs:
+            return []
+        
+        count = len(self.docs)
+        average_length = self.total_length / count or 1.0
+        scores = {}
+        
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1.0 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                doc = self.docs[doc_id]
+                if (game and doc["game"] != game) or (kinds and doc["kind"] not in kinds):
+                    continue
+                length = doc["length"]
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * length / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (BM25_K1 + 1.0) / (frequency + norm)
+        
+        results = []
+        for doc_id in heapq.nlargest(limit, scores, key=scores.get):
+            doc = self.docs[doc_id]
+            results.append({
+                "game": doc["game"],
+                "path": doc["path"],
+                "kind": doc["kind"],
+                "label": doc["label"],
+                "score": round(scores[doc_id], 3),
+                "snippet": make_snippet(doc["text"], terms),
+                "text": doc["text"]
+            })
+        return results
+    
+    def _add_document(self, game, path, kind, label, text):
+        doc_id = self.next_id
+        self.next_id += 1
+        
+        frequencies = _term_frequencies(text)
+        length = sum(frequencies.values())
+        self.docs[doc_id] = {"game": game, "path": path, "kind": kind, "label": label, "text": text, "length": length}
+        self.total_length += length
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+        return doc_id
+    
+    def _remove_file(self, path):
+        """Drop a file and its documents; their terms are found again from the stored text."""
+        for doc_id in self.files.pop(path)["docs"]:
+            doc = self.docs.pop(doc_id, None)
+            if doc is None:
+                continue
+            self.total_length -= doc["length"]
+            for term in _term_frequencies(doc["text"]):
+                postings = self.postings.get(term)
+                if postings is None:
+                    continue
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+    
+    def _load(self):
+        """Load the index; a missing, damaged or outdated one, or one for another games folder, starts empty."""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION or data.get("games_dir") != self.games_dir:
+                return
+            
+            # JSON object keys are strings; postings are saved as flat [id, tf, id, tf, ...] lists
+            docs = {int(doc_id): doc for doc_id, doc in data["docs"].items()}
+            postings = {term: dict(zip(flat[::2], flat[1::2])) for term, flat in data["postings"].items()}
+            self.files = data["files"]
+            self.docs = docs
+            self.postings = postings
+            self.total_length = sum(doc["length"] for doc in docs.values())
+            self.next_id = data.get("next_id", max(docs, default=-1) + 1)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self.files, self.docs, self.postings = {}, {}, {}
+    
+    def _save(self):
+        """Write the index atomically."""
+        directory = os.path.dirname(self.index_file)
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "version": INDEX_VERSION,
+                    "games_dir": self.games_dir,
+                    "next_id": self.next_id,
+                    "files": self.files,
+                    "docs": self.docs,
+                    "postings": {term: [value for item in postings.items() for value in item]
+                                 for term, postings in self.postings.items()}
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_file)
+        except OSError as e:
+            print(f"Error saving search index: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def tokenize(text):
+    """Lower-case word and number terms of a text."""
+    return TERM_RE.findall(text.lower())
+
+
+def _term_frequencies(text):
+    frequencies = {}
+    for term in tokenize(text):
+        frequencies[term] = frequencies.get(term, 0) + 1
+    return frequencies
+
+
+def extract_documents(file_path, kind):
+    """Read the searchable documents of one file.
+
+    Returns:
+        list of (label, text); an unreadable file has none
+    """
+    try:
+        if kind == KIND_CREATION:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                return split_sections(f.read())
+        if kind == KIND_DOCUMENT_TEXT:
+            return document_text_passages(file_path)
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error indexing {file_path}: {e}")
+        return []
+    
+    if kind in (KIND_LANG, KIND_LANG_PASSAGES):
+        entries = lang_tokenizer.clean_lang_entries(lang_tokenizer.tokenize_lang_entries(data))
+        entries = {key: text for key, text in entries.items() if text.strip()}
+        if kind == KIND_LANG:
+            return list(entries.items())
+        # Runs of consecutive entries, so a passage keeps a conversation together
+        return [(f"{next(iter(chunk))} .. {next(reversed(chunk))}" if len(chunk) > 1 else next(iter(chunk)),
+                 "\n".join(f"{key}: {text}" for key, text in chunk.items()))
+                for chunk in lang_tokenizer.chunk_lang_entries(entries, PASSAGE_TOKENS)]
+    
+    content = data.get("content") if isinstance(data, dict) else None
+    if kind == KIND_DOCUMENTS and isinstance(content, dict):
+        documents = []
+        for filename, analysis in content.items():
+            text = analysis.get("analysis", "") if isinstance(analysis, dict) else str(analysis)
+            documents.extend((f"{filename} / {label}" if label else filename, section)
+                             for label, section in split_sections(text))
+        return documents
+    
+    if kind == KIND_LANG_ANALYSIS and isinstance(content, dict):
+        content = content.get("analysis", "")
+    if content is None:
+        return []
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False)
+    return split_sections(content)
+
+
+def document_text_passages(index_file):
+    """Passages of every document in a document text cache, from its index.json.
+    
+    Returns:
+        list of (filename / first heading, passage text)
+    """
+    with open(index_file, 'r', encoding='utf-8') as f:
+        documents = json.load(f).get("documents", {})
+    
+    passages = []
+    for filename, record in sorted(documents.items()):
+        try:
+            with open(os.path.join(os.path.dirname(index_file), f"{record['sha256']}.txt"), 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, KeyError, TypeError):
+            continue
+        for chunk in document_chunker.chunk_document(text, PASSAGE_TOKENS):
+            label = f"{filename} / {chunk['headings'][0]}" if chunk["headings"] else filename
+            passages.append((label, chunk["text"]))
+    return passages
+
+
+def split_sections(text):
+    """Split Markdown at its headings into (heading, section text) pairs.
+    Text before the first heading has an empty label."""
+    sections = []
+    matches = list(HEADING_RE.finditer(text))
+    starts = [0] + [m.start() for m in matches]
+    labels = [""] + [m.group(1).strip('*_ ') for m in matches]
+    
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(text)
+        section = text[start:end].strip()
+        if section:
+            sections.append((labels[i], section))
+    return sections
+
+
+def make_snippet(text, terms, width=SNIPPET_CHARS):
+    """A window of text around the first occurrence of any term, on one line."""
+    pattern = re.compile(r'(?<![a-z0-9])(?:' + '|'.join(map(re.escape, terms)) + r')(?![a-z0-9])', re.IGNORECASE)
+    match = pattern.search(text)
+    position = match.start() if match else 0
+    
+    start = max(0, position - width // 3)
+    end = min(len(text), start + width)
+    snippet = WHITESPACE_RE.sub(' ', text[start:end]).strip()
+    return ("..." if start else "") + snippet + ("..." if end < len(text) else "")